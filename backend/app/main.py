@@ -185,8 +185,8 @@ def create_app() -> FastAPI:
         
         # Check theme embeddings
         try:
-            from config.theme_embeddings import ThemeEmbeddings
-            theme_embeddings = ThemeEmbeddings("bge-large")
+            from config.theme_embeddings import get_theme_embeddings
+            theme_embeddings = get_theme_embeddings("bge-large")
             stats = theme_embeddings.get_embedding_stats()
             health_status["checks"]["theme_embeddings"] = {
                 "status": "ok",
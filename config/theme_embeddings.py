@@ -6,15 +6,16 @@ It provides model-aware embedding storage, validation, and caching for efficient
 
 Key Features:
 - Model-aware: Supports different embedding dimensions (bge-large: 1024d, miniLM: 384d)
-- Caching: Efficient storage and retrieval of pre-computed embeddings
+- Caching: Efficient storage and retrieval of pre-computed embeddings, plus a
+  memory-mapped theme matrix shared by every process on the machine
 - Validation: Ensures embedding consistency and dimension matching
 - Health checks: Validates embedding quality and model compatibility
 
 Usage:
-    from config.theme_embeddings import ThemeEmbeddings
+    from config.theme_embeddings import get_theme_embeddings
     
-    # Initialize for specific model
-    theme_embeddings = ThemeEmbeddings("bge-large")
+    # Get the shared instance for a model (loaded once per process)
+    theme_embeddings = get_theme_embeddings("bge-large")
     
     # Get embedding for a theme keyword
     embedding = theme_embeddings.get_theme_embedding("justice")
@@ -24,17 +25,26 @@ Usage:
 
 Author: NobelLM Team
 """
+import hashlib
 import json
 import logging
+import os
 import numpy as np
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
-from sentence_transformers import SentenceTransformer
 from rag.model_config import get_model_config, MODEL_CONFIGS
+from rag.validation import validate_embedding_vector
 from rag.modal_embedding_service import get_embedding_service
 
 logger = logging.getLogger(__name__)
 
+# Keywords sent per request to the batch embedding endpoint when computing embeddings
+THEME_EMBED_BATCH_SIZE = 64
+
+# Uncompressed theme matrices that worker processes memory-map instead of re-loading
+THEME_MATRIX_CACHE_DIR = Path.home() / ".cache" / "nobellm"
+
 class ThemeEmbeddings:
     """
     Manages pre-computed embeddings for theme keywords with model-aware storage and validation.
@@ -64,6 +74,8 @@ class ThemeEmbeddings:
         # Initialize embeddings cache
         self._embeddings_cache: Dict[str, np.ndarray] = {}
         self._is_initialized = False
+        # (keywords, stacked embeddings) built on first get_theme_matrix() call
+        self._theme_matrix: Optional[Tuple[List[str], np.ndarray]] = None
         
         # Pre-compute embeddings
         self._initialize_embeddings()
@@ -99,16 +111,25 @@ class ThemeEmbeddings:
         
         logger.info(f"Initializing theme embeddings for model '{self.model_id}' (dim: {self.embedding_dim})")
         
+        # Map the shared theme matrix if another process already wrote it
+        if self._load_theme_matrix_cache():
+            logger.info(f"Mapped {len(self._embeddings_cache)} theme embeddings from the theme matrix cache")
+            self._is_initialized = True
+            self._run_health_checks()
+            return
+        
         # Try to load from disk first
         if self._load_embeddings_from_disk():
             logger.info(f"Loaded {len(self._embeddings_cache)} theme embeddings from disk")
             self._is_initialized = True
             self._run_health_checks()
+            self._save_theme_matrix_cache()
             return
         
         # Fallback to computing embeddings
         logger.info("Theme embeddings not found on disk, computing...")
         self._compute_and_save_embeddings()
+        self._save_theme_matrix_cache()
     
     def _get_embeddings_file_path(self) -> Path:
         """
@@ -121,6 +142,96 @@ class ThemeEmbeddings:
         embeddings_dir.mkdir(exist_ok=True)
         return embeddings_dir / f"theme_embeddings_{self.model_id}.npz"
     
+    def _set_theme_matrix(self, keywords: List[str], matrix: np.ndarray):
+        """
+        Store theme embeddings as one contiguous matrix.
+        
+        Per-keyword embeddings are row views into the matrix, so lookups never
+        copy and all vectors share a single buffer.
+        
+        Args:
+            keywords: Keywords in matrix row order
+            matrix: C-contiguous float32 array of shape (len(keywords), embedding_dim)
+            
+        Raises:
+            ValueError: If the matrix contains NaN or infinite values
+        """
+        validate_embedding_vector(matrix, expected_dim=self.embedding_dim, context="theme_matrix")
+        self._theme_matrix = (list(keywords), matrix)
+        self._embeddings_cache = {kw: matrix[i] for i, kw in enumerate(keywords)}
+    
+    def _get_theme_matrix_cache_path(self) -> Path:
+        """
+        Get the file path of the memory-mapped theme matrix for this model and themes.json.
+        
+        The name hashes the model, the sorted keyword set and the size and mtime of
+        the source .npz embeddings file, so editing themes.json, switching models or
+        regenerating the embeddings file never maps a stale matrix. Rows are in
+        sorted keyword order.
+        
+        Returns:
+            Path to the .npy theme matrix file
+        """
+        keywords = sorted({kw for keywords in self.themes.values() for kw in keywords})
+        try:
+            source_stat = self._get_embeddings_file_path().stat()
+            source = [source_stat.st_size, source_stat.st_mtime_ns]
+        except FileNotFoundError:
+            source = None
+        digest = hashlib.blake2b(
+            json.dumps([self.model_id, keywords, source]).encode("utf-8"), digest_size=8
+        ).hexdigest()
+        return THEME_MATRIX_CACHE_DIR / f"theme_{self.model_id}_{digest}.npy"
+    
+    def _load_theme_matrix_cache(self) -> bool:
+        """
+        Memory-map the theme matrix cache file if it exists.
+        
+        The matrix is opened read-only, so every process shares one copy through the
+        OS page cache and no embedding model or service is needed.
+        
+        Returns:
+            True if the matrix was mapped successfully, False otherwise
+        """
+        matrix_file = self._get_theme_matrix_cache_path()
+        if not matrix_file.exists():
+            return False
+        
+        try:
+            matrix = np.load(matrix_file, mmap_mode="r")
+            keywords = sorted({kw for keywords in self.themes.values() for kw in keywords})
+            if matrix.dtype != np.float32 or matrix.shape != (len(keywords), self.embedding_dim):
+                logger.warning(f"Theme matrix cache {matrix_file} has shape {matrix.shape}, ignoring it")
+                return False
+            self._set_theme_matrix(keywords, matrix)
+        except Exception as e:
+            logger.warning(f"Failed to map theme matrix cache {matrix_file}: {e}")
+            return False
+        
+        return True
+    
+    def _save_theme_matrix_cache(self):
+        """
+        Write the theme matrix cache file for other processes to memory-map.
+        
+        Written to a temporary file and renamed into place, so readers never see a
+        partial file. Failures are logged and otherwise ignored.
+        """
+        matrix_file = self._get_theme_matrix_cache_path()
+        keywords = sorted(self._embeddings_cache)
+        tmp_file = matrix_file.with_name(f"{matrix_file.name}.{os.getpid()}.tmp")
+        
+        try:
+            matrix_file.parent.mkdir(parents=True, exist_ok=True)
+            matrix = np.stack([self._embeddings_cache[kw] for kw in keywords]).astype(np.float32)
+            with tmp_file.open("wb") as f:
+                np.save(f, matrix)
+            os.replace(tmp_file, matrix_file)
+            logger.info(f"Saved theme matrix cache to {matrix_file}")
+        except Exception as e:
+            logger.warning(f"Failed to save theme matrix cache to {matrix_file}: {e}")
+            tmp_file.unlink(missing_ok=True)
+    
     def _load_embeddings_from_disk(self) -> bool:
         """
         Load theme embeddings from disk if they exist.
@@ -149,9 +260,14 @@ class ThemeEmbeddings:
                 logger.warning(f"Embedding dimension mismatch in file: expected {self.embedding_dim}, got {embeddings.shape[1]}")
                 return False
             
+            # Validate the file still covers exactly the keywords in themes.json
+            expected_keywords = {kw for keywords in self.themes.values() for kw in keywords}
+            if set(keywords) != expected_keywords:
+                logger.warning(f"Theme keywords in {embeddings_file} do not match themes.json, recomputing")
+                return False
+            
             # Store in cache
-            for keyword, embedding in zip(keywords, embeddings):
-                self._embeddings_cache[keyword] = embedding.astype(np.float32)
+            self._set_theme_matrix(keywords, np.ascontiguousarray(embeddings, dtype=np.float32))
             
             logger.info(f"Successfully loaded {len(self._embeddings_cache)} theme embeddings from disk")
             return True
@@ -173,15 +289,20 @@ class ThemeEmbeddings:
             for keywords in self.themes.values():
                 all_keywords.update(keywords)
             
-            # Convert to list for batch processing
-            keyword_list = list(all_keywords)
+            # Sort by length so each batch holds similarly sized texts (less padding)
+            keyword_list = sorted(all_keywords, key=lambda kw: (len(kw), kw))
             logger.info(f"Computing embeddings for {len(keyword_list)} unique keywords using Modal")
             
-            # Embed keywords one by one using Modal service
+            # Embed keywords in batches, one request per THEME_EMBED_BATCH_SIZE keywords
             embeddings_list = []
-            for keyword in keyword_list:
-                embedding = embedding_service.embed_query(keyword, self.model_id)
-                embeddings_list.append(embedding)
+            for start in range(0, len(keyword_list), THEME_EMBED_BATCH_SIZE):
+                batch = keyword_list[start:start + THEME_EMBED_BATCH_SIZE]
+                embeddings_list.extend(embedding_service.embed_batch(batch, self.model_id))
+            
+            if len(embeddings_list) != len(keyword_list):
+                raise ValueError(
+                    f"Embedding count mismatch: expected {len(keyword_list)}, got {len(embeddings_list)}"
+                )
             
             # Convert to numpy array
             embeddings = np.array(embeddings_list, dtype=np.float32)
@@ -193,8 +314,7 @@ class ThemeEmbeddings:
                 )
             
             # Store in cache
-            for keyword, embedding in zip(keyword_list, embeddings):
-                self._embeddings_cache[keyword] = embedding.astype(np.float32)
+            self._set_theme_matrix(keyword_list, embeddings)
             
             # Save to disk
             self._save_embeddings_to_disk(keyword_list, embeddings)
@@ -244,6 +364,7 @@ class ThemeEmbeddings:
         
         # Clear cache
         self._embeddings_cache.clear()
+        self._theme_matrix = None
         self._is_initialized = False
         
         # Remove existing file
@@ -254,6 +375,7 @@ class ThemeEmbeddings:
         
         # Recompute and save
         self._compute_and_save_embeddings()
+        self._save_theme_matrix_cache()
     
     def _run_health_checks(self):
         """
@@ -268,17 +390,16 @@ class ThemeEmbeddings:
                 raise ValueError(f"Embedding dimension mismatch for keyword '{keyword}'")
         
         # Check for zero vectors
-        zero_count = 0
-        for keyword, embedding in self._embeddings_cache.items():
-            if np.allclose(embedding, 0):
-                zero_count += 1
-                logger.warning(f"Zero embedding detected for keyword '{keyword}'")
+        keywords, _ = self.get_theme_matrix()
+        zero_rows = np.flatnonzero(self._zero_rows())
+        for row in zero_rows:
+            logger.warning(f"Zero embedding detected for keyword '{keywords[row]}'")
         
-        if zero_count > 0:
-            logger.warning(f"Found {zero_count} zero embeddings out of {len(self._embeddings_cache)} total")
+        if zero_rows.size > 0:
+            logger.warning(f"Found {zero_rows.size} zero embeddings out of {len(self._embeddings_cache)} total")
         
         # Check embedding norms (should be ~1.0 for normalized embeddings)
-        norms = [np.linalg.norm(emb) for emb in self._embeddings_cache.values()]
+        norms = self._row_norms()
         mean_norm = np.mean(norms)
         std_norm = np.std(norms)
         
@@ -316,6 +437,36 @@ class ThemeEmbeddings:
         
         return self._embeddings_cache.copy()
     
+    def get_theme_matrix(self) -> Tuple[List[str], np.ndarray]:
+        """
+        Get all theme embeddings stacked into one matrix for vectorized scoring.
+        
+        Built once and reused; callers must not modify the returned list or array.
+        
+        Returns:
+            Tuple of (keywords, matrix) where matrix is a C-contiguous float32 array of
+            shape (len(keywords), embedding_dim) and row i is the embedding of keywords[i]
+            
+        Raises:
+            RuntimeError: If theme embeddings are not initialized
+            ValueError: If the embeddings contain NaN or infinite values
+        """
+        if not self._is_initialized:
+            raise RuntimeError("Theme embeddings not initialized")
+        
+        # Set on load; only built here when embeddings were added one by one
+        if self._theme_matrix is None:
+            keywords = list(self._embeddings_cache.keys())
+            if keywords:
+                matrix = np.ascontiguousarray(np.stack([self._embeddings_cache[kw] for kw in keywords]), dtype=np.float32)
+                # Checked once here instead of on every similarity computation
+                validate_embedding_vector(matrix, expected_dim=self.embedding_dim, context="theme_matrix")
+            else:
+                matrix = np.empty((0, self.embedding_dim), dtype=np.float32)
+            self._theme_matrix = (keywords, matrix)
+        
+        return self._theme_matrix
+    
     def get_theme_keywords(self) -> List[str]:
         """
         Get list of all theme keywords.
@@ -371,8 +522,7 @@ class ThemeEmbeddings:
         if not self._is_initialized:
             return {"error": "Embeddings not initialized"}
         
-        embeddings = list(self._embeddings_cache.values())
-        norms = [np.linalg.norm(emb) for emb in embeddings]
+        norms = self._row_norms()
         
         return {
             "model_id": self.model_id,
@@ -383,5 +533,32 @@ class ThemeEmbeddings:
             "std_norm": float(np.std(norms)),
             "min_norm": float(np.min(norms)),
             "max_norm": float(np.max(norms)),
-            "zero_embeddings": sum(1 for emb in embeddings if np.allclose(emb, 0))
-        } 
\ No newline at end of file
+            "zero_embeddings": int(np.count_nonzero(self._zero_rows()))
+        }
+    
+    def _row_norms(self) -> np.ndarray:
+        """L2 norm of every theme embedding, in get_theme_matrix() row order."""
+        _, matrix = self.get_theme_matrix()
+        return np.sqrt(np.einsum("ij,ij->i", matrix, matrix))
+    
+    def _zero_rows(self) -> np.ndarray:
+        """Boolean mask of theme embeddings that are (close to) all zeros."""
+        _, matrix = self.get_theme_matrix()
+        return np.isclose(matrix, 0).all(axis=1)
+
+
+@lru_cache(maxsize=len(MODEL_CONFIGS))
+def get_theme_embeddings(model_id: str = "bge-large") -> ThemeEmbeddings:
+    """
+    Get the shared ThemeEmbeddings for a model, creating it on first use.
+    
+    Loading (or computing) the embeddings happens once per model per process instead
+    of on every query; callers must treat the shared instance as read-only.
+    
+    Args:
+        model_id: Model identifier (e.g., "bge-large", "miniLM")
+        
+    Returns:
+        The ThemeEmbeddings instance for model_id
+    """
+    return ThemeEmbeddings(model_id)
@@ -9,16 +9,37 @@ Enhanced in Phase 3A with similarity-based ranked expansion for improved retriev
 import json
 import re
 import logging
-import spacy
 import numpy as np
+from functools import lru_cache
 from pathlib import Path
-from typing import Set, List, Tuple, Optional
-from config.theme_embeddings import ThemeEmbeddings
+from typing import Dict, Iterable, Set, List, Tuple, Optional
+from config.theme_embeddings import ThemeEmbeddings, get_theme_embeddings
 from config.theme_similarity import compute_theme_similarities
 from rag.modal_embedding_service import ModalEmbeddingService
 
 logger = logging.getLogger(__name__)
 
+# Pipeline components lemmatization does not use; the lemmatizer only needs the tagger
+# and attribute ruler, so the dependency parser and NER are never loaded
+SPACY_EXCLUDED_COMPONENTS = ("parser", "ner")
+
+# Distinct lowercased queries whose lemmas each ThemeReformulator keeps
+LEMMA_CACHE_SIZE = 1024
+# Queries handed to spaCy per nlp.pipe batch in lemmatize_queries
+LEMMA_PIPE_BATCH_SIZE = 64
+# Theme keywords handed to spaCy per nlp.pipe batch while building the theme map
+KEYWORD_PIPE_BATCH_SIZE = 256
+
+@lru_cache(maxsize=None)
+def load_spacy_pipeline(model_name: str = "en_core_web_sm"):
+    """
+    Load a spaCy pipeline for lemmatization, once per process.
+    spaCy is imported here rather than at module import so callers that never
+    lemmatize do not pay for it.
+    """
+    import spacy
+    return spacy.load(model_name, exclude=list(SPACY_EXCLUDED_COMPONENTS))
+
 class ThemeReformulator:
     """
     Maps user queries to canonical themes and expanded keyword sets using lemmatization.
@@ -33,8 +54,9 @@ class ThemeReformulator:
             model_id: Model identifier for theme embeddings (default: "bge-large").
         Loads and lemmatizes all keywords for robust matching.
         """
-        self.nlp = spacy.load("en_core_web_sm")
+        self.nlp = load_spacy_pipeline()
         self.model_id = model_id
+        self._lemma_cache = {}
 
         # Load theme → keywords
         theme_path = Path(theme_file)
@@ -43,19 +65,20 @@ class ThemeReformulator:
         with theme_path.open("r", encoding="utf-8") as f:
             self.theme_map_raw = json.load(f)
 
-        # Lemmatize all keywords into normalized map
+        # Lemmatize all keywords into normalized map, in one spaCy pass over the vocabulary
         self.theme_map = {}
         self.keyword_to_themes = {}
+        keyword_lemmas = self.lemmatize_words(
+            {kw for keywords in self.theme_map_raw.values() for kw in keywords}
+        )
 
         for theme, keywords in self.theme_map_raw.items():
-            lemmatized_keywords = {self.lemmatize_word(kw) for kw in keywords}
+            lemmatized_keywords = {keyword_lemmas[kw] for kw in keywords}
             # Store both original and lemmatized keywords
             all_keywords = set(keywords) | lemmatized_keywords
             self.theme_map[theme] = list(all_keywords)
             for lemma_kw in lemmatized_keywords:
                 self.keyword_to_themes.setdefault(lemma_kw, set()).add(theme)
-            for orig_kw in keywords:
-                self.keyword_to_themes.setdefault(self.lemmatize_word(orig_kw), set()).add(theme)
 
         # Initialize theme embeddings (lazy loading)
         self._theme_embeddings = None
@@ -64,7 +87,7 @@ class ThemeReformulator:
     def _get_theme_embeddings(self) -> ThemeEmbeddings:
         """Get theme embeddings instance (lazy loading)."""
         if self._theme_embeddings is None:
-            self._theme_embeddings = ThemeEmbeddings(self.model_id)
+            self._theme_embeddings = get_theme_embeddings(self.model_id)
         return self._theme_embeddings
 
     def _get_embedding_model(self):
@@ -83,15 +106,54 @@ class ThemeReformulator:
         """
         return self.nlp(word.lower())[0].lemma_
 
+    def lemmatize_words(self, words: Iterable[str]) -> Dict[str, str]:
+        """
+        Lemmatize several words with a single nlp.pipe pass.
+        Args:
+            words: The words to lemmatize.
+        Returns:
+            Mapping of each word to the lemma lemmatize_word would give it.
+        """
+        words = list(words)
+        docs = self.nlp.pipe([word.lower() for word in words], batch_size=KEYWORD_PIPE_BATCH_SIZE)
+        return {word: doc[0].lemma_ for word, doc in zip(words, docs)}
+
     def lemmatize_query(self, query: str) -> Set[str]:
         """
         Lemmatize all tokens in a user query.
+        Results are cached per lowercased query, so the repeated lookups made while
+        routing one query run spaCy only once.
         Args:
             query: The user query string.
         Returns:
             Set of lemmatized tokens.
         """
-        return {token.lemma_ for token in self.nlp(query.lower())}
+        text = query.lower()
+        lemmas = self._lemma_cache.get(text)
+        if lemmas is None:
+            lemmas = frozenset(token.lemma_ for token in self.nlp(text))
+            self._remember_lemmas(text, lemmas)
+        return set(lemmas)
+
+    def lemmatize_queries(self, queries: List[str]) -> List[Set[str]]:
+        """
+        Lemmatize several queries, running uncached ones through a single nlp.pipe pass.
+        Args:
+            queries: The user query strings.
+        Returns:
+            One set of lemmatized tokens per query, in input order.
+        """
+        texts = [query.lower() for query in queries]
+        missing = [text for text in dict.fromkeys(texts) if text not in self._lemma_cache]
+        for text, doc in zip(missing, self.nlp.pipe(missing, batch_size=LEMMA_PIPE_BATCH_SIZE)):
+            self._remember_lemmas(text, frozenset(token.lemma_ for token in doc))
+        return [self.lemmatize_query(query) for query in queries]
+
+    def _remember_lemmas(self, text: str, lemmas: frozenset) -> None:
+        """Store lemmas for a lowercased query, starting over when the cache is full."""
+        if len(self._lemma_cache) >= LEMMA_CACHE_SIZE:
+            self._lemma_cache.clear()
+        self._lemma_cache[text] = lemmas
 
     def extract_theme_keywords(self, query: str) -> Set[str]:
         """
@@ -176,7 +238,8 @@ class ThemeReformulator:
                 query_embedding=query_embedding,
                 model_id=self.model_id,
                 similarity_threshold=similarity_threshold,
-                max_results=max_results
+                max_results=max_results,
+                theme_embeddings=self._get_theme_embeddings()
             )
             
             # Convert to ranked list
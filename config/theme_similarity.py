@@ -2,10 +2,10 @@
 Theme Similarity Computation for NobelLM RAG Pipeline
 
 This module provides similarity computation between query embeddings and theme keywords
-using the existing safe_faiss_scoring pattern for consistency and robustness.
+with a single matrix-vector product over the cached theme embedding matrix.
 
 Key Features:
-- Uses existing safe_faiss_scoring pattern for consistency
+- Vectorized scoring against a prebuilt (keywords x dim) theme matrix
 - Model-aware similarity computation
 - Configurable similarity thresholds
 - Comprehensive logging and validation
@@ -29,8 +29,8 @@ Author: NobelLM Team
 import logging
 import numpy as np
 from typing import Dict, List, Tuple, Optional
-from config.theme_embeddings import ThemeEmbeddings
-from rag.validation import safe_faiss_scoring, validate_embedding_vector
+from config.theme_embeddings import ThemeEmbeddings, get_theme_embeddings
+from rag.validation import validate_embedding_vector
 from rag.model_config import get_model_config
 
 logger = logging.getLogger(__name__)
@@ -39,12 +39,13 @@ def compute_theme_similarities(
     query_embedding: np.ndarray,
     model_id: str = "bge-large",
     similarity_threshold: float = 0.3,
-    max_results: Optional[int] = None
+    max_results: Optional[int] = None,
+    theme_embeddings: Optional[ThemeEmbeddings] = None
 ) -> Dict[str, float]:
     """
     Compute similarity scores between a query embedding and all theme keywords.
     
-    Uses the existing safe_faiss_scoring pattern for consistency and robustness.
+    Scores every keyword with one matrix-vector product against the cached theme matrix.
     Returns a dictionary mapping theme keywords to similarity scores.
     
     Args:
@@ -52,6 +53,8 @@ def compute_theme_similarities(
         model_id: Model identifier for theme embeddings
         similarity_threshold: Minimum similarity score to include (default: 0.3)
         max_results: Maximum number of results to return (default: None, return all)
+        theme_embeddings: ThemeEmbeddings to score against (default: the shared
+            instance for model_id)
         
     Returns:
         Dictionary mapping theme keywords to similarity scores
@@ -80,39 +83,33 @@ def compute_theme_similarities(
     
     try:
         # Load theme embeddings
-        theme_embeddings = ThemeEmbeddings(model_id)
-        all_embeddings = theme_embeddings.get_all_embeddings()
+        if theme_embeddings is None:
+            theme_embeddings = get_theme_embeddings(model_id)
+        keywords, theme_matrix = theme_embeddings.get_theme_matrix()
         
-        if not all_embeddings:
+        if not keywords:
             logger.warning("No theme embeddings available")
             return {}
         
-        # Extract keywords and embeddings
-        keywords = list(all_embeddings.keys())
-        embeddings = np.array(list(all_embeddings.values()), dtype=np.float32)
-        
         logger.info(f"Computing similarities for {len(keywords)} theme keywords")
         
-        # Use safe_faiss_scoring pattern for consistency
-        similarities = safe_faiss_scoring(
-            filtered_vectors=embeddings,
-            query_embedding=query_embedding.reshape(1, -1),
-            context="theme_similarity"
-        )
-        
-        # Create keyword -> score mapping
-        keyword_scores = {}
-        for keyword, score in zip(keywords, similarities):
-            if score >= similarity_threshold:
-                keyword_scores[keyword] = float(score)
-        
-        # Sort by score (descending) and apply max_results limit
-        sorted_items = sorted(keyword_scores.items(), key=lambda x: x[1], reverse=True)
-        
+        # One matrix-vector product scores every keyword
+        similarities = theme_matrix @ query_embedding.reshape(-1)
+        
+        # Keep scores above threshold, sorted by score (descending); the stable sort keeps
+        # keyword order among equal scores. Then apply max_results limit
+        above = np.flatnonzero(similarities >= similarity_threshold)
+        if max_results is not None and above.size > max_results:
+            # Partial selection: only keywords scoring at least the max_results-th best
+            # score need sorting (ties at the cut-off stay in, so order is unchanged)
+            cutoff = np.partition(similarities[above], above.size - max_results)[above.size - max_results]
+            above = above[similarities[above] >= cutoff]
+        order = above[np.argsort(-similarities[above], kind="stable")]
         if max_results is not None:
-            sorted_items = sorted_items[:max_results]
+            order = order[:max_results]
         
-        result = dict(sorted_items)
+        # One gather + tolist() converts all selected scores at once instead of per element
+        result = dict(zip([keywords[i] for i in order.tolist()], similarities[order].tolist()))
         
         logger.info(
             f"Theme similarity computation completed",
@@ -198,13 +195,14 @@ def get_similarity_stats(similarities: Dict[str, float]) -> Dict[str, any]:
             "median": 0.0
         }
     
-    scores = list(similarities.values())
+    # One array for all reductions, instead of converting the list for each statistic
+    scores = np.fromiter(similarities.values(), dtype=np.float64, count=len(similarities))
     
     return {
-        "count": len(scores),
-        "mean": float(np.mean(scores)),
-        "std": float(np.std(scores)),
-        "min": float(np.min(scores)),
-        "max": float(np.max(scores)),
+        "count": scores.size,
+        "mean": float(scores.mean()),
+        "std": float(scores.std()),
+        "min": float(scores.min()),
+        "max": float(scores.max()),
         "median": float(np.median(scores))
     } 
\ No newline at end of file
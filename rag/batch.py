@@ -0,0 +1,82 @@
+"""
+Batch execution helpers for the NobelLM RAG pipeline.
+
+answer_query() is synchronous and spends most of its time waiting on the
+embedding service and the LLM. This module runs many queries concurrently in
+worker threads, so a batch takes roughly as long as its slowest query plus
+queueing instead of the sum of all queries.
+
+Two limits are applied:
+1. At most max_concurrency queries are in flight at once
+2. Query starts are spaced so no more than rate_limit_per_min begin per minute
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+from rag.query_engine import answer_query
+from rag.logging_utils import get_module_logger, log_with_context
+
+logger = get_module_logger(__name__)
+
+
+async def answer_query_batch(
+    queries: Sequence[str],
+    model_id: Optional[str] = None,
+    max_concurrency: int = 10,
+    rate_limit_per_min: int = 100,
+    **answer_kwargs: Any
+) -> List[Dict[str, Any]]:
+    """
+    Answer several queries concurrently with answer_query().
+
+    Args:
+        queries: Query strings to answer
+        model_id: Optional model identifier passed through to answer_query()
+        max_concurrency: Maximum number of queries running at the same time
+        rate_limit_per_min: Maximum number of queries started per minute
+        **answer_kwargs: Extra keyword arguments for answer_query()
+            (score_threshold, min_return, max_return)
+
+    Returns:
+        List of answer_query() results, in the same order as queries.
+
+    Raises:
+        ValueError: If max_concurrency or rate_limit_per_min is not positive.
+        Any exception raised by answer_query() for one of the queries.
+    """
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be positive, got {max_concurrency}")
+    if rate_limit_per_min < 1:
+        raise ValueError(f"rate_limit_per_min must be positive, got {rate_limit_per_min}")
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    start_lock = asyncio.Lock()
+    start_interval = 60.0 / rate_limit_per_min
+    next_start = loop.time()
+
+    async def run_one(query: str) -> Dict[str, Any]:
+        nonlocal next_start
+        async with semaphore:
+            # Reserve the next start slot; waiting under the lock keeps starts evenly spaced
+            async with start_lock:
+                delay = next_start - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                next_start = max(next_start, loop.time()) + start_interval
+            return await asyncio.to_thread(answer_query, query, model_id=model_id, **answer_kwargs)
+
+    log_with_context(
+        logger,
+        logging.INFO,
+        "BatchQuery",
+        "Starting batch query execution",
+        {
+            "num_queries": len(queries),
+            "max_concurrency": max_concurrency,
+            "rate_limit_per_min": rate_limit_per_min
+        }
+    )
+    return list(await asyncio.gather(*(run_one(query) for query in queries)))
@@ -3,15 +3,22 @@ Dual-Process Retriever for NobelLM RAG
 
 Implements subprocess-based FAISS retrieval for Mac/Intel compatibility.
 This function is used when NOBELLM_USE_FAISS_SUBPROCESS=1 is set.
+
+Queries go to one long-lived faiss_query_worker process (started with --serve)
+over JSON lines on its stdin/stdout, so the model, index and metadata are loaded
+once per process rather than once per query.
 """
 import tempfile
 import os
+import atexit
+import selectors
 import subprocess
+import threading
+import time
 import json
 import numpy as np
 import logging
 import sys
-from sentence_transformers import SentenceTransformer
 from rag.model_config import get_model_config
 from rag.validation import validate_query_string, validate_filters, validate_retrieval_parameters, validate_model_id
 from typing import List, Dict, Any, Optional
@@ -21,6 +28,10 @@ logging.basicConfig(level=logging.INFO)
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for the worker's answer to one request (the first also loads the
+# model and index) before the worker is killed and the request fails
+WORKER_RESPONSE_TIMEOUT = 120.0
+
 def validate_subprocess_inputs(
     query: str,
     model_id: str,
@@ -57,27 +68,140 @@ def validate_subprocess_inputs(
     validate_filters(filters, context="subprocess_filters")
 
 
-def handle_worker_failures(result: subprocess.CompletedProcess) -> None:
+class FaissWorkerClient:
     """
-    Handle subprocess failures with detailed error information.
-    
-    Args:
-        result: CompletedProcess result from subprocess.run()
-        
+    Handle to a long-lived FAISS worker subprocess.
+
+    Requests are serialized with a lock, since the worker answers one JSON line at
+    a time, so concurrent callers (e.g. answer_query_batch threads) wait their turn.
+    A worker that has exited is restarted on the next request, and a request whose
+    worker dies before answering is retried once on a fresh worker. A worker that
+    does not answer within the timeout is killed and the request fails.
+    """
+
+    def __init__(self, worker_path: Path, timeout: float = WORKER_RESPONSE_TIMEOUT):
+        self.worker_path = worker_path
+        self.timeout = timeout
+        self._process: Optional[subprocess.Popen] = None
+        # Bytes read from the worker past the last returned line
+        self._pending = b""
+        self._lock = threading.Lock()
+
+    def _start(self) -> None:
+        cmd = [sys.executable, str(self.worker_path), "--serve"]
+        logger.info(f"[DualProcess] Starting worker with command: {' '.join(cmd)}")
+        self._pending = b""
+        # stderr is inherited so worker logs reach ours and can never fill a pipe
+        self._process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE
+        )
+
+    def _read_line(self) -> bytes:
+        """
+        Read one response line from the worker's stdout, or b"" at EOF.
+
+        Reads the pipe directly so the wait can be bounded by self.timeout.
+
+        Raises:
+            TimeoutError: If no complete line arrives within self.timeout
+        """
+        stdout = self._process.stdout
+        deadline = time.monotonic() + self.timeout
+        data = self._pending
+        with selectors.DefaultSelector() as selector:
+            selector.register(stdout, selectors.EVENT_READ)
+            while b"\n" not in data:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not selector.select(remaining):
+                    raise TimeoutError(f"FAISS worker did not respond within {self.timeout}s")
+                chunk = os.read(stdout.fileno(), 65536)
+                if not chunk:
+                    return b""
+                data += chunk
+        line, _, self._pending = data.partition(b"\n")
+        return line + b"\n"
+
+    def request(self, payload: Dict[str, Any]) -> Any:
+        """
+        Send one request to the worker and return its "chunks" result.
+
+        Raises:
+            RuntimeError: If the worker fails, times out, exits without answering
+                or returns invalid JSON
+        """
+        message = (json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            for attempt in range(2):
+                if self._process is None or self._process.poll() is not None:
+                    self._start()
+                try:
+                    self._process.stdin.write(message)
+                    self._process.stdin.flush()
+                    line = self._read_line()
+                except TimeoutError as e:
+                    logger.error(f"[DualProcess] {e}, killing worker")
+                    self._process.kill()
+                    self._process.wait()
+                    self._process = None
+                    raise RuntimeError(str(e))
+                except OSError as e:
+                    logger.warning(f"[DualProcess] Lost connection to worker: {e}")
+                    line = b""
+                if line:
+                    break
+                returncode = self._process.wait()
+                logger.error(f"[DualProcess] FAISS worker exited with return code {returncode}")
+                self._process = None
+            else:
+                raise RuntimeError(f"FAISS worker exited with return code {returncode} without responding")
+
+        line = line.decode("utf-8", errors="replace")
+        try:
+            response = json.loads(line)
+        except json.JSONDecodeError as e:
+            logger.error(f"[DualProcess] Failed to parse worker output: {e}")
+            logger.error(f"[DualProcess] Raw output: {line}")
+            raise RuntimeError(f"Failed to parse worker output: {e}")
+        if "error" in response:
+            logger.error(f"[DualProcess] Worker request failed: {response['error']}")
+            raise RuntimeError(f"FAISS worker failed: {response['error']}")
+        return response["chunks"]
+
+    def close(self) -> None:
+        """Stop the worker by closing its stdin, killing it if it does not exit."""
+        with self._lock:
+            process, self._process = self._process, None
+        if process is None or process.poll() is not None:
+            return
+        process.stdin.close()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+_worker: Optional[FaissWorkerClient] = None
+_worker_lock = threading.Lock()
+
+
+def get_faiss_worker() -> FaissWorkerClient:
+    """
+    Get the process-wide FAISS worker client, creating it on first use.
+
     Raises:
-        RuntimeError: With detailed error information
+        FileNotFoundError: If worker script is missing
     """
-    if result.returncode != 0:
-        error_msg = f"FAISS worker failed with return code {result.returncode}"
-        
-        if result.stderr:
-            error_msg += f"\nStderr: {result.stderr}"
-        
-        if result.stdout:
-            error_msg += f"\nStdout: {result.stdout}"
-        
-        logger.error(f"[DualProcess] {error_msg}")
-        raise RuntimeError(error_msg)
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            worker_path = Path(__file__).parent / "faiss_query_worker.py"
+            if not worker_path.exists():
+                raise FileNotFoundError(f"Worker script not found at {worker_path}")
+            _worker = FaissWorkerClient(worker_path)
+            atexit.register(_worker.close)
+        return _worker
 
 
 def retrieve_chunks_dual_process(
@@ -121,67 +245,86 @@ def retrieve_chunks_dual_process(
         max_return=max_return
     )
     
-    # Get the path to the worker script
-    worker_path = Path(__file__).parent / "faiss_query_worker.py"
-    if not worker_path.exists():
-        raise FileNotFoundError(f"Worker script not found at {worker_path}")
-
-    # Build command with all parameters
-    cmd = [
-        sys.executable,
-        str(worker_path),
-        "--query", query,
-        "--top_k", str(top_k),
-        "--score_threshold", str(score_threshold),
-        "--min_return", str(min_return)
-    ]
-    if model_id:
-        cmd.extend(["--model_id", model_id])
-    if max_return:
-        cmd.extend(["--max_return", str(max_return)])
-    if filters:
-        cmd.extend(["--filters", json.dumps(filters)])
-
-    # Run worker in subprocess
-    logger.info(f"[DualProcess] Running worker with command: {' '.join(cmd)}")
-    try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=False  # Don't raise exception, handle it manually
+    chunks = get_faiss_worker().request({
+        "query": query,
+        "model_id": model_id,
+        "top_k": top_k,
+        "filters": filters,
+        "score_threshold": score_threshold,
+        "min_return": min_return,
+        "max_return": max_return
+    })
+
+    # Log score distribution
+    if chunks:
+        scores = [c["score"] for c in chunks]
+        logger.info(
+            f"[DualProcess] Retrieved {len(chunks)} chunks — "
+            f"mean score: {np.mean(scores):.3f}, stddev: {np.std(scores):.3f}, "
+            f"min: {min(scores):.3f}, max: {max(scores):.3f}"
         )
-        
-        # Handle subprocess failures
-        handle_worker_failures(result)
-        
-        # Parse JSON output
-        try:
-            chunks = json.loads(result.stdout)
-        except json.JSONDecodeError as e:
-            logger.error(f"[DualProcess] Failed to parse worker output: {e}")
-            logger.error(f"[DualProcess] Raw output: {result.stdout}")
-            raise RuntimeError(f"Failed to parse worker output: {e}")
-        
-        # Log score distribution
-        if chunks:
-            scores = [c["score"] for c in chunks]
-            logger.info(
-                f"[DualProcess] Retrieved {len(chunks)} chunks — "
-                f"mean score: {np.mean(scores):.3f}, stddev: {np.std(scores):.3f}, "
-                f"min: {min(scores):.3f}, max: {max(scores):.3f}"
-            )
-        else:
-            logger.warning("[DualProcess] No chunks returned from worker")
-            
-        return chunks
-        
-    except subprocess.TimeoutExpired as e:
-        logger.error(f"[DualProcess] Worker timed out: {e}")
-        raise RuntimeError(f"FAISS worker timed out: {e}")
-    except FileNotFoundError as e:
-        logger.error(f"[DualProcess] Worker script not found: {e}")
-        raise FileNotFoundError(f"FAISS worker script not found: {e}")
-    except Exception as e:
-        logger.error(f"[DualProcess] Unexpected error running worker: {e}")
-        raise RuntimeError(f"Unexpected error running FAISS worker: {e}") 
\ No newline at end of file
+    else:
+        logger.warning("[DualProcess] No chunks returned from worker")
+
+    return chunks
+
+
+def retrieve_chunks_dual_process_batch(
+    queries: List[str],
+    model_id: str = None,
+    top_k: int = 5,
+    score_threshold: float = 0.2,
+    min_return: int = 3,
+    max_return: Optional[int] = None
+) -> List[List[Dict[str, Any]]]:
+    """
+    Retrieve chunks for several unfiltered queries in a single worker request.
+    The worker encodes all queries in one model call and runs one batched FAISS
+    search instead of one search per query. Use retrieve_chunks_dual_process for
+    filtered queries.
+
+    Args:
+        queries: The query strings
+        model_id: Optional model identifier
+        top_k: Number of chunks to retrieve per query (default: 5)
+        score_threshold: Minimum similarity score (default: 0.2)
+        min_return: Minimum number of chunks to return per query (default: 3)
+        max_return: Optional maximum number of chunks to return per query
+
+    Returns:
+        One list of chunks per query, in input order
+
+    Raises:
+        ValueError: If inputs are invalid
+        RuntimeError: If subprocess fails
+        FileNotFoundError: If worker script is missing
+    """
+    if not queries:
+        return []
+
+    for query in queries:
+        validate_subprocess_inputs(
+            query=query,
+            model_id=model_id or "bge-large",
+            top_k=top_k,
+            filters=None,
+            score_threshold=score_threshold,
+            min_return=min_return,
+            max_return=max_return
+        )
+
+    batch_chunks = get_faiss_worker().request({
+        "queries": list(queries),
+        "model_id": model_id,
+        "top_k": top_k,
+        "score_threshold": score_threshold,
+        "min_return": min_return,
+        "max_return": max_return
+    })
+    if len(batch_chunks) != len(queries):
+        raise RuntimeError(
+            f"FAISS worker returned {len(batch_chunks)} result lists for {len(queries)} queries"
+        )
+    logger.info(f"[DualProcess] Retrieved chunks per query: {[len(c) for c in batch_chunks]}")
+    return batch_chunks
+
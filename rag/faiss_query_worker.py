@@ -1,4 +1,5 @@
 # ---- Import global threading configuration ----
+import io
 import sys
 import os
 from pathlib import Path
@@ -24,17 +25,18 @@ FAISS Worker for Subprocess-Based RAG Retrieval (Tempdir Version)
 Loads a query embedding, runs FAISS search, and saves results.
 Uses a temp directory for safe concurrent execution.
 Supports metadata filtering via --filters argument (JSON file).
+With --serve, stays alive and answers one JSON request per stdin line, so the
+model, index and metadata are loaded once for many queries.
 """
 
 import numpy as np
 import json
 import argparse
 import logging
-from rag.retriever import query_index
+from rag.retriever import query_index, query_index_batch
 from typing import Dict, Any, List, Optional
 from rag.cache import get_model
 from rag.model_config import get_model_config, DEFAULT_MODEL_ID
-from rag.utils import filter_top_chunks
 
 # Configure logging to use stderr for all diagnostic output
 logging.basicConfig(level=logging.INFO, stream=sys.stderr)
@@ -66,6 +68,33 @@ def main(
     Returns:
         List of chunks, filtered by score threshold
     """
+    filtered_chunks = run_query(
+        query,
+        model_id=model_id,
+        top_k=top_k,
+        filters=filters,
+        score_threshold=score_threshold,
+        min_return=min_return,
+        max_return=max_return
+    )
+
+    # Output results as JSON to stdout (only this should go to stdout)
+    print(json.dumps(filtered_chunks, ensure_ascii=False))
+    return filtered_chunks
+
+def run_query(
+    query: str,
+    model_id: str = None,
+    top_k: int = 5,
+    filters: Dict[str, Any] = None,
+    score_threshold: float = 0.2,
+    min_return: int = 3,
+    max_return: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Embed one query, search the index and filter the hits; see main for arguments.
+    Hits are filtered once, by query_index, as run_query_batch does.
+    """
     # Get model config
     model_id = model_id or DEFAULT_MODEL_ID
     config = get_model_config(model_id)
@@ -81,31 +110,133 @@ def main(
     query_embedding = model.encode([query], normalize_embeddings=True)[0]
     logger.info(f"[Worker] Query embedding shape: {query_embedding.shape}")
 
-    # Query index
-    chunks = query_index(
+    # Query index; applies the score threshold and min/max return filtering
+    filtered_chunks = query_index(
         query_embedding,
         model_id=model_id,
         top_k=top_k,
-        filters=filters
+        filters=filters,
+        score_threshold=score_threshold,
+        min_return=min_return,
+        max_return=max_return
     )
-    logger.info(f"[Worker] Retrieved {len(chunks)} chunks before filtering")
+    logger.info(f"[Worker] Final filtered chunks: {len(filtered_chunks)}")
+    return filtered_chunks
+
+def main_batch(
+    queries: List[str],
+    model_id: str = None,
+    top_k: int = 5,
+    score_threshold: float = 0.2,
+    min_return: int = 3,
+    max_return: Optional[int] = None
+) -> List[List[Dict[str, Any]]]:
+    """
+    Worker entry point for several unfiltered queries at once.
+
+    Encodes all queries in one model call and runs a single batched FAISS search
+    over the stacked (B, d) matrix instead of one search per query.
 
-    # Apply consistent filtering
-    filtered_chunks = filter_top_chunks(
-        chunks,
+    Args:
+        queries: The query strings
+        model_id: Optional model identifier
+        top_k: Number of chunks to retrieve per query (default: 5)
+        score_threshold: Minimum similarity score (default: 0.2)
+        min_return: Minimum number of chunks to return per query (default: 3)
+        max_return: Optional maximum number of chunks to return per query
+
+    Returns:
+        One list of filtered chunks per query, in input order
+    """
+    filtered_batch = run_query_batch(
+        queries,
+        model_id=model_id,
+        top_k=top_k,
         score_threshold=score_threshold,
         min_return=min_return,
         max_return=max_return
     )
-    logger.info(f"[Worker] Final filtered chunks: {len(filtered_chunks)}")
 
-    # Output results as JSON to stdout (only this should go to stdout)
-    print(json.dumps(filtered_chunks, ensure_ascii=False))
-    return filtered_chunks
+    print(json.dumps(filtered_batch, ensure_ascii=False))
+    return filtered_batch
+
+def run_query_batch(
+    queries: List[str],
+    model_id: str = None,
+    top_k: int = 5,
+    score_threshold: float = 0.2,
+    min_return: int = 3,
+    max_return: Optional[int] = None
+) -> List[List[Dict[str, Any]]]:
+    """Embed several unfiltered queries in one call and search them together; see main_batch."""
+    model_id = model_id or DEFAULT_MODEL_ID
+    config = get_model_config(model_id)
+    if not config:
+        raise ValueError(f"No config found for model_id: {model_id}")
+
+    model = get_model(model_id)
+    query_embeddings = model.encode(queries, normalize_embeddings=True)
+    logger.info(f"[Worker] Batch query embeddings shape: {query_embeddings.shape}")
+
+    filtered_batch = query_index_batch(
+        query_embeddings,
+        model_id=model_id,
+        top_k=top_k,
+        score_threshold=score_threshold,
+        min_return=min_return,
+        max_return=max_return
+    )
+    logger.info(f"[Worker] Final filtered chunks per query: {[len(c) for c in filtered_batch]}")
+    return filtered_batch
+
+def serve(stdin=None, stdout=None) -> None:
+    """
+    Answer JSON-line requests until stdin closes.
+
+    Each request is a JSON object with the keyword arguments of run_query, or of
+    run_query_batch when it has a "queries" list. Each response is one line:
+    {"chunks": ...} on success or {"error": "..."} on failure. Anything else the
+    process prints is sent to stderr so it cannot corrupt the response stream.
+
+    The protocol is UTF-8 on both sides, so by default the process's standard
+    streams are read and written as UTF-8 whatever the locale encoding is.
+    """
+    wrapped = []
+    if stdin is None:
+        stdin = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8")
+        wrapped.append(stdin)
+    if stdout is None:
+        stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
+        wrapped.append(stdout)
+    original_stdout, sys.stdout = sys.stdout, sys.stderr
+    logger.info("[Worker] Serving requests on stdin")
+    try:
+        for line in stdin:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if "queries" in request:
+                    response = {"chunks": run_query_batch(**request)}
+                else:
+                    response = {"chunks": run_query(**request)}
+            except Exception as e:
+                logger.error(f"[Worker] Request failed: {e}")
+                response = {"error": f"{type(e).__name__}: {e}"}
+            stdout.write(json.dumps(response, ensure_ascii=False) + "\n")
+            stdout.flush()
+    finally:
+        sys.stdout = original_stdout
+        # Leave the underlying binary streams open for the rest of the process
+        for stream in wrapped:
+            stream.detach()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="FAISS query worker")
-    parser.add_argument("--query", required=True, help="Query string")
+    query_group = parser.add_mutually_exclusive_group(required=True)
+    query_group.add_argument("--query", help="Query string")
+    query_group.add_argument("--queries", type=json.loads, help="JSON list of query strings (batched, unfiltered)")
+    query_group.add_argument("--serve", action="store_true", help="Answer JSON-line requests on stdin until it closes")
     parser.add_argument("--model_id", help="Model identifier")
     parser.add_argument("--top_k", type=int, default=5, help="Number of chunks to retrieve")
     parser.add_argument("--filters", type=json.loads, help="JSON string of metadata filters")
@@ -113,13 +244,27 @@ if __name__ == "__main__":
     parser.add_argument("--min_return", type=int, default=3, help="Minimum number of chunks to return")
     parser.add_argument("--max_return", type=int, help="Maximum number of chunks to return")
     args = parser.parse_args()
+    if args.queries is not None and args.filters is not None:
+        parser.error("--filters is not supported with --queries; use --query for filtered queries")
 
-    main(
-        query=args.query,
-        model_id=args.model_id,
-        top_k=args.top_k,
-        filters=args.filters,
-        score_threshold=args.score_threshold,
-        min_return=args.min_return,
-        max_return=args.max_return
-    )
+    if args.serve:
+        serve()
+    elif args.queries is not None:
+        main_batch(
+            queries=args.queries,
+            model_id=args.model_id,
+            top_k=args.top_k,
+            score_threshold=args.score_threshold,
+            min_return=args.min_return,
+            max_return=args.max_return
+        )
+    else:
+        main(
+            query=args.query,
+            model_id=args.model_id,
+            top_k=args.top_k,
+            filters=args.filters,
+            score_threshold=args.score_threshold,
+            min_return=args.min_return,
+            max_return=args.max_return
+        )
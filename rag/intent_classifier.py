@@ -9,15 +9,43 @@ Classifies user queries as factual, thematic, or generative, and detects if a th
 - Uses configurable keywords with confidence scoring.
 - Supports lemmatization for robust matching.
 """
+import asyncio
+import os
 import re
 import json
 import logging
-from typing import List, Optional, Dict, Any
-from dataclasses import dataclass
+import unicodedata
+from functools import lru_cache
+from typing import FrozenSet, List, Optional, Dict, Any, Tuple
+from dataclasses import dataclass, replace
 
-@dataclass
+# Number of distinct queries whose classification each IntentClassifier remembers
+CLASSIFY_CACHE_SIZE = 1024
+
+# Maximal runs of word characters; a keyword matches \bkeyword\b exactly when it is one of them
+_WORD_RE = re.compile(r'\w+')
+
+@lru_cache(maxsize=64)
+def _word_set(text: str) -> FrozenSet[str]:
+    """
+    The distinct word-character runs of text. Cached, so keyword matching and laureate
+    detection tokenize the same normalized query only once.
+    """
+    return frozenset(_WORD_RE.findall(text))
+
+def _normalize_text(text: str) -> str:
+    """NFKC-normalize and casefold text, so queries and laureate names compare alike."""
+    return unicodedata.normalize("NFKC", text).casefold()
+
+@dataclass(frozen=True, slots=True)
 class IntentResult:
-    """Structured result from intent classification."""
+    """
+    Structured result from intent classification.
+    
+    Frozen and slotted: fields cannot be reassigned and instances carry no per-object
+    __dict__. The list and dict fields stay mutable; classify() hands out copies of
+    its cached results, so changing them never leaks into later calls.
+    """
     intent: str
     confidence: float
     matched_terms: List[str]
@@ -29,12 +57,40 @@ class IntentResult:
     subtype_confidence: Optional[float] = None
     subtype_cues: Optional[List[str]] = None
 
+def _copy_result(result: IntentResult) -> IntentResult:
+    """
+    Copy the mutable containers of a cached IntentResult, one level deep, keeping
+    the decision trace's lists the same objects as the matching fields.
+    """
+    matched_terms = list(result.matched_terms)
+    subtype_cues = list(result.subtype_cues) if result.subtype_cues is not None else None
+    decision_trace = dict(result.decision_trace)
+    decision_trace["pattern_scores"] = dict(decision_trace["pattern_scores"])
+    decision_trace["matched_patterns"] = matched_terms
+    decision_trace["subtype_cues"] = subtype_cues
+    return replace(
+        result,
+        matched_terms=matched_terms,
+        scoped_entities=list(result.scoped_entities),
+        decision_trace=decision_trace,
+        subtype_cues=subtype_cues
+    )
+
 class IntentClassifier:
     """
     Classifies the intent of a user query (e.g., factual, thematic, generative).
     Returns a structured IntentResult with confidence scoring and matched terms.
+    
+    Classifiers built from the same unchanged files share one loaded state, so their
+    config, patterns and laureate name lists are the same objects and must not be mutated.
     """
     
+    # Loaded state (names, config, lemmatizer, compiled patterns) keyed by the absolute
+    # path and mtime of both files (None when missing), so every classifier built from
+    # the same files shares one copy instead of re-reading JSON and reloading spaCy,
+    # while an edited, created or deleted file is loaded again.
+    _state_cache: Dict[Tuple[str, Optional[float], str, Optional[float]], Dict[str, Any]] = {}
+
     def __init__(self, laureate_names_path: str = "config/nobel_literature.json", config_path: str = "config/intent_keywords.json"):
         """
         Initialize the IntentClassifier.
@@ -43,8 +99,75 @@ class IntentClassifier:
             laureate_names_path: Path to Nobel literature metadata JSON
             config_path: Path to intent keywords configuration JSON
         """
-        self.laureate_full_names, self.laureate_last_names = self._load_laureate_names(laureate_names_path)
-        self.config = self._load_config(config_path)
+        key = (
+            os.path.abspath(laureate_names_path), self._file_mtime(laureate_names_path),
+            os.path.abspath(config_path), self._file_mtime(config_path)
+        )
+        state = IntentClassifier._state_cache.get(key)
+        if state is None:
+            self._load_state(laureate_names_path, config_path)
+            # Drop state loaded from older versions of the same files
+            IntentClassifier._state_cache = {
+                k: v for k, v in IntentClassifier._state_cache.items()
+                if (k[0], k[2]) != (key[0], key[2])
+            }
+            IntentClassifier._state_cache[key] = dict(self.__dict__)
+        else:
+            self.__dict__.update(state)
+        self._init_caches()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], laureate_full_names: Optional[List[str]] = None) -> "IntentClassifier":
+        """
+        Build a classifier from an in-memory config instead of JSON files.
+        
+        Args:
+            config: Intent config with the same structure as config/intent_keywords.json
+            laureate_full_names: Laureate full names to detect; loaded from the default
+                metadata JSON when None
+            
+        Returns:
+            A new IntentClassifier (not added to the shared state cache)
+        """
+        classifier = cls.__new__(cls)
+        if laureate_full_names is None:
+            names = classifier._load_laureate_names("config/nobel_literature.json")
+        else:
+            names = cls._sorted_name_lists(laureate_full_names)
+        classifier._build_state(names, config)
+        classifier._init_caches()
+        return classifier
+
+    def _init_caches(self):
+        """Create the per-instance query caches."""
+        # classify() is a pure function of the query and the loaded config, so repeated
+        # queries are answered from a per-instance LRU cache
+        self._classify_cached = lru_cache(maxsize=CLASSIFY_CACHE_SIZE)(self._classify_uncached)
+        # Scoring and matched-term lookup share one preprocessing pass per query
+        self._match_terms_cached = lru_cache(maxsize=8)(self._match_terms)
+
+    @staticmethod
+    def _file_mtime(path: str) -> Optional[float]:
+        """Modification time of path, or None if it does not exist."""
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return None
+
+    @classmethod
+    def clear_state_cache(cls):
+        """Drop cached state so the next classifier re-reads its config and laureate files."""
+        cls._state_cache.clear()
+
+    def _load_state(self, laureate_names_path: str, config_path: str):
+        """Load laureate names and config from disk, then build the matching state."""
+        self._build_state(self._load_laureate_names(laureate_names_path), self._load_config(config_path))
+
+    def _build_state(self, names: Tuple[List[str], List[str]], config: Dict[str, Any]):
+        """Set laureate names and config, set up lemmatization and compile patterns."""
+        self.laureate_full_names, self.laureate_last_names = names
+        self._compile_laureate_patterns()
+        self.config = config
         self.use_lemmatization = self._setup_lemmatization()
         
         # Compile patterns for performance
@@ -104,54 +227,76 @@ class IntentClassifier:
             return False
     
     def _compile_patterns(self):
-        """Compile regex patterns for performance."""
+        """
+        Precompute per-intent keyword and phrase tables.
+
+        Plain-word keywords are matched by set lookup against the query's words, which
+        is equivalent to a word-bounded regex; any other single-token keyword keeps a
+        compiled pattern. Multi-word keywords are ignored as before. Each entry carries
+        its config weight, so scoring never goes back to the config dicts.
+        """
         self.patterns = {}
+        self._max_keyword_weight = {}
         for intent, intent_config in self.config["intents"].items():
-            # Compile keyword patterns
-            keyword_patterns = []
-            for keyword in intent_config["keywords"].keys():
+            keywords = []
+            for keyword, weight in intent_config["keywords"].items():
                 if ' ' not in keyword:  # Single word keywords
-                    keyword_patterns.append(re.compile(rf'\b{re.escape(keyword)}\b', re.IGNORECASE))
-            
-            # Store phrases separately (no compilation needed)
-            phrases = list(intent_config["phrases"].keys())
+                    lowered = keyword.lower()
+                    pattern = None if _WORD_RE.fullmatch(lowered) else re.compile(rf'\b{re.escape(keyword)}\b', re.IGNORECASE)
+                    keywords.append((keyword, lowered, pattern, weight))
             
             self.patterns[intent] = {
-                "keyword_patterns": keyword_patterns,
-                "phrases": phrases
+                "keywords": tuple(keywords),
+                "phrases": tuple(intent_config["phrases"].items())
             }
+            self._max_keyword_weight[intent] = max(intent_config["keywords"].values(), default=0.0)
+
+    def _compile_laureate_patterns(self):
+        """
+        Index last names for single-pass lookup.
+
+        Last names that are one plain word are found by set lookup against the query's
+        words, which is equivalent to a word-bounded regex; the rest (e.g. O'Neill)
+        share one word-bounded alternation so a query is scanned once.
+        """
+        self._full_names_normalized = tuple((name, _normalize_text(name)) for name in self.laureate_full_names)
+        self._last_name_rank = {last: i for i, last in enumerate(self.laureate_last_names)}
+        self._last_names_by_lower = {}
+        for last in self.laureate_last_names:
+            self._last_names_by_lower.setdefault(_normalize_text(last), []).append(last)
+        self._plain_last_names = frozenset(n for n in self._last_names_by_lower if _WORD_RE.fullmatch(n))
+        other_last_names = [n for n in self._last_names_by_lower if n not in self._plain_last_names]
+        if other_last_names:
+            # Longest first, so the longest last name wins where several start at the same position
+            alternation = "|".join(re.escape(last) for last in sorted(other_last_names, key=lambda n: -len(n)))
+            self._last_name_pattern = re.compile(rf'\b(?:{alternation})\b')
+        else:
+            self._last_name_pattern = None
+
+    @staticmethod
+    def _sorted_name_lists(names) -> Tuple[List[str], List[str]]:
+        """Distinct full names and last names, each sorted by length descending for greedy match."""
+        full_names = {name for name in names if name}
+        last_names = {name.split()[-1] for name in full_names}
+        return (sorted(full_names, key=lambda n: -len(n)), sorted(last_names, key=lambda n: -len(n)))
 
     def _load_laureate_names(self, path: str):
         """Load all laureate full names and last names from the Nobel literature metadata JSON."""
         try:
             with open(path, "r", encoding="utf-8") as f:
                 data = json.load(f)
-            full_names = set()
-            last_names = set()
-            for year in data:
-                for laureate in year.get("laureates", []):
-                    name = laureate.get("full_name")
-                    if name:
-                        full_names.add(name)
-                        last = name.split()[-1]
-                        last_names.add(last)
-            # Sort by length descending for greedy match
-            return (sorted(full_names, key=lambda n: -len(n)), sorted(last_names, key=lambda n: -len(n)))
+            return self._sorted_name_lists(
+                laureate.get("full_name") for year in data for laureate in year.get("laureates", [])
+            )
         except Exception as e:
             logging.warning(f"Could not load laureate names: {e}")
             # Create fallback data with common Nobel laureates for testing
             fallback_data = self._create_fallback_laureate_data()
-            full_names = set()
-            last_names = set()
-            for year in fallback_data:
-                for laureate in year.get("laureates", []):
-                    name = laureate.get("full_name")
-                    if name:
-                        full_names.add(name)
-                        last = name.split()[-1]
-                        last_names.add(last)
+            full_names, last_names = self._sorted_name_lists(
+                laureate.get("full_name") for year in fallback_data for laureate in year.get("laureates", [])
+            )
             logging.info(f"Using fallback laureate data with {len(full_names)} names")
-            return (sorted(full_names, key=lambda n: -len(n)), sorted(last_names, key=lambda n: -len(n)))
+            return (full_names, last_names)
     
     def _create_fallback_laureate_data(self):
         """Create minimal fallback data for testing when nobel_literature.json is missing."""
@@ -204,37 +349,50 @@ class IntentClassifier:
             # Fallback to basic lowercase
             return query.lower()
 
-    def _compute_pattern_scores(self, query: str) -> Dict[str, float]:
+    def _match_terms(self, query: str) -> Dict[str, Tuple[List[str], List[str], float]]:
         """
-        Compute pattern scores for each intent.
+        Match every intent's keywords and phrases against the query in one pass.
         
         Args:
             query: The user query string
             
         Returns:
-            Dictionary mapping intent to score
+            Dictionary mapping intent to (matched keywords, matched phrases, summed weight),
+            terms in config order
         """
         processed_query = self._preprocess_query(query)
-        intent_scores = {}
-        
-        for intent, intent_config in self.config["intents"].items():
+        words = _word_set(processed_query.lower())
+        matched = {}
+        for intent, intent_patterns in self.patterns.items():
+            keywords = []
+            phrases = []
             score = 0.0
-            
-            # Check keyword patterns
-            for pattern in self.patterns[intent]["keyword_patterns"]:
-                if pattern.search(processed_query):
-                    keyword = pattern.pattern.replace(r'\b', '').replace(r'\b', '')
-                    score += intent_config["keywords"].get(keyword, 0.0)
-            
-            # Check phrases
-            for phrase in self.patterns[intent]["phrases"]:
+            for keyword, lowered, pattern, weight in intent_patterns["keywords"]:
+                if lowered in words if pattern is None else pattern.search(processed_query):
+                    keywords.append(keyword)
+                    score += weight
+            for phrase, weight in intent_patterns["phrases"]:
                 if phrase in processed_query:
-                    score += intent_config["phrases"].get(phrase, 0.0)
-            
-            if score > 0:
-                intent_scores[intent] = score
+                    phrases.append(phrase)
+                    score += weight
+            matched[intent] = (keywords, phrases, score)
+        return matched
+
+    def _compute_pattern_scores(self, query: str) -> Dict[str, float]:
+        """
+        Compute pattern scores for each intent.
         
-        return intent_scores
+        Args:
+            query: The user query string
+            
+        Returns:
+            Dictionary mapping intent to score
+        """
+        return {
+            intent: score
+            for intent, (_, _, score) in self._match_terms_cached(query).items()
+            if score > 0
+        }
 
     def _get_matched_terms(self, query: str, intent: str) -> List[str]:
         """
@@ -247,24 +405,8 @@ class IntentClassifier:
         Returns:
             List of matched terms
         """
-        processed_query = self._preprocess_query(query)
-        matched_terms = []
-        
-        intent_config = self.config["intents"][intent]
-        
-        # Check keywords
-        for keyword in intent_config["keywords"].keys():
-            if ' ' not in keyword:  # Single word
-                pattern = re.compile(rf'\b{re.escape(keyword)}\b', re.IGNORECASE)
-                if pattern.search(processed_query):
-                    matched_terms.append(keyword)
-        
-        # Check phrases
-        for phrase in intent_config["phrases"].keys():
-            if phrase in processed_query:
-                matched_terms.append(phrase)
-        
-        return matched_terms
+        keywords, phrases, _ = self._match_terms_cached(query)[intent]
+        return keywords + phrases
 
     def compute_hybrid_confidence(self, query: str, intent_scores: Dict[str, float]) -> float:
         """
@@ -282,8 +424,7 @@ class IntentClassifier:
         
         # Pattern-based score (0.0 to 1.0)
         max_score = max(intent_scores.values())
-        total_possible = sum(max(self.config["intents"][intent]["keywords"].values()) 
-                            for intent in intent_scores)
+        total_possible = sum(self._max_keyword_weight[intent] for intent in intent_scores)
         pattern_score = max_score / total_possible if total_possible > 0 else 0.0
         
         # Ambiguity penalty (0.0 to 1.0)
@@ -329,22 +470,27 @@ class IntentClassifier:
         Find all laureate matches in query, not just the first one.
         
         Args:
-            query: The user query string
+            query: The query, already normalized with _normalize_text
             
         Returns:
             List of found laureate names
         """
         found_laureates = []
-        q = query.lower()
         
         # Check full names first (more specific)
-        for name in self.laureate_full_names:
-            if name.lower() in q:
+        for name, normalized_name in self._full_names_normalized:
+            if normalized_name in query:
                 found_laureates.append(name)
         
-        # Check last names (less specific, but still valid)
-        for last in self.laureate_last_names:
-            if re.search(rf'\b{re.escape(last.lower())}\b', q):
+        # Check last names (less specific, but still valid) against the query's words,
+        # then the few multi-token last names with a single regex scan
+        matched_lower = set(self._plain_last_names.intersection(_word_set(query)))
+        if self._last_name_pattern is not None:
+            matched_lower.update(m.group(0) for m in self._last_name_pattern.finditer(query))
+        if matched_lower:
+            matched = {last for lower in matched_lower for last in self._last_names_by_lower[lower]}
+            # Keep the longest-first order of laureate_last_names
+            for last in sorted(matched, key=self._last_name_rank.__getitem__):
                 # Only add if not already found as full name
                 if last not in found_laureates:
                     found_laureates.append(last)
@@ -365,7 +511,7 @@ class IntentClassifier:
         - exploratory: Contextual, explanatory responses
         
         Args:
-            query: The user query string
+            query: The query, already normalized with _normalize_text
             
         Returns:
             Tuple of (subtype, confidence, cues) where:
@@ -373,7 +519,6 @@ class IntentClassifier:
             - confidence: confidence score (0.0-1.0) or None
             - cues: list of keywords that triggered detection or None
         """
-        query_lower = query.lower()
         cues = []
         max_confidence = 0.0
         detected_subtype = None
@@ -415,7 +560,7 @@ class IntentClassifier:
             confidence = 0.0
             
             for pattern in patterns:
-                if pattern in query_lower:
+                if pattern in query:
                     subtype_cues.append(pattern)
                     confidence += 0.3  # Base confidence per match
             
@@ -424,11 +569,11 @@ class IntentClassifier:
                 confidence += 0.2
             
             # Check for strong indicators
-            if any(strong_indicator in query_lower for strong_indicator in ["synthesize", "compare", "list", "context"]):
+            if any(strong_indicator in query for strong_indicator in ["synthesize", "compare", "list", "context"]):
                 confidence += 0.3
             
             # Enhanced synthesis detection using flexible subject+verb matching
-            if subtype == "synthesis" and matches_synthesis_frame(query_lower):
+            if subtype == "synthesis" and matches_synthesis_frame(query):
                 subtype_cues.append("synthesis_frame_match")
                 confidence += 0.3
             
@@ -448,6 +593,10 @@ class IntentClassifier:
         """
         Classify query with hybrid confidence scoring and multiple laureate support.
         
+        Results are cached per classifier, so the same query is scored only once.
+        Each call returns the cached IntentResult with its lists and decision trace
+        copied, so callers may change them without affecting later calls.
+        
         Args:
             query: The user query string
             
@@ -457,10 +606,51 @@ class IntentClassifier:
         Raises:
             ValueError: If no intent can be determined and no fallback is available
         """
+        return _copy_result(self._classify_cached(query))
+
+    def classify_many(self, queries: List[str]) -> List[IntentResult]:
+        """
+        Classify several queries, lemmatizing all of them in one spaCy pass first.
+        
+        Args:
+            queries: The user query strings
+            
+        Returns:
+            One IntentResult per query, in input order
+            
+        Raises:
+            ValueError: If any query cannot be classified (see classify)
+        """
+        if self.use_lemmatization:
+            try:
+                # Warms the reformulator's lemma cache, so classify() below skips spaCy
+                self.theme_reformulator.lemmatize_queries([q for q in queries if q and q.strip()])
+            except Exception as e:
+                logging.warning(f"Batch lemmatization failed, lemmatizing per query: {e}")
+        return [self.classify(query) for query in queries]
+
+    async def classify_batch(self, queries: List[str]) -> List[IntentResult]:
+        """
+        Async form of classify_many; the batch runs in a worker thread so the event
+        loop stays free while spaCy and the pattern scans run.
+        
+        Args:
+            queries: The user query strings
+            
+        Returns:
+            One IntentResult per query, in input order
+        """
+        return await asyncio.to_thread(self.classify_many, queries)
+
+    def _classify_uncached(self, query: str) -> IntentResult:
+        """Classify a query without consulting the result cache (see classify)."""
         # Validate input
         if not query or not query.strip():
             raise ValueError("Could not determine intent: Empty or whitespace-only query")
         
+        # Normalize once; every matcher below works on the same casefolded text
+        query = _normalize_text(query)
+        
         # Get pattern scores for each intent
         intent_scores = self._compute_pattern_scores(query)
         
@@ -554,7 +744,7 @@ class IntentClassifier:
         Check if a query is too vague to classify.
         
         Args:
-            query: The user query string
+            query: The query, already normalized with _normalize_text
             
         Returns:
             True if query is too vague, False otherwise
@@ -571,7 +761,7 @@ class IntentClassifier:
             "what do you know"
         ]
         
-        query_lower = query.lower().strip()
+        query_lower = query.strip()
         
         # Check for vague phrases
         for phrase in vague_phrases:
@@ -11,35 +11,62 @@ To integrate:
 import re
 from typing import Callable, Dict, List, Optional, Pattern, Tuple, Any
 from dataclasses import dataclass
-from collections import Counter
+import numpy as np
 from utils.country_utils import country_to_flag
+from rag.metadata_utils import laureate_columns
+
+try:
+    import re2  # google-re2: linear-time matching, no backtracking
+except ImportError:
+    re2 = None
+
+def _first_or_last_row(mask: np.ndarray, years: np.ndarray, order: str) -> Optional[int]:
+    """
+    Index of the earliest ('first') or latest ('last') awarded row where mask is True.
+    Ties keep list order, like a stable sort by year: the first row of the earliest
+    year, or the last row of the latest year.
+    """
+    rows = np.flatnonzero(mask)
+    if rows.size == 0:
+        return None
+    row_years = years[rows]
+    if order == "first":
+        return int(rows[np.argmin(row_years)])
+    return int(rows[rows.size - 1 - np.argmax(row_years[::-1])])
+
+def _find_laureate_row(name: str, metadata: List[Dict[str, Any]]) -> Optional[int]:
+    """Index of the first laureate whose lowercased full name contains name, or None."""
+    hits = np.flatnonzero(np.char.find(laureate_columns(metadata).names, name) >= 0)
+    return int(hits[0]) if hits.size else None
 
 # --- Handler Implementations ---
 # Example: "What year did Toni Morrison win?"
 def handle_award_year(match: re.Match, metadata: List[Dict[str, Any]]) -> dict:
     name = match.group(1).strip().lower()
-    for laureate in metadata:
-        if name in laureate.get("full_name", "").lower():
-            answer = f"{laureate['full_name']} won in {laureate['year_awarded']}."
-            motivation = laureate.get("prize_motivation")
-            if motivation:
-                answer += f" The laureate was recognized for: {motivation}"
-            country = laureate.get("country")
-            return {
-                "answer": answer,
-                "laureate": laureate["full_name"],
-                "year_awarded": laureate["year_awarded"],
-                "country": country,
-                "country_flag": country_to_flag(country) if country else None,
-                "category": laureate.get("category"),
-                "prize_motivation": laureate.get("prize_motivation"),
-            }
-    return {"answer": f"No laureate found matching '{name}'."}
+    row = _find_laureate_row(name, metadata)
+    if row is None:
+        return {"answer": f"No laureate found matching '{name}'."}
+    laureate = metadata[row]
+    answer = f"{laureate['full_name']} won in {laureate['year_awarded']}."
+    motivation = laureate.get("prize_motivation")
+    if motivation:
+        answer += f" The laureate was recognized for: {motivation}"
+    country = laureate.get("country")
+    return {
+        "answer": answer,
+        "laureate": laureate["full_name"],
+        "year_awarded": laureate["year_awarded"],
+        "country": country,
+        "country_flag": country_to_flag(country) if country else None,
+        "category": laureate.get("category"),
+        "prize_motivation": laureate.get("prize_motivation"),
+    }
 
 # Example: "How many women won since 1900?"
 def handle_count_women_since(match: re.Match, metadata: List[Dict[str, Any]]) -> dict:
     since_year = int(match.group(1))
-    count = sum(1 for l in metadata if l.get("gender") == "female" and l.get("year_awarded", 0) >= since_year)
+    columns = laureate_columns(metadata)
+    count = int(np.count_nonzero((columns.genders == "female") & (columns.years >= since_year)))
     return {"answer": f"{count} women have won the Nobel Prize in Literature since {since_year}."}
 
 # Example: "Who won the Nobel Prize in Literature in 2017?"
@@ -70,34 +97,37 @@ def handle_winner_in_year(match: re.Match, metadata: List[Dict[str, Any]]) -> di
 
 # Example: "Which country has won the most Nobel Prizes in Literature?"
 def handle_most_awarded_country(_: re.Match, metadata: List[Dict[str, Any]]) -> dict:
-    countries = [l.get("country") for l in metadata if l.get("country")]
-    counter = Counter(countries)
-    most_common = counter.most_common(1)
-    if most_common:
-        country, count = most_common[0]
+    columns = laureate_columns(metadata)
+    codes = columns.country_codes[columns.country_codes >= 0]
+    if codes.size:
+        # argmax returns the first maximum, i.e. the country seen first among ties
+        counts = np.bincount(codes)
+        code = int(counts.argmax())
+        country, count = columns.country_vocab[code], int(counts[code])
         return {"answer": f"{country} has the most Nobel Prize in Literature winners with {count}.", "country": country, "country_flag": country_to_flag(country) if country else None, "count": count}
     return {"answer": "Could not determine the most awarded country."}
 
 # Example: "What country is Kazuo Ishiguro from?"
 def handle_country_of_laureate(match: re.Match, metadata: List[Dict[str, Any]]) -> dict:
     name = match.group(1).strip().lower()
-    for laureate in metadata:
-        if name in laureate.get("full_name", "").lower():
-            country = laureate.get("country", "Unknown")
-            answer = f"{laureate['full_name']} is from {country}."
-            motivation = laureate.get("prize_motivation")
-            if motivation:
-                answer += f" The laureate was recognized for: {motivation}"
-            return {
-                "answer": answer,
-                "laureate": laureate["full_name"],
-                "year_awarded": laureate["year_awarded"],
-                "country": country,
-                "country_flag": country_to_flag(country) if country else None,
-                "category": laureate.get("category"),
-                "prize_motivation": laureate.get("prize_motivation"),
-            }
-    return {"answer": f"No laureate found matching '{name}'."}
+    row = _find_laureate_row(name, metadata)
+    if row is None:
+        return {"answer": f"No laureate found matching '{name}'."}
+    laureate = metadata[row]
+    country = laureate.get("country", "Unknown")
+    answer = f"{laureate['full_name']} is from {country}."
+    motivation = laureate.get("prize_motivation")
+    if motivation:
+        answer += f" The laureate was recognized for: {motivation}"
+    return {
+        "answer": answer,
+        "laureate": laureate["full_name"],
+        "year_awarded": laureate["year_awarded"],
+        "country": country,
+        "country_flag": country_to_flag(country) if country else None,
+        "category": laureate.get("category"),
+        "prize_motivation": laureate.get("prize_motivation"),
+    }
 
 # Example: "Who was the first female laureate?"
 def handle_first_last_gender_laureate(match: re.Match, metadata: List[Dict[str, Any]]) -> dict:
@@ -108,12 +138,11 @@ def handle_first_last_gender_laureate(match: re.Match, metadata: List[Dict[str,
         gender = "female"
     elif gender in ["man", "male"]:
         gender = "male"
-    filtered = [l for l in metadata if l.get("gender", "").lower() == gender]
-    if not filtered:
+    columns = laureate_columns(metadata)
+    row = _first_or_last_row(np.char.lower(columns.genders) == gender, columns.years, order)
+    if row is None:
         return {"answer": f"No {gender} laureates found."}
-    # Sort by year_awarded
-    filtered_sorted = sorted(filtered, key=lambda l: l.get("year_awarded", 0))
-    laureate = filtered_sorted[0] if order == "first" else filtered_sorted[-1]
+    laureate = metadata[row]
     answer = f"The {order} {gender} laureate was {laureate['full_name']} in {laureate['year_awarded']}."
     motivation = laureate.get("prize_motivation")
     if motivation:
@@ -134,64 +163,69 @@ def handle_first_last_gender_laureate(match: re.Match, metadata: List[Dict[str,
 # Example: "How many laureates are from Sweden?"
 def handle_count_laureates_from_country(match: re.Match, metadata: List[Dict[str, Any]]) -> dict:
     country = match.group(1).strip().lower()
-    count = sum(1 for l in metadata if l.get("country", "").lower() == country)
+    count = int(np.count_nonzero(laureate_columns(metadata).countries == country))
     return {"answer": f"{count} laureates are from {country.title()}.", "country": country.title(), "country_flag": country_to_flag(country.title()), "count": count}
 
 # Example: "What was the prize motivation for Toni Morrison?"
 def handle_prize_motivation(match: re.Match, metadata: List[Dict[str, Any]]) -> dict:
     name = match.group(1).strip().lower()
-    for laureate in metadata:
-        if name in laureate.get("full_name", "").lower():
-            motivation = laureate.get("prize_motivation", "No motivation found.")
-            country = laureate.get("country")
-            return {
-                "answer": f"The prize motivation for {laureate['full_name']} was: {motivation}",
-                "laureate": laureate["full_name"],
-                "year_awarded": laureate["year_awarded"],
-                "country": country,
-                "country_flag": country_to_flag(country) if country else None,
-                "category": laureate.get("category"),
-                "prize_motivation": motivation,
-            }
-    return {"answer": f"No laureate found matching '{name}'."}
+    row = _find_laureate_row(name, metadata)
+    if row is None:
+        return {"answer": f"No laureate found matching '{name}'."}
+    laureate = metadata[row]
+    motivation = laureate.get("prize_motivation", "No motivation found.")
+    country = laureate.get("country")
+    return {
+        "answer": f"The prize motivation for {laureate['full_name']} was: {motivation}",
+        "laureate": laureate["full_name"],
+        "year_awarded": laureate["year_awarded"],
+        "country": country,
+        "country_flag": country_to_flag(country) if country else None,
+        "category": laureate.get("category"),
+        "prize_motivation": motivation,
+    }
 
 # Example: "When was Selma Lagerlöf born?" or "When did Toni Morrison die?"
 def handle_birth_death_date(match: re.Match, metadata: List[Dict[str, Any]]) -> dict:
     name = match.group(1).strip().lower()
     event = match.group(2).lower()  # 'born' or 'died'
-    for laureate in metadata:
-        if name in laureate.get("full_name", "").lower():
-            if event == "born":
-                date = laureate.get("date_of_birth", "Unknown")
-                answer = f"{laureate['full_name']} was born on {date}."
-            elif event == "died":
-                date = laureate.get("date_of_death", "Unknown")
-                answer = f"{laureate['full_name']} died on {date}."
-            else:
-                continue
-            motivation = laureate.get("prize_motivation")
-            if motivation:
-                answer += f" The laureate was recognized for: {motivation}"
-            return {
-                "answer": answer,
-                "laureate": laureate["full_name"],
-                "year_awarded": laureate["year_awarded"],
-                "country": laureate.get("country"),
-                "category": laureate.get("category"),
-                "prize_motivation": laureate.get("prize_motivation"),
-                "date_of_birth": laureate.get("date_of_birth"),
-                "date_of_death": laureate.get("date_of_death"),
-                "event": event
-            }
-    return {"answer": f"No laureate found matching '{name}'."}
+    row = _find_laureate_row(name, metadata)
+    if row is None:
+        return {"answer": f"No laureate found matching '{name}'."}
+    laureate = metadata[row]
+    # Dates are served exactly as stored; nothing is parsed per query
+    if event == "born":
+        date = laureate.get("date_of_birth", "Unknown")
+        answer = f"{laureate['full_name']} was born on {date}."
+    else:
+        date = laureate.get("date_of_death", "Unknown")
+        answer = f"{laureate['full_name']} died on {date}."
+    motivation = laureate.get("prize_motivation")
+    if motivation:
+        answer += f" The laureate was recognized for: {motivation}"
+    return {
+        "answer": answer,
+        "laureate": laureate["full_name"],
+        "year_awarded": laureate["year_awarded"],
+        "country": laureate.get("country"),
+        "category": laureate.get("category"),
+        "prize_motivation": laureate.get("prize_motivation"),
+        "date_of_birth": laureate.get("date_of_birth"),
+        "date_of_death": laureate.get("date_of_death"),
+        "event": event
+    }
 
 # Example: "Which years was the Nobel Prize in Literature not awarded?"
 def handle_years_with_no_award(_: re.Match, metadata: List[Dict[str, Any]]) -> dict:
-    awarded_years = {entry['year_awarded'] for entry in metadata}
-    if not awarded_years:
+    years = laureate_columns(metadata).years
+    awarded_years = np.unique(years[years > 0])  # sorted, without missing years
+    if awarded_years.size == 0:
         return {"answer": "No data available."}
-    all_years = set(range(min(awarded_years), max(awarded_years)+1))
-    missing_years = sorted(all_years - awarded_years)
+    # Mark every year in [first, last] that has a laureate; the unmarked ones are the gaps
+    first_year = int(awarded_years[0])
+    awarded = np.zeros(int(awarded_years[-1]) - first_year + 1, dtype=bool)
+    awarded[awarded_years - first_year] = True
+    missing_years = (np.flatnonzero(~awarded) + first_year).tolist()
     if not missing_years:
         return {"answer": "Every year in the dataset has at least one laureate."}
     year_list = ", ".join(str(y) for y in missing_years)
@@ -201,11 +235,11 @@ def handle_years_with_no_award(_: re.Match, metadata: List[Dict[str, Any]]) -> d
 def handle_first_last_country_laureate(match: re.Match, metadata: List[Dict[str, Any]]) -> dict:
     order = match.group(1).lower()  # 'first' or 'last'
     country = match.group(2).strip().lower()
-    filtered = [l for l in metadata if l.get("country", "").lower() == country]
-    if not filtered:
+    columns = laureate_columns(metadata)
+    row = _first_or_last_row(columns.countries == country, columns.years, order)
+    if row is None:
         return {"answer": f"No laureates found from {country.title()}."}
-    filtered_sorted = sorted(filtered, key=lambda l: l.get("year_awarded", 0))
-    laureate = filtered_sorted[0] if order == "first" else filtered_sorted[-1]
+    laureate = metadata[row]
     answer = f"The {order} laureate from {country.title()} was {laureate['full_name']} in {laureate['year_awarded']}."
     motivation = laureate.get("prize_motivation")
     if motivation:
@@ -238,6 +272,9 @@ class QueryRule:
     name: str
     patterns: List[Pattern]  # Now supports multiple patterns
     handler: Callable[[re.Match, List[Dict[str, Any]]], str]
+    # Lowercase literals of which every pattern requires at least one; rules whose
+    # keywords are all absent from the query are skipped without running a regex
+    keywords: Tuple[str, ...] = ()
 
 # --- Rule Registry (multi-pattern) ---
 FACTUAL_QUERY_REGISTRY: List[QueryRule] = [
@@ -248,7 +285,8 @@ FACTUAL_QUERY_REGISTRY: List[QueryRule] = [
             re.compile(r"when did (.+?) win(?: [\w\s]+)?\s*[\?\.\!\,;:]*$", re.IGNORECASE),
             re.compile(r"when was (.+?) awarded(?: [\w\s]+)?\s*[\?\.\!\,;:]*$", re.IGNORECASE),
         ],
-        handler=handle_award_year
+        handler=handle_award_year,
+        keywords=("win", "awarded")
     ),
     QueryRule(
         name="winner_in_year",
@@ -258,7 +296,8 @@ FACTUAL_QUERY_REGISTRY: List[QueryRule] = [
             re.compile(r"who received(?: the)?(?: nobel)?(?: prize)?(?: in literature)? in (\d{4})(?: [\w\s]+)?\s*[\?\.\!\,;:]*$", re.IGNORECASE),
             re.compile(r"winner in (\d{4})(?: [\w\s]+)?\s*[\?\.\!\,;:]*$", re.IGNORECASE),
         ],
-        handler=handle_winner_in_year
+        handler=handle_winner_in_year,
+        keywords=("won", "winner", "received")
     ),
     QueryRule(
         name="country_of_laureate",
@@ -267,49 +306,58 @@ FACTUAL_QUERY_REGISTRY: List[QueryRule] = [
             re.compile(r"where is ([\w .'-]+) from(?: [\w\s]+)?\s*[\?\.\!\,;:]*$", re.IGNORECASE),
             re.compile(r"country of ([\w .'-]+)(?: [\w\s]+)?\s*[\?\.\!\,;:]*$", re.IGNORECASE),
         ],
-        handler=handle_country_of_laureate
+        handler=handle_country_of_laureate,
+        keywords=("from", "country of")
     ),
     QueryRule(
         name="count_women_since_year",
         patterns=[re.compile(r"how many women won since (\d{4})(?: [\w\s]+)?\s*[\?\.\!\,;:]*$", re.IGNORECASE)],
-        handler=handle_count_women_since
+        handler=handle_count_women_since,
+        keywords=("since",)
     ),
     QueryRule(
         name="most_awarded_country",
         patterns=[re.compile(r"which country has (?:won|received) the most(?: [\w\s]+)?\s*[\?\.\!\,;:]*$", re.IGNORECASE)],
-        handler=handle_most_awarded_country
+        handler=handle_most_awarded_country,
+        keywords=("the most",)
     ),
     QueryRule(
         name="first_last_gender_laureate",
         patterns=[re.compile(r"who was the (first|last) (male|female|woman|man) (?:winner|laureate)(?: [\w\s]+)?\s*[\?\.\!\,;:]*$", re.IGNORECASE)],
-        handler=handle_first_last_gender_laureate
+        handler=handle_first_last_gender_laureate,
+        keywords=("first", "last")
     ),
     QueryRule(
         name="count_laureates_from_country",
         patterns=[re.compile(r"how many (?:laureates|winners) (?:are|were)? from ([\w .'-]+)(?: [\w\s]+)?\s*[\?\.\!\,;:]*$", re.IGNORECASE)],
-        handler=handle_count_laureates_from_country
+        handler=handle_count_laureates_from_country,
+        keywords=("from",)
     ),
     QueryRule(
         name="prize_motivation_by_name",
         patterns=[re.compile(r"what (?:was|is) the (?:prize )?motivation for ([\w .'-]+)(?: [\w\s]+)?\s*[\?\.\!\,;:]*$", re.IGNORECASE)],
-        handler=handle_prize_motivation
+        handler=handle_prize_motivation,
+        keywords=("motivation",)
     ),
     QueryRule(
         name="birth_death_date_by_name",
         patterns=[re.compile(r"when was ([\w .'-]+) (born|died)(?: [\w\s]+)?\s*[\?\.\!\,;:]*$", re.IGNORECASE)],
-        handler=handle_birth_death_date
+        handler=handle_birth_death_date,
+        keywords=("born", "died")
     ),
     QueryRule(
         name="years_with_no_award",
         patterns=[
             re.compile(r"(which years|years)\s*(was|were)?\s*(the\s*)?nobel prize in literature\s*(not awarded|no award)(?: [\w\s]+)?[\s\?\.\!\,;:]*$", re.IGNORECASE)
         ],
-        handler=handle_years_with_no_award
+        handler=handle_years_with_no_award,
+        keywords=("not awarded", "no award")
     ),
     QueryRule(
         name="first_last_country_laureate",
         patterns=[re.compile(r"who was the (first|last) ([\w .'-]+) laureate(?: [\w\s]+)?\s*[\?\.\!\,;:]*$", re.IGNORECASE)],
-        handler=handle_first_last_country_laureate
+        handler=handle_first_last_country_laureate,
+        keywords=("first", "last")
     ),
     QueryRule(
         name="count_gender_laureates",
@@ -318,18 +366,91 @@ FACTUAL_QUERY_REGISTRY: List[QueryRule] = [
             re.compile(r"how many (females|women|female|males|men|male) have won(?: [\\w\\s]+)?\\s*[\\?\\.\\!\\,;:]*$", re.IGNORECASE),
             re.compile(r"how many (females|women|female|males|men|male) are laureates(?: [\\w\\s]+)?\\s*[\\?\\.\\!\\,;:]*$", re.IGNORECASE),
         ],
-        handler=handle_count_gender_laureates
+        handler=handle_count_gender_laureates,
+        keywords=("how many",)
     ),
     # Add more rules here as needed
 ]
 
+# Python's Unicode-aware classes spelled out for RE2, whose \w, \d and \s are ASCII-only;
+# used inside [...] as-is and wrapped in brackets elsewhere
+_RE2_CLASS_ESCAPES = {
+    "w": r"\p{L}\p{N}_",
+    "d": r"\p{Nd}",
+    "s": r"\s\v\p{Z}\x{85}\x{1c}-\x{1f}",
+}
+
+def _re2_source(pattern: str) -> Optional[str]:
+    r"""
+    Rewrite a registry pattern into RE2 syntax with the same matches, or None if it uses
+    an escape whose Unicode behaviour is not translated (\b, \W, ...).
+    A bare $ also accepts one trailing newline, as Python's $ does; the newline then
+    belongs to the match span, which handlers never read (they only use groups).
+    """
+    out = []
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            escaped = pattern[i + 1]
+            if escaped in _RE2_CLASS_ESCAPES:
+                spelled = _RE2_CLASS_ESCAPES[escaped]
+                out.append(spelled if in_class else f"[{spelled}]")
+            elif escaped.isalnum():
+                return None
+            else:
+                out.append(pattern[i:i + 2])
+            i += 2
+            continue
+        if char == "[" and not in_class:
+            in_class = True
+        elif char == "]" and in_class:
+            in_class = False
+        elif char == "$" and not in_class:
+            char = r"\n?$"
+        out.append(char)
+        i += 1
+    return "".join(out)
+
+def _linear_pattern(pattern: Pattern) -> Pattern:
+    """RE2 compilation of a registry pattern when google-re2 is installed, else the pattern itself."""
+    if re2 is None:
+        return pattern
+    source = _re2_source(pattern.pattern)
+    if source is None:
+        return pattern
+    if pattern.flags & re.IGNORECASE:
+        source = "(?i)" + source
+    try:
+        return re2.compile(source)
+    except Exception:
+        return pattern
+
+# Queries at least this long are matched with the RE2 patterns. The lazy (.+?) groups
+# make re quadratic in query length, while RE2 stays linear; below this length re's
+# lower per-call overhead wins.
+RE2_MIN_QUERY_LENGTH = 100
+
+# Flattened (keywords, pattern, linear_pattern, rule) tuples in registry priority order,
+# built once at import so matching is a single loop over precompiled case-insensitive
+# patterns; linear_pattern is the RE2 version where available, else pattern itself
+_RULE_PATTERNS: Tuple[Tuple[Tuple[str, ...], Pattern, Pattern, QueryRule], ...] = tuple(
+    (rule.keywords, pattern, _linear_pattern(pattern), rule)
+    for rule in FACTUAL_QUERY_REGISTRY for pattern in rule.patterns
+)
+
 # --- Query Matcher (multi-pattern) ---
 def match_query_to_handler(query: str) -> Optional[Tuple[QueryRule, re.Match]]:
-    for rule in FACTUAL_QUERY_REGISTRY:
-        for pattern in rule.patterns:
-            match = pattern.search(query)
-            if match:
-                return rule, match
+    lowered = query.lower()
+    linear = len(query) >= RE2_MIN_QUERY_LENGTH
+    for keywords, pattern, linear_pattern, rule in _RULE_PATTERNS:
+        # Cheap substring prefilter: skip the regex when none of its literals occur
+        if keywords and not any(keyword in lowered for keyword in keywords):
+            continue
+        match = (linear_pattern if linear else pattern).search(query)
+        if match:
+            return rule, match
     return None
 
 # --- Main Metadata Handler ---
@@ -353,4 +474,13 @@ def handle_metadata_query(query: str, metadata: List[Dict[str, Any]]) -> Optiona
                 "source": {"rule": rule.name},
                 "answer_type": "metadata"
             }
-    return None  # fall back to RAG 
\ No newline at end of file
+    return None  # fall back to RAG 
+
+def handle_metadata_batch(queries: List[str], metadata: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Answer several queries from the same metadata with handle_metadata_query.
+    The column view is built once up front and shared by every handler call.
+    Returns one result (or None) per query, in input order.
+    """
+    laureate_columns(metadata)
+    return [handle_metadata_query(query, metadata) for query in queries]
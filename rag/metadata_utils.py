@@ -1,32 +1,119 @@
 import os
+import sys
 import json
-from typing import List, Dict, Any
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, List, Dict, Any, NamedTuple
+import numpy as np
+
+# Low-cardinality string fields interned on load, so every laureate shares one
+# object per distinct value instead of a fresh copy from the JSON parser
+_INTERNED_FIELDS = ("country", "gender")
 
 def flatten_laureate_metadata(raw_metadata: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     Flattens the nested laureate metadata into a flat list of laureate dicts.
     Each laureate dict will include all original laureate fields plus year_awarded, category, and any other top-level fields needed for factual queries.
+    Country, gender and category strings are interned.
     """
     flat = []
     for entry in raw_metadata:
         year = entry.get("year_awarded")
         category = entry.get("category")
+        if isinstance(category, str):
+            category = sys.intern(category)
         for laureate in entry.get("laureates", []):
             laureate_flat = dict(laureate)
+            for field in _INTERNED_FIELDS:
+                value = laureate_flat.get(field)
+                if isinstance(value, str):
+                    laureate_flat[field] = sys.intern(value)
             laureate_flat["year_awarded"] = year
             laureate_flat["category"] = category
             flat.append(laureate_flat)
     return flat
 
+@lru_cache(maxsize=4)
+def _load_flat(metadata_path: str, mtime: float) -> List[Dict[str, Any]]:
+    """Parse and flatten one version (path + mtime) of the metadata file."""
+    with open(metadata_path, 'r', encoding='utf-8') as f:
+        return flatten_laureate_metadata(json.load(f))
+
 def load_laureate_metadata(metadata_path: str = None) -> List[Dict[str, Any]]:
     """
     Loads and flattens laureate metadata from the canonical JSON file.
     If metadata_path is not provided, uses the default Nobel literature metadata location.
+    The parsed result is memoized per file path and modification time, so repeated
+    loads of an unchanged file share one list; treat it as read-only.
     """
     if metadata_path is None:
         metadata_path = os.path.join(os.path.dirname(__file__), '../data/nobel_literature.json')
     if os.path.exists(metadata_path):
-        with open(metadata_path, 'r', encoding='utf-8') as f:
-            raw = json.load(f)
-            return flatten_laureate_metadata(raw)
-    return None 
\ No newline at end of file
+        return _load_flat(os.path.abspath(metadata_path), os.path.getmtime(metadata_path))
+    return None
+
+class LaureateColumns(NamedTuple):
+    """Column-wise (struct-of-arrays) view of a flat laureate list, row i = metadata[i]."""
+    names: np.ndarray      # lowercased full_name, '' when missing
+    years: np.ndarray      # int32 year_awarded, 0 when missing
+    genders: np.ndarray    # gender as stored, '' when missing
+    countries: np.ndarray  # lowercased country, '' when missing
+    country_codes: np.ndarray  # int32 index into country_vocab, -1 when missing
+    country_vocab: tuple       # distinct countries as stored, in first-seen order
+
+class IdentityLRUCache:
+    """
+    Thread-safe LRU cache of values derived from the most recently used objects,
+    keyed by object identity. Each entry keeps its object alive, so the id() key
+    cannot be reused by another object while cached. Cached objects must not be
+    mutated, since their derived values are never rebuilt.
+    """
+
+    def __init__(self, maxsize: int = 4):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, obj: Any, build: Callable[[Any], Any]) -> Any:
+        """Return the cached value for obj, calling build(obj) outside the lock on a miss."""
+        key = id(obj)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] is obj:
+                self._entries.move_to_end(key)
+                return cached[1]
+        value = build(obj)
+        with self._lock:
+            self._entries[key] = (obj, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+# Columns for the most recently used metadata lists
+_COLUMNS_CACHE = IdentityLRUCache(maxsize=4)
+
+def laureate_columns(metadata: List[Dict[str, Any]]) -> LaureateColumns:
+    """
+    Return the LaureateColumns for a flat laureate list, building them on first use.
+    Counting and filtering handlers use these NumPy arrays instead of iterating dicts.
+    The metadata list must not be mutated after its columns are built.
+    """
+    return _COLUMNS_CACHE.get_or_build(metadata, _build_laureate_columns)
+
+def _build_laureate_columns(metadata: List[Dict[str, Any]]) -> LaureateColumns:
+    """Build the LaureateColumns for a flat laureate list."""
+    country_vocab = {}
+    country_codes = [
+        country_vocab.setdefault(l["country"], len(country_vocab)) if l.get("country") else -1
+        for l in metadata
+    ]
+    return LaureateColumns(
+        names=np.array([(l.get("full_name") or "").lower() for l in metadata], dtype=str),
+        years=np.array([l.get("year_awarded") or 0 for l in metadata], dtype=np.int32),
+        genders=np.array([l.get("gender") or "" for l in metadata], dtype=str),
+        countries=np.array([(l.get("country") or "").lower() for l in metadata], dtype=str),
+        country_codes=np.array(country_codes, dtype=np.int32),
+        country_vocab=tuple(country_vocab),
+    )
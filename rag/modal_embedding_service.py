@@ -27,7 +27,6 @@ import logging
 from typing import Optional
 import numpy as np
 import requests
-from sentence_transformers import SentenceTransformer
 
 from rag.model_config import get_model_config, DEFAULT_MODEL_ID
 from rag.logging_utils import get_module_logger, log_with_context, QueryContext
@@ -30,7 +30,9 @@ Usage:
 
 Author: NobelLM Team
 """
-from typing import Dict
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, Mapping
 import os
 
 # Supported models and their configs
@@ -53,13 +55,20 @@ MODEL_CONFIGS: Dict[str, Dict] = {
 DEFAULT_MODEL_ID = "bge-large"
 
 
-def get_model_config(model_id: str = None) -> Dict:
+@lru_cache(maxsize=None)
+def get_model_config(model_id: str = None) -> Mapping[str, Any]:
     """
-    Return the config dict for the given model_id. If not provided, use the default.
+    Return the config for the given model_id. If not provided, use the default.
     Raises KeyError if the model_id is not supported.
+
+    Results are memoized per model_id and returned as a read-only view of the
+    MODEL_CONFIGS entry, shared by every caller. In-place edits to an existing
+    entry show through the view; code that adds, replaces or removes a model's
+    dict in MODEL_CONFIGS at runtime (e.g. tests) must call
+    get_model_config.cache_clear() afterwards.
     """
     if model_id is None:
         model_id = DEFAULT_MODEL_ID
     if model_id not in MODEL_CONFIGS:
         raise KeyError(f"Model '{model_id}' is not supported. Available: {list(MODEL_CONFIGS.keys())}")
-    return MODEL_CONFIGS[model_id] 
\ No newline at end of file
+    return MappingProxyType(MODEL_CONFIGS[model_id])
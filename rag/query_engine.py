@@ -63,6 +63,9 @@ _INDEX_LOCK = threading.Lock()
 _PROMPT_BUILDER = None
 _PROMPT_BUILDER_LOCK = threading.Lock()
 
+# Queries longer than this (in characters) are still processed, but logged as a warning
+LARGE_QUERY_THRESHOLD = 100 * 1024
+
 KEYWORDS_TRIGGER_EXPANSION = [
     "theme", "themes", "pattern", "patterns", "typical", "common",
     "most", "across", "often", "generally", "usually", "style", "styles"
@@ -462,6 +465,11 @@ def answer_query(
     """
     # Early validation of all inputs
     validate_query_string(query_string, context="answer_query")
+    if len(query_string) > LARGE_QUERY_THRESHOLD:
+        logger.warning(
+            f"Query length {len(query_string)} exceeds {LARGE_QUERY_THRESHOLD} characters; "
+            "processing anyway"
+        )
     if model_id is not None:
         validate_model_id(model_id, context="answer_query")
     
@@ -17,7 +17,7 @@ Configuration:
 import os
 import logging
 from typing import List, Dict, Any, Optional
-from qdrant_client import QdrantClient
+from qdrant_client import QdrantClient, models
 from qdrant_client.models import Filter, FieldCondition, MatchValue
 from dotenv import load_dotenv
 
@@ -73,35 +73,80 @@ def query_qdrant_with_embedding(
         List of normalized chunk results
     """
     client = get_qdrant_client()
-    qdrant_filter = None
-    if filters:
-        conditions = [FieldCondition(key=k, match=MatchValue(value=v)) for k, v in filters.items()]
-        qdrant_filter = Filter(must=conditions)
     try:
         search_result = client.search(
             collection_name=COLLECTION_NAME,
             query_vector=embedding,
             limit=top_k,
             score_threshold=score_threshold,
-            query_filter=qdrant_filter,
+            query_filter=_build_filter(filters),
             with_payload=True
         )
-        normalized_results = []
-        for i, r in enumerate(search_result):
-            payload = r.payload or {}
-            normalized_result = {
-                "chunk_id": payload.get("chunk_id"),
-                "text": payload.get("text"),
-                "laureate": payload.get("laureate"),
-                "year_awarded": payload.get("year_awarded"),
-                "gender": payload.get("gender"),
-                "category": payload.get("category"),
-                "country": payload.get("country"),
-                "rank": i,
-                "score": float(r.score) if hasattr(r, 'score') else 0.0
-            }
-            normalized_results.append(normalized_result)
-        return normalized_results
+        return _normalize_results(search_result)
     except Exception as e:
         logging.error(f"Qdrant query failed: {e}")
-        return []
\ No newline at end of file
+        return []
+
+def query_qdrant_batch_with_embeddings(
+    embeddings: List[list],
+    top_k: int = 5,
+    filters: Optional[Dict[str, Any]] = None,
+    score_threshold: float = 0.2
+) -> List[List[Dict[str, Any]]]:
+    """
+    Query Qdrant for several pre-computed embeddings in one query_batch_points request.
+    Args:
+        embeddings: Pre-computed embeddings, each a list of floats
+        top_k: Number of results to return per embedding
+        filters: Optional metadata filters, applied to every search
+        score_threshold: Minimum similarity score
+    Returns:
+        One list of normalized chunk results per embedding, in input order
+    """
+    if not embeddings:
+        return []
+    client = get_qdrant_client()
+    qdrant_filter = _build_filter(filters)
+    try:
+        # Looked up at call time so a client without QueryRequest fails here, not on import
+        requests = [
+            models.QueryRequest(
+                query=embedding,
+                filter=qdrant_filter,
+                limit=top_k,
+                score_threshold=score_threshold,
+                with_payload=True
+            )
+            for embedding in embeddings
+        ]
+        batch_result = client.query_batch_points(collection_name=COLLECTION_NAME, requests=requests)
+        return [_normalize_results(response.points) for response in batch_result]
+    except Exception as e:
+        logging.error(f"Qdrant batch query failed: {e}")
+        return [[] for _ in embeddings]
+
+def _build_filter(filters: Optional[Dict[str, Any]]) -> Optional[Filter]:
+    """Translate metadata filters into a Qdrant Filter requiring every key to match."""
+    if not filters:
+        return None
+    conditions = [FieldCondition(key=k, match=MatchValue(value=v)) for k, v in filters.items()]
+    return Filter(must=conditions)
+
+def _normalize_results(search_result) -> List[Dict[str, Any]]:
+    """Convert Qdrant scored points into chunk dicts ranked in result order."""
+    normalized_results = []
+    for i, r in enumerate(search_result):
+        payload = r.payload or {}
+        normalized_result = {
+            "chunk_id": payload.get("chunk_id"),
+            "text": payload.get("text"),
+            "laureate": payload.get("laureate"),
+            "year_awarded": payload.get("year_awarded"),
+            "gender": payload.get("gender"),
+            "category": payload.get("category"),
+            "country": payload.get("country"),
+            "rank": i,
+            "score": float(r.score) if hasattr(r, 'score') else 0.0
+        }
+        normalized_results.append(normalized_result)
+    return normalized_results
\ No newline at end of file
@@ -5,6 +5,7 @@ This module provides query classification and routing logic to determine
 the appropriate retrieval strategy and prompt template for each query.
 """
 import logging
+from functools import lru_cache
 from typing import Dict, Any, Optional, List, NamedTuple
 from dataclasses import dataclass, field
 from enum import Enum
@@ -19,8 +20,14 @@ from rag.intent_classifier import IntentClassifier
 logger = get_module_logger(__name__)
 _router = None  # Global router instance
 
-# --- Constants ---
-THEME_REFORMULATOR = ThemeReformulator("config/themes.json")
+# --- Shared Components ---
+@lru_cache(maxsize=None)
+def get_theme_reformulator() -> ThemeReformulator:
+    """
+    Get the shared ThemeReformulator, built on first thematic query.
+    Deferred so importing the router does not load spaCy or the theme map.
+    """
+    return ThemeReformulator("config/themes.json")
 
 # --- Data Classes and Enums ---
 class QueryIntent(str, Enum):
@@ -234,8 +241,9 @@ class QueryRouter:
                     config = RetrievalConfig(top_k=5, score_threshold=0.25)
                 elif intent == QueryIntent.THEMATIC:
                     # Extract themes using theme reformulator
-                    themes = THEME_REFORMULATOR.extract_themes(query)
-                    expanded_terms = THEME_REFORMULATOR.expand_query_terms(query)
+                    theme_reformulator = get_theme_reformulator()
+                    themes = theme_reformulator.extract_themes(query)
+                    expanded_terms = theme_reformulator.expand_query_terms(query)
                     logs.update({
                         'thematic_canonical_themes': themes,
                         'thematic_expanded_terms': expanded_terms
@@ -21,6 +21,7 @@ import numpy as np
 import faiss
 from rag.model_config import get_model_config, DEFAULT_MODEL_ID
 from rag.cache import get_model, get_faiss_index_and_metadata
+from rag.metadata_utils import IdentityLRUCache
 from rag.dual_process_retriever import retrieve_chunks_dual_process
 from abc import ABC, abstractmethod
 from .utils import filter_top_chunks
@@ -61,6 +62,150 @@ def is_supported_index(index: faiss.Index) -> bool:
     return isinstance(index, (faiss.IndexFlatIP, faiss.IndexFlat))
 
 
+# Per-field value codes ({field: (codes, vocab) or None}) for the most recently used
+# metadata lists
+_FIELD_CODES_CACHE = IdentityLRUCache(maxsize=4)
+
+
+def metadata_field_codes(
+    metadata: List[Dict[str, Any]],
+    field: str
+) -> Optional[Tuple[np.ndarray, Dict[Any, int]]]:
+    """
+    Return (codes, vocab) for one metadata field, building them on first use.
+
+    codes[i] is vocab[metadata[i].get(field)], so rows whose field equals a value v
+    are exactly those with codes == vocab[v]. Returns None when the field holds
+    unhashable values. The metadata list must not be mutated after its codes are built.
+    """
+    fields = _FIELD_CODES_CACHE.get_or_build(metadata, lambda _: {})
+    if field not in fields:
+        vocab = {}
+        try:
+            codes = np.fromiter(
+                (vocab.setdefault(m.get(field), len(vocab)) for m in metadata),
+                dtype=np.int32,
+                count=len(metadata)
+            )
+            fields[field] = (codes, vocab)
+        except TypeError:
+            fields[field] = None
+    return fields[field]
+
+
+def filter_metadata_indices(metadata: List[Dict[str, Any]], filters: Dict[str, Any]) -> np.ndarray:
+    """
+    Return the positions of metadata rows matching every filter (m.get(k) == v), as int64.
+
+    Uses the cached per-field codes, so each filter is one vectorized comparison
+    instead of a Python pass over every row; falls back to that pass for
+    unhashable fields or filter values.
+    """
+    mask = np.ones(len(metadata), dtype=bool)
+    for field, value in filters.items():
+        columns = metadata_field_codes(metadata, field)
+        try:
+            code = columns[1].get(value) if columns is not None else None
+        except TypeError:
+            columns = None
+        if columns is None:
+            return np.fromiter(
+                (i for i, m in enumerate(metadata) if all(m.get(k) == v for k, v in filters.items())),
+                dtype=np.int64
+            )
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        mask &= columns[0] == code
+    return np.flatnonzero(mask).astype(np.int64, copy=False)
+
+
+def _search_index(
+    query_embeddings: np.ndarray,
+    top_k: int,
+    model_id: Optional[str],
+    filters: Optional[Dict[str, Any]] = None,
+    context: str = "query_index"
+) -> List[List[Dict[str, Any]]]:
+    """
+    Search the model's FAISS index and return the raw top_k hits for each query row.
+
+    Shared by query_index and query_index_batch: validates the model and embeddings,
+    normalizes the (B, d) matrix once, and maps hits to metadata copies with score,
+    rank and country_flag. No score threshold or min/max return filtering is applied.
+    Without filters all rows go to one index.search call; with filters only the
+    matching vectors are scored.
+
+    Raises:
+        ValueError: If model_id is missing, the embeddings are invalid or the index
+            type is unsupported
+        FileNotFoundError: If index or metadata files are missing
+    """
+    if not model_id:
+        raise ValueError("model_id must be provided")
+    validate_model_id(model_id, context=f"{context}_model")
+    validate_embedding_vector(
+        query_embeddings,
+        expected_dim=get_model_config(model_id)["embedding_dim"],
+        context="query_embedding"
+    )
+
+    index, metadata = get_faiss_index_and_metadata(model_id)
+
+    # Verify index type is supported
+    if not is_supported_index(index):
+        raise ValueError(
+            f"Unsupported FAISS index type: {type(index).__name__}. "
+            "Only IndexFlat and IndexFlatIP are supported as they guarantee "
+            "reconstruct_n support and direct similarity search."
+        )
+
+    logger.info(f"FAISS index is trained: {getattr(index, 'is_trained', 'N/A')}, total vectors: {getattr(index, 'ntotal', 'N/A')}")
+    logger.info(f"Query embedding shape: {query_embeddings.shape}, dtype: {query_embeddings.dtype}")
+
+    # Ensure query_embeddings is a 2D float32 buffer we own, so normalize_L2 can
+    # work in place without touching the caller's array
+    query_embeddings = np.array(query_embeddings, dtype=np.float32, ndmin=2)
+    faiss.normalize_L2(query_embeddings)
+
+    if not filters:
+        # If no filters, use direct FAISS search (faster), one call for all rows
+        scores, indices = index.search(query_embeddings, top_k)
+        logger.info(f"[RAG][ShapeCheck] Searched {query_embeddings.shape[0]} queries, top_k={top_k}")
+    else:
+        # --- Pre-retrieval metadata filtering ---
+        # Metadata positions match FAISS vector ids, so matching positions are the vector ids
+        valid_indices = filter_metadata_indices(metadata, filters)
+        logger.info(f"[RAG][ShapeCheck] valid_indices count: {valid_indices.size}")
+        if valid_indices.size == 0:
+            return [[] for _ in range(query_embeddings.shape[0])]  # No results match filter
+
+        # Reconstruct and score only the matching vectors; this is safe because we
+        # verified the index type is IndexFlat/IndexFlatIP
+        filtered_vectors = index.reconstruct_batch(valid_indices)
+        scores, indices = [], []
+        for row in query_embeddings:
+            row_scores = safe_faiss_scoring(filtered_vectors, row[None, :], context="filtered_query")
+            top_indices = row_scores.argsort()[::-1][:top_k]
+            logger.info(f"Top 10 scores: {row_scores[top_indices][:10]}")
+            scores.append(row_scores[top_indices])
+            indices.append(valid_indices[top_indices])
+
+    batch_results = []
+    for row_scores, row_indices in zip(scores, indices):
+        results = []
+        for rank, (score, idx) in enumerate(zip(row_scores, row_indices)):
+            if idx < 0:
+                # FAISS pads with -1 when the index holds fewer than top_k vectors
+                continue
+            result = metadata[idx].copy()
+            result["score"] = float(score)
+            result["rank"] = rank
+            result["country_flag"] = country_to_flag(result.get("country"))
+            results.append(result)
+        batch_results.append(results)
+    return batch_results
+
+
 def query_index(
     query_embedding: np.ndarray,
     top_k: int,
@@ -99,7 +244,6 @@ def query_index(
         FileNotFoundError: If index or metadata files are missing
     """
     # Validate inputs using centralized validation
-    validate_embedding_vector(query_embedding, context="query_embedding")
     validate_retrieval_parameters(
         top_k=top_k,
         score_threshold=score_threshold,
@@ -109,100 +253,67 @@ def query_index(
     )
     validate_filters(filters, context="query_index_filters")
 
-    if model_id:
-        validate_model_id(model_id, context="query_index_model")
-        index, metadata = get_faiss_index_and_metadata(model_id)
-    else:
-        raise ValueError("model_id must be provided")
+    results = _search_index(query_embedding, top_k, model_id, filters=filters, context="query_index")[0]
 
-    # Verify index type is supported
-    if not is_supported_index(index):
-        raise ValueError(
-            f"Unsupported FAISS index type: {type(index).__name__}. "
-            "Only IndexFlat and IndexFlatIP are supported as they guarantee "
-            "reconstruct_n support and direct similarity search."
-        )
+    # Apply centralized filtering logic
+    from rag.retrieval_logic import apply_retrieval_fallback
+    return apply_retrieval_fallback(
+        chunks=results,
+        score_threshold=score_threshold,
+        min_return=min_return or 3,
+        max_return=max_return
+    )
 
-    logger.info(f"FAISS index is trained: {getattr(index, 'is_trained', 'N/A')}, total vectors: {getattr(index, 'ntotal', 'N/A')}")
-    logger.info(f"Query embedding shape: {query_embedding.shape}, dtype: {query_embedding.dtype}")
-    logger.info(f"First few values: {query_embedding[:5] if query_embedding.ndim == 1 else query_embedding[0][:5]}")
-    
-    # Ensure query_embedding is 2D for FAISS operations
-    if query_embedding.ndim == 1:
-        query_embedding = query_embedding.reshape(1, -1)
-    
-    faiss.normalize_L2(query_embedding)
 
-    # --- Pre-retrieval metadata filtering ---
-    if filters:
-        filtered_metadata = [m for m in metadata if all(m.get(k) == v for k, v in filters.items())]
-    else:
-        filtered_metadata = metadata
+def query_index_batch(
+    query_embeddings: np.ndarray,
+    top_k: int,
+    model_id: Optional[str] = None,
+    score_threshold: float = 0.2,
+    min_return: Optional[int] = None,
+    max_return: Optional[int] = None
+) -> List[List[Dict[str, Any]]]:
+    """
+    Query the FAISS index for several query embeddings with a single search call.
 
-    if not filtered_metadata:
-        return []  # No results match filter
+    The (B, d) matrix is normalized once in place and handed to index.search in one
+    go, so FAISS runs one tiled matrix multiply and keeps only the top_k per row
+    instead of B separate searches. Each row is filtered exactly as query_index
+    filters a single query. Metadata filtering is not supported here; use
+    query_index for filtered queries.
 
-    # Map chunk_id to index in metadata (which matches FAISS vector order)
-    id_to_idx = {meta["chunk_id"]: i for i, meta in enumerate(metadata)}
-    valid_indices = [id_to_idx[m["chunk_id"]] for m in filtered_metadata]
+    Args:
+        query_embeddings: Query embeddings with shape (B, d) (or (d,) for one query)
+        top_k: Number of results to retrieve per query
+        model_id: Model identifier for model-specific index
+        score_threshold: Minimum similarity score (default: 0.2)
+        min_return: Minimum number of chunks to return per query
+        max_return: Maximum number of chunks to return per query
 
-    # After filtering
-    logger.info(f"[RAG][ShapeCheck] valid_indices: {valid_indices}, count: {len(valid_indices)}")
+    Returns:
+        One list of chunk dictionaries per query row, in input order
 
-    if not filters:
-        # If no filters, use direct FAISS search (faster)
-        scores, indices = index.search(query_embedding, top_k)
-        scores = scores[0]  # Remove batch dimension
-        indices = indices[0]
-        results = []
-        for rank, (score, idx) in enumerate(zip(scores, indices)):
-            result = metadata[idx].copy()
-            result["score"] = float(score)
-            result["rank"] = rank
-            # Add country_flag
-            result["country_flag"] = country_to_flag(result.get("country"))
-            results.append(result)
-        
-        # Apply centralized filtering logic
-        from rag.retrieval_logic import apply_retrieval_fallback
-        return apply_retrieval_fallback(
-            chunks=results,
-            score_threshold=score_threshold,
-            min_return=min_return or 3,
-            max_return=max_return
-        )
-    else:
-        # With filters, we need to reconstruct vectors and do manual scoring
-        # This is safe because we verified index type is IndexFlatIP
-        all_vectors = index.reconstruct_n(0, index.ntotal)
-        filtered_vectors = all_vectors[valid_indices]
-        
-        # Use centralized FAISS scoring with robust shape handling
-        scores = safe_faiss_scoring(filtered_vectors, query_embedding, context="filtered_query")
-        
-        logger.info(f"[RAG][ShapeCheck] Number of chunks after filtering: {len(scores)}")
-        top_indices = scores.argsort()[::-1][:top_k]
-        logger.info(f"Top 10 scores: {scores[top_indices][:10]}")
-        logger.info(f"Top 10 chunk IDs: {[filtered_metadata[i]['chunk_id'] for i in top_indices[:10]]}")
-        
-        # Build results without filtering (filtering will be applied by centralized logic)
-        results = []
-        for rank, i in enumerate(top_indices):
-            result = filtered_metadata[i].copy()
-            result["score"] = float(scores[i])
-            result["rank"] = rank
-            # Add country_flag
-            result["country_flag"] = country_to_flag(result.get("country"))
-            results.append(result)
-        
-        # Apply centralized filtering logic
-        from rag.retrieval_logic import apply_retrieval_fallback
-        return apply_retrieval_fallback(
+    Raises:
+        ValueError: If model_id is missing or the index type is unsupported
+    """
+    validate_retrieval_parameters(
+        top_k=top_k,
+        score_threshold=score_threshold,
+        min_return=min_return or 3,
+        max_return=max_return,
+        context="query_index_batch"
+    )
+
+    from rag.retrieval_logic import apply_retrieval_fallback
+    return [
+        apply_retrieval_fallback(
             chunks=results,
             score_threshold=score_threshold,
             min_return=min_return or 3,
             max_return=max_return
         )
+        for results in _search_index(query_embeddings, top_k, model_id, context="query_index_batch")
+    ]
 
 
 class BaseRetriever(ABC):
@@ -303,7 +414,7 @@ class BaseRetriever(ABC):
                 return model, model_dim
             
             # Load index and check dimensions (only for FAISS retrievers)
-            index = load_index(model_id)
+            index = load_index(model_id=model_id)
             if not index.is_trained:
                 log_with_context(
                     logger,
@@ -12,7 +12,7 @@ from typing import List, Dict, Any, Optional
 import numpy as np
 from rag.retriever import BaseRetriever
 from rag.model_config import get_model_config, DEFAULT_MODEL_ID
-from rag.query_qdrant import query_qdrant, query_qdrant_with_embedding
+from rag.query_qdrant import query_qdrant, query_qdrant_with_embedding, query_qdrant_batch_with_embeddings
 from rag.logging_utils import get_module_logger, log_with_context, QueryContext
 from rag.validation import validate_query_string, validate_retrieval_parameters, validate_filters
 
@@ -216,3 +216,83 @@ class QdrantRetriever(BaseRetriever):
                     }
                 )
                 raise
+
+    def retrieve_batch_with_embeddings(
+        self,
+        embeddings: List[np.ndarray],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: float = 0.2,
+        min_return: int = 3,
+        max_return: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve chunks for several pre-computed embeddings in one Qdrant request.
+        Args:
+            embeddings: Pre-computed query embeddings (a list of arrays or a 2D array)
+            top_k: Number of chunks to retrieve per embedding
+            filters: Optional metadata filters
+            score_threshold: Minimum similarity score
+            min_return: Minimum number of chunks to return per embedding
+            max_return: Maximum number of chunks to return per embedding
+        Returns:
+            One list of chunk dictionaries per embedding, in input order
+        """
+        with QueryContext(self.model_id):
+            if any(embedding is None or np.asarray(embedding).size == 0 for embedding in embeddings):
+                raise ValueError("Embedding cannot be None or empty")
+            validate_retrieval_parameters(
+                top_k=top_k,
+                score_threshold=score_threshold,
+                min_return=min_return,
+                max_return=max_return,
+                context="QdrantRetriever.retrieve_batch_with_embeddings"
+            )
+            validate_filters(filters, context="QdrantRetriever.retrieve_batch_with_embeddings")
+            log_with_context(
+                logger,
+                logging.INFO,
+                "QdrantRetriever",
+                "Starting batched Qdrant retrieval with pre-computed embeddings",
+                {
+                    "batch_size": len(embeddings),
+                    "top_k": top_k,
+                    "score_threshold": score_threshold,
+                    "has_filters": filters is not None
+                }
+            )
+            try:
+                batch_chunks = query_qdrant_batch_with_embeddings(
+                    embeddings=[np.asarray(embedding).tolist() for embedding in embeddings],
+                    top_k=top_k,
+                    filters=filters,
+                    score_threshold=score_threshold
+                )
+                results = []
+                for chunks in batch_chunks:
+                    chunks = chunks or []
+                    if min_return and len(chunks) < min_return:
+                        logger.warning(f"Qdrant returned {len(chunks)} chunks, but min_return={min_return}")
+                    if max_return and len(chunks) > max_return:
+                        chunks = chunks[:max_return]
+                    results.append(chunks)
+                log_with_context(
+                    logger,
+                    logging.INFO,
+                    "QdrantRetriever",
+                    "Batched retrieval completed",
+                    {"chunks_returned": [len(chunks) for chunks in results]}
+                )
+                return results
+            except Exception as e:
+                log_with_context(
+                    logger,
+                    logging.ERROR,
+                    "QdrantRetriever",
+                    "Batched retrieval failed",
+                    {
+                        "error": str(e),
+                        "error_type": type(e).__name__
+                    }
+                )
+                raise
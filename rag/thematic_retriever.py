@@ -192,39 +192,55 @@ class ThematicRetriever:
                 max_return=max_return
             )
         
+        # Search all terms in one vector-store request when the base retriever supports it
+        chunks_per_term = None
+        if hasattr(self.base_retriever, 'retrieve_batch_with_embeddings'):
+            logger.info(f"[ThematicRetriever] Using retrieve_batch_with_embeddings for {len(terms)} terms")
+            chunks_per_term = self.base_retriever.retrieve_batch_with_embeddings(
+                embeddings=embeddings,
+                top_k=top_k,
+                filters=filters,
+                score_threshold=score_threshold,
+                min_return=min_return,
+                max_return=max_return
+            )
+        
         # Retrieve chunks for each term using the pre-computed embeddings
         all_chunks = []
         for i, (term, embedding) in enumerate(zip(terms, embeddings)):
             similarity_score = term_weights[term]
             
-            # Use the pre-computed embedding directly with Weaviate
-            # This eliminates the need to re-embed each term individually
-            logger.debug(f"[ThematicRetriever] Checking if base_retriever has retrieve_with_embedding method")
-            logger.debug(f"[ThematicRetriever] base_retriever type: {type(self.base_retriever)}")
-            logger.debug(f"[ThematicRetriever] base_retriever methods: {[m for m in dir(self.base_retriever) if 'retrieve' in m]}")
-            
-            if hasattr(self.base_retriever, 'retrieve_with_embedding'):
-                logger.info(f"[ThematicRetriever] Using retrieve_with_embedding for term '{term}'")
-                # Use the new method that accepts pre-computed embeddings
-                chunks = self.base_retriever.retrieve_with_embedding(
-                    embedding=embedding,
-                    top_k=top_k,
-                    filters=filters,
-                    score_threshold=score_threshold,
-                    min_return=min_return,
-                    max_return=max_return
-                )
+            if chunks_per_term is not None:
+                chunks = chunks_per_term[i]
             else:
-                logger.warning(f"[ThematicRetriever] retrieve_with_embedding not found, falling back to regular retrieve for term '{term}'")
-                # Fallback to regular retrieve method (will re-embed)
-                chunks = self.base_retriever.retrieve(
-                    query=term,
-                    top_k=top_k,
-                    filters=filters,
-                    score_threshold=score_threshold,
-                    min_return=min_return,
-                    max_return=max_return
-                )
+                # Use the pre-computed embedding directly with Weaviate
+                # This eliminates the need to re-embed each term individually
+                logger.debug(f"[ThematicRetriever] Checking if base_retriever has retrieve_with_embedding method")
+                logger.debug(f"[ThematicRetriever] base_retriever type: {type(self.base_retriever)}")
+                logger.debug(f"[ThematicRetriever] base_retriever methods: {[m for m in dir(self.base_retriever) if 'retrieve' in m]}")
+                
+                if hasattr(self.base_retriever, 'retrieve_with_embedding'):
+                    logger.info(f"[ThematicRetriever] Using retrieve_with_embedding for term '{term}'")
+                    # Use the new method that accepts pre-computed embeddings
+                    chunks = self.base_retriever.retrieve_with_embedding(
+                        embedding=embedding,
+                        top_k=top_k,
+                        filters=filters,
+                        score_threshold=score_threshold,
+                        min_return=min_return,
+                        max_return=max_return
+                    )
+                else:
+                    logger.warning(f"[ThematicRetriever] retrieve_with_embedding not found, falling back to regular retrieve for term '{term}'")
+                    # Fallback to regular retrieve method (will re-embed)
+                    chunks = self.base_retriever.retrieve(
+                        query=term,
+                        top_k=top_k,
+                        filters=filters,
+                        score_threshold=score_threshold,
+                        min_return=min_return,
+                        max_return=max_return
+                    )
             
             # Apply exponential weight scaling to chunk scores
             weighted_chunks = self._apply_term_weights(chunks, similarity_score, term)
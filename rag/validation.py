@@ -13,6 +13,22 @@ from rag.logging_utils import get_module_logger, log_with_context, QueryContext
 logger = get_module_logger(__name__)
 
 
+# Same tolerance as np.allclose(vec, 0.0): every |x| <= atol (1e-8)
+_ZERO_VECTOR_ATOL = 1e-8
+
+
+def _is_zero_vector(vec: np.ndarray) -> bool:
+    """
+    np.allclose(vec, 0.0) for finite vectors, without allclose's temporary arrays.
+    Integer vectors are zero only if every element is 0 (np.abs overflows on e.g. int8 -128).
+    """
+    if vec.size == 0:
+        return True
+    if not np.issubdtype(vec.dtype, np.inexact):
+        return not np.any(vec)
+    return bool(np.abs(vec).max() <= _ZERO_VECTOR_ATOL)
+
+
 def is_invalid_vector(vec: np.ndarray) -> bool:
     """
     Check if a vector is invalid (NaN, inf, or zero).
@@ -26,7 +42,7 @@ def is_invalid_vector(vec: np.ndarray) -> bool:
     return (
         np.isnan(vec).any()
         or np.isinf(vec).any()
-        or np.allclose(vec, 0.0)
+        or _is_zero_vector(vec)
     )
 
 
@@ -105,7 +121,7 @@ def validate_embedding_vector(
         raise ValueError(f"{context} contains infinite values")
     
     # Check for zero vector
-    if np.allclose(vec, 0.0):
+    if _is_zero_vector(vec):
         raise ValueError(f"{context} is a zero vector")
     
     # Check shape
@@ -130,6 +146,10 @@ def validate_embedding_vector(
         logger.warning(f"{context} dtype is {vec.dtype}, converting to float32")
         vec = vec.astype(np.float32)
     
+    # Skip the norm and message formatting unless debug logging is on; this runs per query
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    
     log_with_context(
         logger,
         logging.DEBUG,
@@ -1 +1,43 @@
 """Shared test fixtures for NobelLM test suite."""
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--refresh-cache",
+        action="store_true",
+        default=False,
+        help="Ignore cached OpenAI responses in live tests and record fresh ones",
+    )
+
+
+# Session fixtures that load the bge-large model or its theme embeddings
+_MODEL_FIXTURES = {"bge_model", "bge_themes"}
+
+
+def pytest_collection_modifyitems(config, items):
+    """Mark every test that (directly or via another fixture) loads a model as slow."""
+    for item in items:
+        if _MODEL_FIXTURES.intersection(getattr(item, "fixturenames", ())):
+            item.add_marker(pytest.mark.slow)
+
+
+@pytest.fixture(scope="session")
+def bge_model():
+    """The bge-large SentenceTransformer, loaded once per test session."""
+    from rag.cache import get_model
+    return get_model("bge-large")
+
+
+@pytest.fixture(scope="session")
+def bge_themes():
+    """The shared bge-large ThemeEmbeddings, loaded once per test session."""
+    from config.theme_embeddings import get_theme_embeddings
+    return get_theme_embeddings("bge-large")
+
+
+@pytest.fixture(scope="session")
+def classifier():
+    """One IntentClassifier shared by tests that only classify queries."""
+    from rag.intent_classifier import IntentClassifier
+    return IntentClassifier()
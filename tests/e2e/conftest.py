@@ -0,0 +1,24 @@
+"""Fixtures shared by the end-to-end tests."""
+import os
+
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def theme_matrix_cache_dir(tmp_path_factory):
+    """
+    Write theme matrix caches to a temp dir instead of the real home directory.
+
+    Under pytest-xdist every worker uses the same dir in the run's shared base temp,
+    so workers memory-map one matrix file (written atomically) instead of each
+    building its own.
+    """
+    import config.theme_embeddings as theme_embeddings_module
+    if os.environ.get("PYTEST_XDIST_WORKER"):
+        cache_dir = tmp_path_factory.getbasetemp().parent / "theme_matrix_cache"
+        cache_dir.mkdir(exist_ok=True)
+    else:
+        cache_dir = tmp_path_factory.mktemp("theme_matrix_cache")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(theme_embeddings_module, "THEME_MATRIX_CACHE_DIR", cache_dir)
+        yield cache_dir
@@ -11,11 +11,12 @@ import numpy as np
 import faiss
 import logging
 from typing import Dict, Any
+from unittest.mock import MagicMock
 
 # Enable dual-process FAISS retrieval to prevent segfaults on Mac/Intel
 os.environ["NOBELLM_USE_FAISS_SUBPROCESS"] = "1"
 
-from rag.query_engine import answer_query
+from rag.query_engine import answer_query, LARGE_QUERY_THRESHOLD
 from rag.retriever import query_index, is_supported_index
 from rag.model_config import get_model_config
 from rag.utils import filter_top_chunks
@@ -30,59 +31,53 @@ def mock_ivf_index():
     index.train(np.random.rand(100, d).astype('float32'))
     return index
 
+# (chunk_id, score, text) rows for mock_chunks, built once per module
+MOCK_CHUNKS = tuple(
+    {"chunk_id": f"chunk_{i}", "score": score, "text": f"Text {i}"}
+    for i, score in enumerate([0.9, 0.8, 0.7, 0.6, 0.5, 0.4, 0.3, 0.2, 0.1, 0.05])
+)
+
 @pytest.fixture
 def mock_chunks():
-    """Create mock chunks with varying scores for testing filter_top_chunks."""
-    return [
-        {"chunk_id": f"chunk_{i}", "score": score, "text": f"Text {i}"}
-        for i, score in enumerate([0.9, 0.8, 0.7, 0.6, 0.5, 0.4, 0.3, 0.2, 0.1, 0.05])
-    ]
+    """Fresh copies of MOCK_CHUNKS for testing filter_top_chunks.
+
+    Filtering writes filtering_reason into the chunk dicts, so every test gets its
+    own dicts instead of sharing (and mutating) module-level ones.
+    """
+    return [dict(chunk) for chunk in MOCK_CHUNKS]
 
 def test_empty_query():
     """Test handling of empty queries."""
     with pytest.raises(ValueError, match="must be a non-empty string"):
         answer_query("")
 
-def test_missing_index_file():
+def test_missing_index_file(monkeypatch, tmp_path):
     """Test handling of missing FAISS index file."""
-    # Check if index file exists first
-    config = get_model_config()
-    index_path = config["index_path"]
-    
-    if not os.path.exists(index_path):
-        pytest.skip(f"Index file {index_path} does not exist, skipping test")
-    
-    # Test that the index file can be loaded without segfault
-    try:
-        import faiss
-        index = faiss.read_index(index_path)
-        assert index is not None
-    except Exception as e:
-        pytest.skip(f"Could not load index file: {e}")
-    
-    # Temporarily rename index file to simulate missing file
-    backup_path = f"{index_path}.bak"
-    
-    try:
-        os.rename(index_path, backup_path)
-        
-        # Test that FAISS raises an error when index is missing
-        with pytest.raises((FileNotFoundError, RuntimeError)):
-            faiss.read_index(index_path)
-    finally:
-        # Restore index file
-        if os.path.exists(backup_path):
-            os.rename(backup_path, index_path)
-
-def test_zero_vector_handling():
-    """Test handling of zero vectors in query_index."""
-    # Skip if index file doesn't exist to prevent segfault
-    config = get_model_config()
-    if not os.path.exists(config["index_path"]):
-        pytest.skip("Index file does not exist, skipping test")
-    
-    zero_vector = np.zeros(384, dtype=np.float32)  # Standard embedding dimension
+    import rag.cache
+
+    # Point the loader at a path that does not exist and give it an empty cache,
+    # so the real index on disk is never touched (safe under parallel runs)
+    missing_config = {
+        **get_model_config("bge-large"),
+        "index_path": str(tmp_path / "index.faiss"),
+    }
+    monkeypatch.setattr(rag.cache.ModelCache, "_cache", {})
+    monkeypatch.setattr(rag.cache, "get_model_config", lambda model_id=None: missing_config)
+
+    query_embedding = np.random.rand(1024).astype(np.float32)
+    with pytest.raises(FileNotFoundError, match="Index file not found"):
+        query_index(
+            query_embedding=query_embedding,
+            top_k=5,
+            model_id="bge-large"
+        )
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float16, np.int8])
+def test_zero_vector_handling(dtype):
+    """Test handling of zero vectors in query_index, whatever the input dtype."""
+    zero_vector = np.zeros(1024, dtype=dtype)  # bge-large embedding dimension
     
+    # Validation runs before the index is loaded, so no index file is needed
     with pytest.raises(ValueError, match="is a zero vector"):
         query_index(
             query_embedding=zero_vector,
@@ -90,21 +85,17 @@ def test_zero_vector_handling():
             model_id="bge-large"
         )
 
-def test_model_config_mismatch():
-    """Test handling of mismatched model and index dimensions."""
-    # Skip if index file doesn't exist to prevent segfault
-    config = get_model_config()
-    if not os.path.exists(config["index_path"]):
-        pytest.skip("Index file does not exist, skipping test")
-    
-    # Create a vector with wrong dimension
-    wrong_dim_vector = np.random.rand(512).astype(np.float32)  # Wrong dimension
+@pytest.mark.parametrize("dtype", [np.float32, np.float16, np.int8])
+def test_model_config_mismatch(dtype):
+    """Test handling of mismatched model and query embedding dimensions."""
+    # Create a vector with wrong dimension (bge-large expects 1024)
+    wrong_dim_vector = np.ones(384, dtype=dtype)
     
-    with pytest.raises(AssertionError):
+    with pytest.raises(ValueError, match="dimension mismatch: got 384, expected 1024"):
         query_index(
             query_embedding=wrong_dim_vector,
             top_k=5,
-            model_id="bge-large"  # Expects 384 dimensions
+            model_id="bge-large"
         )
 
 def test_unsupported_index_type(mock_ivf_index):
@@ -169,26 +160,27 @@ def test_score_threshold_edge_cases(mock_chunks):
     assert len(filtered) == 2  # min_return takes precedence
     assert all(chunk["score"] >= 0.9 for chunk in filtered)
 
-def test_large_query_handling(caplog):
+def test_large_query_handling(caplog, monkeypatch):
     """Test handling of very large queries (>100KB)."""
-    # Skip if index file doesn't exist to prevent segfault
-    config = get_model_config()
-    if not os.path.exists(config["index_path"]):
-        pytest.skip("Index file does not exist, skipping test")
+    # Route straight to a metadata answer so the test needs no index or model
+    mock_router = MagicMock()
+    mock_router.route_query.return_value.answer_type = "metadata"
+    monkeypatch.setattr("rag.query_engine.get_query_router", lambda: mock_router)
     
-    # Create a very large query string
-    large_query = "x" * 150 * 1024  # 150KB
+    # Just over the threshold is enough to exercise the large-query path
+    large_query = "x" * (LARGE_QUERY_THRESHOLD + 1)
     
     # Should not raise an error, but should log a warning
-    with caplog.at_level(logging.WARNING):
-        answer_query(large_query)
-        # Note: The actual implementation may not log this specific message
-        # This test now just ensures the query doesn't crash
+    with caplog.at_level(logging.WARNING, logger="rag.query_engine"):
+        result = answer_query(large_query)
+    
+    assert result["answer_type"] == "metadata"
+    assert "exceeds" in "\n".join(caplog.messages)
 
 def test_invalid_score_handling(mock_chunks):
     """Test handling of chunks with invalid scores."""
     # Add a chunk with invalid score
-    invalid_chunks = mock_chunks + [{"chunk_id": "invalid", "score": float('nan'), "text": "Invalid"}]
+    invalid_chunks = list(mock_chunks) + [{"chunk_id": "invalid", "score": float('nan'), "text": "Invalid"}]
     
     # Should filter out invalid scores - the implementation filters out NaN scores
     filtered = filter_top_chunks(invalid_chunks, score_threshold=0.2)
@@ -197,7 +189,7 @@ def test_invalid_score_handling(mock_chunks):
     assert all(not np.isnan(chunk["score"]) for chunk in filtered)
     
     # Test with negative scores
-    negative_chunks = mock_chunks + [{"chunk_id": "negative", "score": -0.5, "text": "Negative"}]
+    negative_chunks = list(mock_chunks) + [{"chunk_id": "negative", "score": -0.5, "text": "Negative"}]
     filtered = filter_top_chunks(negative_chunks, score_threshold=0.2)
     assert len(filtered) == 10  # Negative score is filtered out
     assert all(chunk["score"] >= 0 for chunk in filtered) 
\ No newline at end of file
@@ -18,7 +18,7 @@ import pytest
 import numpy as np
 import logging
 from typing import Dict, List
-from config.theme_embeddings import ThemeEmbeddings
+from config.theme_embeddings import ThemeEmbeddings, get_theme_embeddings
 from config.theme_similarity import (
     compute_theme_similarities,
     get_ranked_theme_keywords,
@@ -32,17 +32,35 @@ from rag.model_config import get_model_config
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Every bge-large query used below, embedded together by the query_embeddings fixture
+BGE_TEST_QUERIES = (
+    "What do laureates say about justice and fairness?",
+    "creativity and imagination in literature",
+    "peace and conflict resolution",
+    "How do Nobel laureates discuss freedom and liberty?",
+    "science and discovery",
+)
+
+
+@pytest.fixture(scope="module")
+def query_embeddings(bge_model):
+    """All BGE_TEST_QUERIES embedded in one batched encode call, keyed by query."""
+    embeddings = bge_model.encode(list(BGE_TEST_QUERIES), batch_size=16, normalize_embeddings=True)
+    return dict(zip(BGE_TEST_QUERIES, embeddings))
+
 
 class TestThemeEmbeddings:
     """Test the ThemeEmbeddings class functionality."""
     
-    def test_theme_embeddings_initialization(self):
-        """Test that theme embeddings initialize correctly."""
-        embeddings = ThemeEmbeddings("bge-large")
+    @pytest.mark.parametrize("model_id", ["bge-large", "miniLM"])
+    def test_theme_embeddings_initialization(self, model_id):
+        """Test that theme embeddings initialize correctly for each supported model."""
+        embeddings = get_theme_embeddings(model_id)
+        expected_dim = get_model_config(model_id)["embedding_dim"]
         
         # Check basic properties
-        assert embeddings.model_id == "bge-large"
-        assert embeddings.embedding_dim == 1024
+        assert embeddings.model_id == model_id
+        assert embeddings.embedding_dim == expected_dim
         assert len(embeddings.themes) > 0
         
         # Check that embeddings were computed
@@ -51,26 +69,17 @@ class TestThemeEmbeddings:
         
         # Check embedding dimensions
         for keyword, embedding in all_embeddings.items():
-            assert embedding.shape[0] == 1024
+            assert embedding.shape[0] == expected_dim
             assert embedding.dtype == np.float32
-    
-    def test_theme_embeddings_minilm(self):
-        """Test theme embeddings with miniLM model."""
-        embeddings = ThemeEmbeddings("miniLM")
-        
-        assert embeddings.model_id == "miniLM"
-        assert embeddings.embedding_dim == 384
         
-        all_embeddings = embeddings.get_all_embeddings()
-        assert len(all_embeddings) > 0
-        
-        for keyword, embedding in all_embeddings.items():
-            assert embedding.shape[0] == 384
-            assert embedding.dtype == np.float32
+        # The stacked matrix used for scoring has one row per keyword
+        keywords, matrix = embeddings.get_theme_matrix()
+        assert matrix.shape == (len(all_embeddings), expected_dim)
+        assert matrix.dtype == np.float32
     
-    def test_theme_embedding_retrieval(self):
+    def test_theme_embedding_retrieval(self, bge_themes):
         """Test retrieving specific theme embeddings."""
-        embeddings = ThemeEmbeddings("bge-large")
+        embeddings = bge_themes
         
         # Test valid keywords
         justice_emb = embeddings.get_theme_embedding("justice")
@@ -85,9 +94,9 @@ class TestThemeEmbeddings:
         invalid_emb = embeddings.get_theme_embedding("nonexistent_keyword")
         assert invalid_emb is None
     
-    def test_theme_embedding_validation(self):
+    def test_theme_embedding_validation(self, bge_themes):
         """Test keyword validation functionality."""
-        embeddings = ThemeEmbeddings("bge-large")
+        embeddings = bge_themes
         
         # Test valid keywords
         assert embeddings.validate_keyword("justice") == True
@@ -96,9 +105,9 @@ class TestThemeEmbeddings:
         # Test invalid keywords
         assert embeddings.validate_keyword("nonexistent") == False
     
-    def test_embedding_stats(self):
+    def test_embedding_stats(self, bge_themes):
         """Test embedding statistics functionality."""
-        embeddings = ThemeEmbeddings("bge-large")
+        embeddings = bge_themes
         stats = embeddings.get_embedding_stats()
         
         assert "model_id" in stats
@@ -125,12 +134,10 @@ class TestThemeEmbeddings:
 class TestThemeSimilarity:
     """Test the theme similarity computation functionality."""
     
-    def test_similarity_computation_basic(self):
+    def test_similarity_computation_basic(self, query_embeddings):
         """Test basic similarity computation."""
         # Get a test query embedding
-        model = get_model("bge-large")
-        query = "What do laureates say about justice and fairness?"
-        query_embedding = model.encode([query], normalize_embeddings=True)[0]
+        query_embedding = query_embeddings["What do laureates say about justice and fairness?"]
         
         # Compute similarities
         similarities = compute_theme_similarities(
@@ -152,11 +159,9 @@ class TestThemeSimilarity:
         keywords = list(similarities.keys())
         assert any("justice" in kw.lower() or "fairness" in kw.lower() for kw in keywords)
     
-    def test_similarity_threshold_filtering(self):
+    def test_similarity_threshold_filtering(self, query_embeddings):
         """Test that similarity threshold filtering works correctly."""
-        model = get_model("bge-large")
-        query = "creativity and imagination in literature"
-        query_embedding = model.encode([query], normalize_embeddings=True)[0]
+        query_embedding = query_embeddings["creativity and imagination in literature"]
         
         # Test with high threshold
         high_threshold_similarities = compute_theme_similarities(
@@ -182,11 +187,9 @@ class TestThemeSimilarity:
         for score in low_threshold_similarities.values():
             assert score >= 0.1
     
-    def test_ranked_theme_keywords(self):
+    def test_ranked_theme_keywords(self, query_embeddings):
         """Test ranked theme keyword functionality."""
-        model = get_model("bge-large")
-        query = "peace and conflict resolution"
-        query_embedding = model.encode([query], normalize_embeddings=True)[0]
+        query_embedding = query_embeddings["peace and conflict resolution"]
         
         ranked_keywords = get_ranked_theme_keywords(
             query_embedding=query_embedding,
@@ -272,15 +275,13 @@ class TestThemeSimilarity:
 class TestPhase3Integration:
     """Test integration between theme embeddings and similarity computation."""
     
-    def test_end_to_end_similarity_workflow(self):
+    def test_end_to_end_similarity_workflow(self, bge_themes, query_embeddings):
         """Test complete workflow from query to ranked similarities."""
         # Initialize theme embeddings
-        theme_embeddings = ThemeEmbeddings("bge-large")
+        theme_embeddings = bge_themes
         
         # Create test query
-        model = get_model("bge-large")
-        query = "How do Nobel laureates discuss freedom and liberty?"
-        query_embedding = model.encode([query], normalize_embeddings=True)[0]
+        query_embedding = query_embeddings["How do Nobel laureates discuss freedom and liberty?"]
         
         # Compute similarities
         similarities = compute_theme_similarities(
@@ -300,12 +301,11 @@ class TestPhase3Integration:
         for keyword in similarities.keys():
             assert theme_embeddings.validate_keyword(keyword)
     
-    def test_model_switching(self):
+    def test_model_switching(self, query_embeddings):
         """Test that similarity computation works with different models."""
         # Test with bge-large
-        model_large = get_model("bge-large")
         query = "science and discovery"
-        query_embedding_large = model_large.encode([query], normalize_embeddings=True)[0]
+        query_embedding_large = query_embeddings[query]
         
         similarities_large = compute_theme_similarities(
             query_embedding=query_embedding_large,
@@ -342,7 +342,7 @@ def run_phase3_infrastructure_tests():
     
     # Test theme embeddings
     logger.info("Testing ThemeEmbeddings...")
-    theme_embeddings = ThemeEmbeddings("bge-large")
+    theme_embeddings = get_theme_embeddings("bge-large")
     stats = theme_embeddings.get_embedding_stats()
     logger.info(f"Theme embedding stats: {stats}")
     
@@ -356,8 +356,8 @@ def run_phase3_infrastructure_tests():
         "science and discovery"
     ]
     
-    for query in test_queries:
-        query_embedding = model.encode([query], normalize_embeddings=True)[0]
+    query_embeddings = model.encode(test_queries, normalize_embeddings=True)
+    for query, query_embedding in zip(test_queries, query_embeddings):
         similarities = compute_theme_similarities(
             query_embedding=query_embedding,
             model_id="bge-large",
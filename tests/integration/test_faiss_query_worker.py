@@ -7,19 +7,26 @@ ensuring proper subprocess communication and error handling.
 
 import pytest
 import numpy as np
+import io
 import json
-from unittest.mock import patch, MagicMock
-from rag.faiss_query_worker import main
+import sys
+import os
+from pathlib import Path
+from unittest.mock import ANY, patch, MagicMock
+import faiss
+from rag.faiss_query_worker import main, main_batch, run_query, run_query_batch, serve
+from rag.dual_process_retriever import FaissWorkerClient, retrieve_chunks_dual_process, retrieve_chunks_dual_process_batch
 
 # -----------------------------------------------------------------------------------
 # Test Fixtures
 # -----------------------------------------------------------------------------------
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_embedding():
-    """Mock embedding vector."""
+    """Mock embedding vector, shared read-only by every test in the module."""
     embedding = np.random.rand(768).astype(np.float32)
     embedding /= np.linalg.norm(embedding)
+    embedding.setflags(write=False)
     return embedding
 
 @pytest.fixture
@@ -54,8 +61,7 @@ def test_query_worker_main_integration(mock_embedding, mock_chunks):
     query = "What are common themes in Nobel laureate speeches?"
     
     with patch('rag.faiss_query_worker.get_model') as mock_model, \
-         patch('rag.faiss_query_worker.query_index') as mock_query_index, \
-         patch('rag.faiss_query_worker.filter_top_chunks') as mock_filter:
+         patch('rag.faiss_query_worker.query_index') as mock_query_index:
         
         # Setup mocks
         mock_model_instance = MagicMock()
@@ -63,7 +69,6 @@ def test_query_worker_main_integration(mock_embedding, mock_chunks):
         mock_model_instance.get_sentence_embedding_dimension.return_value = 768
         mock_model.return_value = mock_model_instance
         mock_query_index.return_value = mock_chunks
-        mock_filter.return_value = mock_chunks
         
         # Test query worker main function
         result = main(
@@ -80,12 +85,11 @@ def test_query_worker_main_integration(mock_embedding, mock_chunks):
         assert result[1]["text"] == "The human condition is explored through narrative."
         
         # Verify FAISS index was called correctly
-        mock_query_index.assert_called_once()
-        call_args = mock_query_index.call_args
         # The embedding is passed as the first argument
-        assert call_args[0][0] is mock_embedding  # First positional argument
-        assert call_args[1]["top_k"] == 5  # top_k parameter
-        assert call_args[1]["model_id"] == "bge-large"  # model_id parameter
+        mock_query_index.assert_called_once_with(
+            mock_embedding, model_id="bge-large", top_k=5, filters=None,
+            score_threshold=0.2, min_return=3, max_return=None
+        )
 
 @pytest.mark.integration
 def test_query_worker_with_filters(mock_embedding, mock_chunks):
@@ -93,13 +97,11 @@ def test_query_worker_with_filters(mock_embedding, mock_chunks):
     query = "What did Toni Morrison say about justice?"
     
     with patch('rag.faiss_query_worker.get_model') as mock_model, \
-         patch('rag.faiss_query_worker.query_index') as mock_query_index, \
-         patch('rag.faiss_query_worker.filter_top_chunks') as mock_filter:
+         patch('rag.faiss_query_worker.query_index') as mock_query_index:
         
         # Setup mocks
         mock_model.return_value.encode.return_value = mock_embedding
         mock_query_index.return_value = [mock_chunks[0]]  # Only first chunk matches filter
-        mock_filter.return_value = [mock_chunks[0]]
         
         filters = {"laureate": "Toni Morrison"}
         
@@ -116,9 +118,10 @@ def test_query_worker_with_filters(mock_embedding, mock_chunks):
         assert result[0]["laureate"] == "Toni Morrison"
         
         # Verify query_index was called with filters
-        mock_query_index.assert_called_once()
-        call_args = mock_query_index.call_args
-        assert call_args[1]["filters"] == {"laureate": "Toni Morrison"}
+        mock_query_index.assert_called_once_with(
+            ANY, model_id="bge-large", top_k=5, filters={"laureate": "Toni Morrison"},
+            score_threshold=0.2, min_return=3, max_return=None
+        )
 
 @pytest.mark.integration
 def test_query_worker_error_handling():
@@ -143,13 +146,11 @@ def test_query_worker_empty_results(mock_embedding):
     query = "Query with no results"
     
     with patch('rag.faiss_query_worker.get_model') as mock_model, \
-         patch('rag.faiss_query_worker.query_index') as mock_query_index, \
-         patch('rag.faiss_query_worker.filter_top_chunks') as mock_filter:
+         patch('rag.faiss_query_worker.query_index') as mock_query_index:
         
         # Setup mocks
         mock_model.return_value.encode.return_value = mock_embedding
         mock_query_index.return_value = []
-        mock_filter.return_value = []
         
         result = main(
             query=query,
@@ -168,15 +169,12 @@ def test_query_worker_score_threshold_filtering(mock_embedding, mock_chunks):
     query = "What are common themes in Nobel laureate speeches?"
     
     with patch('rag.faiss_query_worker.get_model') as mock_model, \
-         patch('rag.faiss_query_worker.query_index') as mock_query_index, \
-         patch('rag.faiss_query_worker.filter_top_chunks') as mock_filter:
+         patch('rag.faiss_query_worker.query_index') as mock_query_index:
         
         # Setup mocks
         mock_model.return_value.encode.return_value = mock_embedding
-        mock_query_index.return_value = mock_chunks
         # Only first chunk passes threshold
-        filtered_chunks = [mock_chunks[0]]
-        mock_filter.return_value = filtered_chunks
+        mock_query_index.return_value = [mock_chunks[0]]
         
         result = main(
             query=query,
@@ -191,7 +189,184 @@ def test_query_worker_score_threshold_filtering(mock_embedding, mock_chunks):
         assert result[0]["score"] >= 0.8
         assert result[0]["chunk_id"] == "c1"
         
-        # Verify filter_top_chunks was called with correct parameters
-        mock_filter.assert_called_once()
-        call_args = mock_filter.call_args
-        assert call_args[1]["score_threshold"] == 0.8
+        # Verify the threshold was passed to query_index, which filters the hits
+        mock_query_index.assert_called_once_with(
+            ANY, model_id="bge-large", top_k=5, filters=None,
+            score_threshold=0.8, min_return=ANY, max_return=ANY
+        )
+
+@pytest.mark.integration
+def test_query_worker_batch_single_search():
+    """Test batched worker queries are encoded and searched in one call each."""
+    vectors = np.array([[1.0, 0.0], [0.0, 1.0], [0.6, 0.8]], dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    index = faiss.IndexFlatIP(2)
+    index.add(vectors)
+    search_spy = MagicMock(side_effect=index.search)
+    index_proxy = MagicMock(spec=faiss.IndexFlatIP)
+    index_proxy.search = search_spy
+    metadata = [
+        {"chunk_id": f"c{i}", "text": f"Text {i}", "country": None}
+        for i in range(3)
+    ]
+    # Unnormalized on purpose: the worker must normalize the batch once before search
+    query_embeddings = np.array([[2.0, 0.0], [0.0, 3.0]], dtype=np.float32)
+
+    with patch('rag.faiss_query_worker.get_model') as mock_model, \
+         patch('rag.retriever.get_model_config', return_value={"embedding_dim": 2}), \
+         patch('rag.retriever.get_faiss_index_and_metadata', return_value=(index_proxy, metadata)):
+        mock_model.return_value.encode.return_value = query_embeddings
+
+        results = main_batch(
+            queries=["first query", "second query"],
+            model_id="bge-large",
+            top_k=2,
+            score_threshold=0.2,
+            min_return=1
+        )
+
+    mock_model.return_value.encode.assert_called_once()
+    search_spy.assert_called_once()
+    searched = search_spy.call_args[0][0]
+    assert searched.shape == (2, 2)
+    assert np.allclose(np.linalg.norm(searched, axis=1), 1.0)
+
+    assert len(results) == 2
+    assert results[0][0]["chunk_id"] == "c0"
+    assert results[1][0]["chunk_id"] == "c1"
+    assert results[0][0]["score"] == pytest.approx(1.0)
+
+class FakeWorkerProcess:
+    """
+    Stand-in for the --serve worker: records requests and replays canned responses
+    from a real pipe, which stays open so reads past the last response block.
+    """
+
+    def __init__(self, responses):
+        read_fd, self._write_fd = os.pipe()
+        os.write(self._write_fd, "".join(json.dumps(r) + "\n" for r in responses).encode("utf-8"))
+        self.stdin = io.BytesIO()
+        self.stdout = os.fdopen(read_fd, "rb")
+        self.killed = False
+
+    def poll(self):
+        return -9 if self.killed else None
+
+    def kill(self):
+        self.killed = True
+
+    def wait(self, timeout=None):
+        return self.poll()
+
+    def close(self):
+        self.stdout.close()
+        os.close(self._write_fd)
+
+    def requests(self):
+        return [json.loads(line) for line in self.stdin.getvalue().decode("utf-8").splitlines()]
+
+@pytest.fixture
+def fake_worker_processes():
+    """Factory for FakeWorkerProcess instances, closing their pipes after the test."""
+    processes = []
+
+    def make(responses):
+        processes.append(FakeWorkerProcess(responses))
+        return processes[-1]
+
+    yield make
+    for process in processes:
+        process.close()
+
+@pytest.mark.integration
+def test_query_worker_batch_matches_single_queries():
+    """Test each batched result equals run_query's result for the same query."""
+    vectors = np.array([[1.0, 0.0], [0.0, 1.0], [0.6, 0.8]], dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    index = faiss.IndexFlatIP(2)
+    index.add(vectors)
+    metadata = [{"chunk_id": f"c{i}", "text": f"Text {i}", "country": None} for i in range(3)]
+    query_embeddings = np.array([[1.0, 0.1], [0.1, 1.0]], dtype=np.float32)
+    params = {"model_id": "bge-large", "top_k": 3, "score_threshold": 0.5, "min_return": 1, "max_return": 2}
+
+    with patch('rag.faiss_query_worker.get_model') as mock_model, \
+         patch('rag.retriever.get_model_config', return_value={"embedding_dim": 2}), \
+         patch('rag.retriever.get_faiss_index_and_metadata', return_value=(index, metadata)):
+        mock_model.return_value.encode.return_value = query_embeddings
+        batch = run_query_batch(["first query", "second query"], **params)
+        mock_model.return_value.encode.return_value = query_embeddings[1:]
+        single = run_query("second query", **params)
+
+    assert batch[1] == single
+    assert [c["chunk_id"] for c in single] == ["c1", "c2"]
+
+@pytest.mark.integration
+def test_dual_process_worker_started_once(mock_chunks, fake_worker_processes):
+    """Test repeated dual-process queries reuse one persistent worker."""
+    process = fake_worker_processes([
+        {"chunks": [mock_chunks[0]]},
+        {"chunks": [[mock_chunks[0]], [mock_chunks[1]]]},
+    ])
+
+    with patch('rag.dual_process_retriever._worker', None), \
+         patch('rag.dual_process_retriever.atexit.register'), \
+         patch('rag.dual_process_retriever.subprocess.Popen', return_value=process) as mock_popen:
+        single = retrieve_chunks_dual_process("justice", model_id="bge-large", top_k=5)
+        batch = retrieve_chunks_dual_process_batch(["justice", "the human condition"], model_id="bge-large", top_k=5)
+
+    mock_popen.assert_called_once()
+    assert mock_popen.call_args[0][0][-1] == "--serve"
+    assert single == [mock_chunks[0]]
+    assert batch == [[mock_chunks[0]], [mock_chunks[1]]]
+    first, second = process.requests()
+    assert first["query"] == "justice" and first["top_k"] == 5
+    assert second["queries"] == ["justice", "the human condition"]
+
+@pytest.mark.integration
+def test_dual_process_worker_killed_after_timeout(mock_chunks, fake_worker_processes):
+    """Test a worker that does not answer in time is killed and replaced on the next request."""
+    hung = fake_worker_processes([])
+    healthy = fake_worker_processes([{"chunks": [mock_chunks[0]]}])
+    client = FaissWorkerClient(Path("rag/faiss_query_worker.py"), timeout=0.05)
+
+    with patch('rag.dual_process_retriever.subprocess.Popen', side_effect=[hung, healthy]) as mock_popen:
+        with pytest.raises(RuntimeError, match="did not respond within 0.05s"):
+            client.request({"query": "justice"})
+        assert hung.killed
+        assert client.request({"query": "justice"}) == [mock_chunks[0]]
+
+    assert mock_popen.call_count == 2
+
+@pytest.mark.integration
+def test_query_worker_serve_answers_each_line(mock_chunks):
+    """Test the serve loop answers one JSON line per request, including failures."""
+    stdin = io.StringIO(
+        json.dumps({"query": "justice", "model_id": "bge-large", "top_k": 5}) + "\n"
+        + json.dumps({"query": "broken", "model_id": "bge-large"}) + "\n"
+    )
+    stdout = io.StringIO()
+
+    with patch('rag.faiss_query_worker.run_query', side_effect=[mock_chunks, ValueError("bad index")]) as mock_run:
+        serve(stdin=stdin, stdout=stdout)
+
+    assert mock_run.call_args_list[0].kwargs == {"query": "justice", "model_id": "bge-large", "top_k": 5}
+    responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert responses == [{"chunks": mock_chunks}, {"error": "ValueError: bad index"}]
+
+
+@pytest.mark.integration
+def test_query_worker_serve_uses_utf8_regardless_of_locale(monkeypatch):
+    """Test the default streams speak UTF-8 even when the locale encoding does not."""
+    request = json.dumps({"query": "Selma Lagerlöf", "model_id": "bge-large"}, ensure_ascii=False) + "\n"
+    stdin = io.TextIOWrapper(io.BytesIO(request.encode("utf-8")), encoding="ascii")
+    stdout_buffer = io.BytesIO()
+    stdout = io.TextIOWrapper(stdout_buffer, encoding="ascii")
+    monkeypatch.setattr(sys, "stdin", stdin)
+    monkeypatch.setattr(sys, "stdout", stdout)
+
+    chunks = [{"text": "Gösta Berling", "score": 0.9}]
+    with patch('rag.faiss_query_worker.run_query', return_value=chunks) as mock_run:
+        serve()
+
+    assert mock_run.call_args.kwargs["query"] == "Selma Lagerlöf"
+    assert json.loads(stdout_buffer.getvalue().decode("utf-8")) == {"chunks": chunks}
@@ -0,0 +1,65 @@
+"""
+Integration test: query_index metadata filtering against a real IndexFlatIP.
+Ensures filtered results map back to the right metadata rows and that only the
+matching vectors are read from the index.
+"""
+import pytest
+import numpy as np
+import faiss
+from unittest.mock import MagicMock, patch
+from rag.retriever import query_index
+
+@pytest.fixture
+def small_index():
+    """Four 2-d vectors; rows 1 and 3 are lectures by female laureates."""
+    vectors = np.array([[1.0, 0.0], [0.9, 0.1], [0.0, 1.0], [0.1, 0.9]], dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    index = faiss.IndexFlatIP(2)
+    index.add(vectors)
+    metadata = [
+        {"chunk_id": "c0", "gender": "male", "source_type": "nobel_lecture"},
+        {"chunk_id": "c1", "gender": "female", "source_type": "nobel_lecture"},
+        {"chunk_id": "c2", "gender": "male", "source_type": "nobel_lecture"},
+        {"chunk_id": "c3", "gender": "female", "source_type": "nobel_lecture"},
+    ]
+    return index, metadata
+
+@pytest.mark.integration
+def test_query_index_filters_by_vector_position(small_index):
+    index, metadata = small_index
+    reconstruct_spy = MagicMock(side_effect=index.reconstruct_batch)
+    index_proxy = MagicMock(spec=faiss.IndexFlatIP)
+    index_proxy.reconstruct_batch = reconstruct_spy
+
+    with patch("rag.retriever.get_model_config", return_value={"embedding_dim": 2}), \
+         patch("rag.retriever.get_faiss_index_and_metadata", return_value=(index_proxy, metadata)):
+        results = query_index(
+            np.array([0.0, 1.0], dtype=np.float32),
+            top_k=2,
+            filters={"gender": "female"},
+            score_threshold=0.0,
+            min_return=1,
+            model_id="bge-large"
+        )
+
+    assert [r["chunk_id"] for r in results] == ["c3", "c1"]
+    assert results[0]["score"] > results[1]["score"]
+    # Only the two matching vectors are reconstructed, never the whole index
+    reconstruct_spy.assert_called_once()
+    assert list(reconstruct_spy.call_args[0][0]) == [1, 3]
+    index_proxy.reconstruct_n.assert_not_called()
+
+@pytest.mark.integration
+def test_query_index_filters_with_no_match(small_index):
+    index, metadata = small_index
+    with patch("rag.retriever.get_model_config", return_value={"embedding_dim": 2}), \
+         patch("rag.retriever.get_faiss_index_and_metadata", return_value=(index, metadata)):
+        results = query_index(
+            np.array([0.0, 1.0], dtype=np.float32),
+            top_k=2,
+            filters={"gender": "other"},
+            min_return=1,
+            model_id="bge-large"
+        )
+
+    assert results == []
@@ -16,46 +16,19 @@ Key integration points tested:
 import pytest
 import numpy as np
 import os
-from unittest.mock import patch, MagicMock
+from unittest.mock import ANY, patch, MagicMock
 from rag.query_engine import answer_query
-from rag.metadata_utils import load_laureate_metadata
-
-# Load test metadata
-EXAMPLE_METADATA = load_laureate_metadata()
 
 # -----------------------------------------------------------------------------------
 # Test Fixtures
 # -----------------------------------------------------------------------------------
 
-@pytest.fixture
-def mock_chunks():
-    """Mock chunks returned by retrievers."""
-    return [
-        {
-            "text": "Justice is a recurring theme in literature.",
-            "score": 0.85,
-            "rank": 0,
-            "chunk_id": "c1",
-            "laureate": "Toni Morrison",
-            "year_awarded": 1993,
-            "source_type": "nobel_lecture"
-        },
-        {
-            "text": "The human condition is explored through narrative.",
-            "score": 0.78,
-            "rank": 1,
-            "chunk_id": "c2",
-            "laureate": "Gabriel García Márquez",
-            "year_awarded": 1982,
-            "source_type": "nobel_lecture"
-        }
-    ]
-
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_embedding():
-    """Mock embedding vector."""
+    """Mock embedding vector, shared read-only by every test in the module."""
     embedding = np.random.rand(768).astype(np.float32)
     embedding /= np.linalg.norm(embedding)
+    embedding.setflags(write=False)
     return embedding
 
 # -----------------------------------------------------------------------------------
@@ -195,9 +168,14 @@ def test_score_threshold_propagation():
         result = answer_query(query, model_id="bge-large", score_threshold=custom_threshold)
         mock_get_retriever.assert_called_once_with("bge-large")
         mock_retriever = mock_get_retriever.return_value
-        mock_retriever.retrieve.assert_called_once()
-        call_args = mock_retriever.retrieve.call_args
-        assert call_args[1]["score_threshold"] == 0.25  # matches router behavior
+        mock_retriever.retrieve.assert_called_once_with(
+            query,
+            top_k=ANY,
+            filters=ANY,
+            score_threshold=0.25,  # matches router behavior
+            min_return=ANY,
+            max_return=ANY
+        )
 
 @pytest.mark.integration
 def test_filters_propagation():
@@ -212,10 +190,15 @@ def test_filters_propagation():
         result = answer_query(query, model_id="bge-large")
         mock_get_retriever.assert_called_once_with("bge-large")
         mock_retriever = mock_get_retriever.return_value
-        mock_retriever.retrieve.assert_called_once()
-        call_args = mock_retriever.retrieve.call_args
         expected_filters = None  # current behavior
-        assert call_args[1]["filters"] == expected_filters
+        mock_retriever.retrieve.assert_called_once_with(
+            query,
+            top_k=ANY,
+            filters=expected_filters,
+            score_threshold=ANY,
+            min_return=ANY,
+            max_return=ANY
+        )
 
 # -----------------------------------------------------------------------------------
 # Test: Chunk Schema Validation
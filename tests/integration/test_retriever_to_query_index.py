@@ -7,6 +7,9 @@ import numpy as np
 from unittest.mock import patch
 from rag.query_engine import retrieve_chunks
 
+# Fields every retrieved chunk must carry
+REQUIRED_CHUNK_FIELDS = frozenset({"chunk_id", "text", "score", "laureate", "year_awarded", "source_type"})
+
 @pytest.fixture(autouse=True)
 def force_inprocess(monkeypatch):
     # Force in-process mode so tests are consistent unless explicitly testing subprocess
@@ -24,43 +27,27 @@ def test_retrieve_chunks_dual_process_path(monkeypatch):
         assert result == [{"chunk_id": "dummy", "score": 0.9}]
 
 @pytest.mark.integration
-def test_retrieve_chunks_calls_query_index_with_correct_args():
-    embedding = np.ones(1024, dtype=np.float32)
-    mock_chunks = [
+@pytest.mark.parametrize("k,filters,mock_chunks", [
+    (2, None, [
         {"chunk_id": "c1", "text": "A", "score": 0.9, "laureate": "Test", "year_awarded": 2000, "source_type": "lecture"},
         {"chunk_id": "c2", "text": "B", "score": 0.8, "laureate": "Test", "year_awarded": 2001, "source_type": "lecture"},
-    ]
-    with patch("rag.retriever.query_index", return_value=mock_chunks) as mock_query_index:
-        result = retrieve_chunks(embedding, k=2, filters=None, score_threshold=0.0, min_k=2, model_id="bge-large")
-        mock_query_index.assert_called_once()
-        args, kwargs = mock_query_index.call_args
-        assert kwargs["model_id"] == "bge-large"
-        assert kwargs["top_k"] == 2
-        assert kwargs["filters"] is None
-        assert result == mock_chunks
-
-@pytest.mark.integration
-def test_retrieve_chunks_propagates_filters():
-    embedding = np.ones(1024, dtype=np.float32)
-    filters = {"country": "USA", "source_type": "nobel_lecture"}
-    mock_chunks = [
+    ]),
+    (1, {"country": "USA", "source_type": "nobel_lecture"}, [
         {"chunk_id": "c1", "text": "A", "score": 0.9, "country": "USA", "source_type": "nobel_lecture"},
-    ]
+    ]),
+    (3, None, []),
+], ids=["correct_args", "propagates_filters", "no_results"])
+def test_retrieve_chunks_calls_query_index(k, filters, mock_chunks):
+    embedding = np.ones(1024, dtype=np.float32)
     with patch("rag.retriever.query_index", return_value=mock_chunks) as mock_query_index:
-        result = retrieve_chunks(embedding, k=1, filters=filters, score_threshold=0.0, min_k=1, model_id="bge-large")
+        result = retrieve_chunks(embedding, k=k, filters=filters, score_threshold=0.0, min_k=k, model_id="bge-large")
         mock_query_index.assert_called_once()
         args, kwargs = mock_query_index.call_args
+        assert kwargs["model_id"] == "bge-large"
+        assert kwargs["top_k"] == k
         assert kwargs["filters"] == filters
         assert result == mock_chunks
 
-@pytest.mark.integration
-def test_retrieve_chunks_handles_no_results():
-    embedding = np.ones(1024, dtype=np.float32)
-    with patch("rag.retriever.query_index", return_value=[]) as mock_query_index:
-        result = retrieve_chunks(embedding, k=3, filters=None, score_threshold=0.0, min_k=3, model_id="bge-large")
-        mock_query_index.assert_called_once()
-        assert result == []
-
 @pytest.mark.integration
 def test_retrieve_chunks_output_schema():
     embedding = np.ones(1024, dtype=np.float32)
@@ -69,9 +56,8 @@ def test_retrieve_chunks_output_schema():
     ]
     with patch("rag.retriever.query_index", return_value=mock_chunks):
         result = retrieve_chunks(embedding, k=1, filters=None, score_threshold=0.0, min_k=1, model_id="bge-large")
-        required_fields = {"chunk_id", "text", "score", "laureate", "year_awarded", "source_type"}
         for chunk in result:
-            assert required_fields.issubset(chunk.keys())
+            assert REQUIRED_CHUNK_FIELDS.issubset(chunk.keys())
 
 # Note: retrieve_chunks does not apply post-filtering by score_threshold. That logic is only in the main query function.
 @pytest.mark.integration
@@ -1,10 +1,11 @@
 import pytest
 from unittest.mock import patch, MagicMock
+from rag import query_engine
+from rag.model_config import DEFAULT_MODEL_ID
+from rag.query_router import QueryIntent, RetrievalConfig
 
 # --- Test for factual/metadata answer ---
 def test_answer_compiler_metadata():
-    from rag import query_engine
-    from rag.query_router import QueryIntent, RetrievalConfig
     # Patch QueryRouter to always return a metadata answer
     class DummyRouteResult:
         intent = QueryIntent.FACTUAL
@@ -38,8 +39,6 @@ def test_answer_compiler_metadata():
 
 # --- Test for thematic (RAG) answer ---
 def test_answer_compiler_thematic():
-    from rag import query_engine
-    from rag.query_router import QueryIntent, RetrievalConfig
     # Patch QueryRouter to return a RAG/thematic answer
     class DummyRouteResult:
         intent = QueryIntent.THEMATIC
@@ -77,8 +76,6 @@ def test_answer_compiler_thematic():
 
 # --- Test for hybrid query (should route as RAG or metadata depending on router logic) ---
 def test_answer_compiler_hybrid():
-    from rag import query_engine
-    from rag.query_router import QueryIntent, RetrievalConfig
     # Patch QueryRouter to return a RAG answer for a hybrid query
     class DummyRouteResult:
         intent = QueryIntent.FACTUAL  # Changed from hybrid to factual since hybrid isn't special
@@ -115,8 +112,6 @@ def test_answer_compiler_hybrid():
 
 # --- Test for no relevant chunks (fallback) ---
 def test_answer_compiler_no_chunks():
-    from rag import query_engine
-    from rag.query_router import QueryIntent, RetrievalConfig
     class DummyRouteResult:
         intent = QueryIntent.THEMATIC
         answer_type = "rag"
@@ -147,9 +142,6 @@ def test_answer_compiler_no_chunks():
 
 # --- Test for default model_id behavior ---
 def test_answer_compiler_default_model_id():
-    from rag import query_engine
-    from rag.model_config import DEFAULT_MODEL_ID
-    from rag.query_router import QueryIntent, RetrievalConfig
     
     class DummyRouteResult:
         intent = QueryIntent.FACTUAL
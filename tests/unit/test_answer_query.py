@@ -3,9 +3,68 @@
 import pytest
 import logging
 from rag.query_engine import answer_query
-from rag.query_router import QueryIntent  # Add import for enum
+from rag.query_router import QueryIntent, QueryRouteResult, RetrievalConfig  # Add import for enum
+from contextlib import ExitStack
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
 
+# Route results returned by the patched QueryRouter.route_query, one per test case
+_FACTUAL_RESULT = QueryRouteResult(
+    intent=QueryIntent.FACTUAL,
+    answer_type="metadata",
+    answer="Toni Morrison won in 1993.",
+    metadata_answer={
+        "answer": "Toni Morrison won in 1993.",
+        "laureate": "Toni Morrison",
+        "year_awarded": 1993,
+        "country": "United States",
+        "country_flag": "🇺🇸",
+        "category": "Literature",
+        "prize_motivation": "for her novels characterized by visionary force and poetic import, gives life to an essential aspect of American reality."
+    },
+    logs={
+        "metadata_handler": "matched",
+        "metadata_rule": "award_year_by_name"
+    }
+)
+
+_GENERATIVE_RESULT = QueryRouteResult(
+    intent=QueryIntent.GENERATIVE,
+    answer_type="rag",
+    answer="Literature has the power to transform society and inspire change.",
+    retrieval_config=RetrievalConfig(top_k=10, score_threshold=0.2)
+)
+
+_THEMATIC_FILTERED_RESULT = QueryRouteResult(
+    intent=QueryIntent.THEMATIC,
+    answer_type="rag",
+    answer="American literature has unique perspectives on justice.",
+    retrieval_config=RetrievalConfig(top_k=15, filters={"country": "United States"}, score_threshold=0.2)
+)
+
+_CUSTOM_THRESHOLD_RESULT = QueryRouteResult(
+    intent=QueryIntent.FACTUAL,
+    answer_type="rag",
+    answer="High quality answer.",
+    retrieval_config=RetrievalConfig(top_k=5, score_threshold=0.5)  # Custom threshold
+)
+
+
+@pytest.fixture
+def patched_pipeline():
+    """
+    Patch the router, the mode-aware retriever and the OpenAI call together.
+    Tests fill in route.return_value, retriever.retrieve.return_value and
+    openai.return_value inline.
+    """
+    with ExitStack() as stack:
+        route = stack.enter_context(patch("rag.query_engine.QueryRouter.route_query"))
+        get_retriever = stack.enter_context(patch("rag.query_engine.get_mode_aware_retriever"))
+        openai = stack.enter_context(patch("rag.query_engine.call_openai"))
+        retriever = MagicMock()
+        get_retriever.return_value = retriever
+        yield SimpleNamespace(route=route, retriever=retriever, openai=openai)
+
 # -----------------------------------------------------------------------------------
 # Test Thematic Query → answer_query
 # -----------------------------------------------------------------------------------
@@ -23,7 +82,7 @@ def test_answer_query_thematic(caplog):
         }
     ]
     
-    with caplog.at_level(logging.INFO):
+    with caplog.at_level(logging.INFO, logger="rag.query_engine"):
         with patch("rag.query_engine.ThematicRetriever.retrieve", return_value=mock_chunks) as mock_retrieve, \
              patch("rag.query_engine.call_openai", return_value={"answer": "Justice is a key theme across laureates.", "completion_tokens": 20}):
             
@@ -40,37 +99,18 @@ def test_answer_query_thematic(caplog):
             assert result["sources"][0]["text_snippet"] == "Justice is a recurring theme."
             
             # Verify log content
-            assert any("Starting query processing" in record.message for record in caplog.records)
-            assert any("Retrieved chunks" in record.message for record in caplog.records)
-            assert any("Query completed successfully" in record.message for record in caplog.records)
+            messages = "\n".join(caplog.messages)
+            assert "Starting query processing" in messages
+            assert "Retrieved chunks" in messages
+            assert "Query completed successfully" in messages
 
 # -----------------------------------------------------------------------------------
 # Test Factual Query → answer_query
 # -----------------------------------------------------------------------------------
 
 def test_answer_query_factual(caplog):
-    with caplog.at_level(logging.INFO):
-        with patch("rag.query_engine.QueryRouter.route_query") as mock_router:
-            # Mock route result for factual query
-            mock_router.return_value.answer_type = "metadata"
-            mock_router.return_value.answer = "Toni Morrison won in 1993."
-            mock_router.return_value.metadata_answer = {
-                "answer": "Toni Morrison won in 1993.",
-                "laureate": "Toni Morrison",
-                "year_awarded": 1993,
-                "country": "United States",
-                "country_flag": "🇺🇸",
-                "category": "Literature",
-                "prize_motivation": "for her novels characterized by visionary force and poetic import, gives life to an essential aspect of American reality."
-            }
-            mock_router.return_value.intent = QueryIntent.FACTUAL  # Use enum instead of string
-            mock_router.return_value.logs = {
-                "metadata_handler": "matched",
-                "metadata_rule": "award_year_by_name"
-            }
-            mock_router.return_value.retrieval_config = None
-            mock_router.return_value.prompt_template = None
-
+    with caplog.at_level(logging.INFO, logger="rag.query_engine"):
+        with patch("rag.query_engine.QueryRouter.route_query", return_value=_FACTUAL_RESULT):
             result = answer_query("What year did Toni Morrison win?")
             
             # Verify result structure
@@ -85,11 +125,12 @@ def test_answer_query_factual(caplog):
             assert result["sources"] == []  # No sources for metadata answers
             
             # Verify log content - metadata answers return early, so no "Query completed successfully"
-            assert any("Starting query processing" in record.message for record in caplog.records)
-            assert any("Using metadata answer" in record.message for record in caplog.records)
+            messages = "\n".join(caplog.messages)
+            assert "Starting query processing" in messages
+            assert "Using metadata answer" in messages
             # Note: "Query completed successfully" is only logged for RAG answers, not metadata answers
 
-def test_answer_query_generative(caplog):
+def test_answer_query_generative(caplog, patched_pipeline):
     """Test generative query path with standard retriever and correct configuration"""
     mock_chunks = [
         {
@@ -103,40 +144,27 @@ def test_answer_query_generative(caplog):
         }
     ]
     
-    with caplog.at_level(logging.INFO):
-        with patch("rag.query_engine.QueryRouter.route_query") as mock_router:
-            # Mock route result for generative query
-            mock_router.return_value.answer_type = "rag"
-            mock_router.return_value.answer = "Literature has the power to transform society and inspire change."
-            mock_router.return_value.intent = QueryIntent.GENERATIVE
-            mock_router.return_value.retrieval_config.top_k = 10
-            mock_router.return_value.retrieval_config.score_threshold = 0.2
-            mock_router.return_value.retrieval_config.filters = None
-            mock_router.return_value.prompt_template = None
-            
-            with patch("rag.query_engine.get_mode_aware_retriever") as mock_get_retriever, \
-                 patch("rag.query_engine.call_openai", return_value={"answer": "Literature has the power to transform society and inspire change.", "completion_tokens": 18}):
-                
-                mock_retriever = MagicMock()
-                mock_retriever.retrieve.return_value = mock_chunks
-                mock_get_retriever.return_value = mock_retriever
-                
-                result = answer_query("How does literature impact society?")
-                
-                # Verify result structure
-                assert result["answer_type"] == "rag"
-                assert "literature" in result["answer"].lower()
-                assert result["sources"][0]["laureate"] == "Mario Vargas Llosa"
-                
-                # Verify retriever was called with correct parameters for generative query
-                mock_retriever.retrieve.assert_called_once_with(
-                    "How does literature impact society?",
-                    top_k=10,
-                    filters=None,
-                    score_threshold=0.2,
-                    min_return=3,
-                    max_return=10
-                )
+    patched_pipeline.route.return_value = _GENERATIVE_RESULT
+    patched_pipeline.retriever.retrieve.return_value = mock_chunks
+    patched_pipeline.openai.return_value = {"answer": "Literature has the power to transform society and inspire change.", "completion_tokens": 18}
+    
+    with caplog.at_level(logging.INFO, logger="rag.query_engine"):
+        result = answer_query("How does literature impact society?")
+    
+    # Verify result structure
+    assert result["answer_type"] == "rag"
+    assert "literature" in result["answer"].lower()
+    assert result["sources"][0]["laureate"] == "Mario Vargas Llosa"
+    
+    # Verify retriever was called with correct parameters for generative query
+    patched_pipeline.retriever.retrieve.assert_called_once_with(
+        "How does literature impact society?",
+        top_k=10,
+        filters=None,
+        score_threshold=0.2,
+        min_return=3,
+        max_return=10
+    )
 
 def test_answer_query_thematic_with_filters(caplog):
     """Test thematic query path with filters properly propagated to ThematicRetriever"""
@@ -153,17 +181,8 @@ def test_answer_query_thematic_with_filters(caplog):
         }
     ]
     
-    with caplog.at_level(logging.INFO):
-        with patch("rag.query_engine.QueryRouter.route_query") as mock_router:
-            # Mock route result for thematic query with filters
-            mock_router.return_value.answer_type = "rag"
-            mock_router.return_value.answer = "American literature has unique perspectives on justice."
-            mock_router.return_value.intent = "thematic"
-            mock_router.return_value.retrieval_config.top_k = 15
-            mock_router.return_value.retrieval_config.score_threshold = 0.2
-            mock_router.return_value.retrieval_config.filters = {"country": "United States"}
-            mock_router.return_value.prompt_template = None
-            
+    with caplog.at_level(logging.INFO, logger="rag.query_engine"):
+        with patch("rag.query_engine.QueryRouter.route_query", return_value=_THEMATIC_FILTERED_RESULT):
             with patch("rag.query_engine.ThematicRetriever") as mock_thematic_class, \
                  patch("rag.query_engine.call_openai", return_value={"answer": "American literature has unique perspectives on justice.", "completion_tokens": 15}):
                 
@@ -188,7 +207,7 @@ def test_answer_query_thematic_with_filters(caplog):
                     max_return=12
                 )
 
-def test_answer_query_score_threshold_propagation(caplog):
+def test_answer_query_score_threshold_propagation(caplog, patched_pipeline):
     """Test that score_threshold from QueryRouter is properly propagated to retriever"""
     mock_chunks = [
         {
@@ -202,32 +221,19 @@ def test_answer_query_score_threshold_propagation(caplog):
         }
     ]
     
-    with caplog.at_level(logging.INFO):
-        with patch("rag.query_engine.QueryRouter.route_query") as mock_router:
-            # Mock route result with custom score_threshold
-            mock_router.return_value.answer_type = "rag"
-            mock_router.return_value.answer = "High quality answer."
-            mock_router.return_value.intent = QueryIntent.FACTUAL
-            mock_router.return_value.retrieval_config.top_k = 5
-            mock_router.return_value.retrieval_config.score_threshold = 0.5  # Custom threshold
-            mock_router.return_value.retrieval_config.filters = None
-            mock_router.return_value.prompt_template = None
-            
-            with patch("rag.query_engine.get_mode_aware_retriever") as mock_get_retriever, \
-                 patch("rag.query_engine.call_openai", return_value={"answer": "High quality answer.", "completion_tokens": 10}):
-                
-                mock_retriever = MagicMock()
-                mock_retriever.retrieve.return_value = mock_chunks
-                mock_get_retriever.return_value = mock_retriever
-                
-                result = answer_query("Test query", score_threshold=0.2)  # Function parameter
-                
-                # Verify retriever was called with router's score_threshold, not function parameter
-                mock_retriever.retrieve.assert_called_once_with(
-                    "Test query",
-                    top_k=5,
-                    filters=None,
-                    score_threshold=0.5,  # Should use router's threshold, not 0.2
-                    min_return=3,
-                    max_return=10
-                )
+    patched_pipeline.route.return_value = _CUSTOM_THRESHOLD_RESULT
+    patched_pipeline.retriever.retrieve.return_value = mock_chunks
+    patched_pipeline.openai.return_value = {"answer": "High quality answer.", "completion_tokens": 10}
+    
+    with caplog.at_level(logging.INFO, logger="rag.query_engine"):
+        result = answer_query("Test query", score_threshold=0.2)  # Function parameter
+    
+    # Verify retriever was called with router's score_threshold, not function parameter
+    patched_pipeline.retriever.retrieve.assert_called_once_with(
+        "Test query",
+        top_k=5,
+        filters=None,
+        score_threshold=0.5,  # Should use router's threshold, not 0.2
+        min_return=3,
+        max_return=10
+    )
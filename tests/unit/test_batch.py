@@ -0,0 +1,74 @@
+"""
+Unit tests for rag.batch.answer_query_batch.
+
+answer_query is replaced with a slow fake so the tests check concurrency,
+ordering and rate limiting without touching the retrieval pipeline.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from rag.batch import answer_query_batch
+
+
+@pytest.fixture
+def slow_answer_query(monkeypatch):
+    """Patch answer_query with a fake that sleeps and records peak concurrency."""
+    state = {"active": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def fake_answer_query(query, model_id=None, **kwargs):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.05)
+        with lock:
+            state["active"] -= 1
+        return {"answer_type": "rag", "answer": f"answer to {query}", "model_id": model_id}
+
+    monkeypatch.setattr("rag.batch.answer_query", fake_answer_query)
+    return state
+
+
+def test_batch_preserves_order_and_overlaps_queries(slow_answer_query):
+    queries = [f"query {i}" for i in range(6)]
+
+    results = asyncio.run(answer_query_batch(queries, model_id="bge-large", rate_limit_per_min=6000))
+
+    assert [r["answer"] for r in results] == [f"answer to {q}" for q in queries]
+    assert all(r["model_id"] == "bge-large" for r in results)
+    assert slow_answer_query["peak"] > 1  # Queries overlapped instead of running one after another
+
+
+def test_batch_respects_max_concurrency(slow_answer_query):
+    asyncio.run(answer_query_batch([f"q{i}" for i in range(6)], max_concurrency=2, rate_limit_per_min=6000))
+
+    assert slow_answer_query["peak"] <= 2
+
+
+def test_batch_spaces_query_starts(slow_answer_query, monkeypatch):
+    # One start per minute; the fake sleep records each wait instead of taking it
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    asyncio.run(answer_query_batch(["a", "b", "c"], rate_limit_per_min=1))
+
+    # The first query starts at once; since no time really passes, each later one
+    # waits one more interval than the one before it
+    assert len(delays) == 2
+    assert 59.0 < delays[0] <= 60.0
+    assert 119.0 < delays[1] <= 120.0
+
+
+@pytest.mark.parametrize("kwargs", [{"max_concurrency": 0}, {"rate_limit_per_min": 0}])
+def test_batch_rejects_non_positive_limits(kwargs):
+    with pytest.raises(ValueError, match="must be positive"):
+        asyncio.run(answer_query_batch(["q"], **kwargs))
@@ -1,6 +1,6 @@
 import pytest
-from rag.metadata_handler import handle_metadata_query
-from rag.metadata_utils import flatten_laureate_metadata
+from rag.metadata_handler import handle_metadata_query, handle_metadata_batch, match_query_to_handler, FACTUAL_QUERY_REGISTRY
+from rag.metadata_utils import IdentityLRUCache, flatten_laureate_metadata, load_laureate_metadata, laureate_columns
 import re
 
 # Example metadata for testing
@@ -264,4 +264,142 @@ def test_nested_filter_fallback_zero_matches():
     # Filter: male, atlantis, year > 2000
     filtered = [l for l in flat if l["gender"] == "male" and l["country"] == "atlantis" and l["year_awarded"] > 2000]
     assert isinstance(filtered, list)
-    assert len(filtered) == 0 
\ No newline at end of file
+    assert len(filtered) == 0 
+
+# --- Keyword prefilter must never change which rule matches ---
+@pytest.mark.parametrize("query", [
+    "What year did Toni Morrison win?",
+    "When was Toni Morrison awarded?",
+    "Who received the Nobel Prize in Literature in 2017?",
+    "WINNER IN 2017?",
+    "Country of Kazuo Ishiguro",
+    "How many women won since 1950?",
+    "Which country has received the most prizes?",
+    "Who was the LAST male winner?",
+    "How many winners were from united kingdom?",
+    "What is the motivation for Kazuo Ishiguro?",
+    "When was Selma Lagerlöf born?",
+    "Years nobel prize in literature no award",
+    "Who was the first united states laureate?",
+    "How many males are laureates?",
+    "What are common themes in Nobel lectures?",
+    "Tell me about the prize",
+])
+def test_keyword_prefilter_matches_full_scan(query):
+    expected = None
+    for rule in FACTUAL_QUERY_REGISTRY:
+        match = next((m for m in (p.search(query) for p in rule.patterns) if m), None)
+        if match:
+            expected = (rule.name, match.groups())
+            break
+    result = match_query_to_handler(query)
+    actual = (result[0].name, result[1].groups()) if result else None
+    assert actual == expected
+
+
+def test_re2_source_spells_out_unicode_classes():
+    from rag.metadata_handler import _re2_source
+    assert _re2_source(r"country of ([\w .'-]+)\s*$") == r"country of ([\p{L}\p{N}_ .'-]+)[\s\v\p{Z}\x{85}\x{1c}-\x{1f}]*\n?$"
+    assert _re2_source(r"in (\d{4})[\?\.]*") == r"in ([\p{Nd}]{4})[\?\.]*"
+    # Escapes without a translation keep the re pattern
+    assert _re2_source(r"\bwin\b") is None
+
+
+@pytest.mark.parametrize("query", [
+    "What country is Camilo José Cela from?",
+    "WHERE IS WISŁAWA SZYMBORSKA FROM",
+    "Who won the Nobel Prize in Literature in 1990?\n",
+    "When did " + "a win " * 30 + "today?",
+    "How many females have won?",
+])
+def test_linear_patterns_match_like_re(query):
+    pytest.importorskip("re2")
+    from rag.metadata_handler import _RULE_PATTERNS
+    for _, pattern, linear_pattern, _ in _RULE_PATTERNS:
+        expected = pattern.search(query)
+        actual = linear_pattern.search(query)
+        assert (actual and actual.groups()) == (expected and expected.groups())
+
+
+def test_flatten_interns_vocabulary_strings():
+    raw = [
+        {"year_awarded": 1901, "category": "".join(["Litera", "ture"]),
+         "laureates": [{"full_name": "A", "country": "".join(["Fra", "nce"]), "gender": "".join(["ma", "le"])}]},
+        {"year_awarded": 1902, "category": "".join(["Lite", "rature"]),
+         "laureates": [{"full_name": "B", "country": "".join(["Fr", "ance"]), "gender": "".join(["m", "ale"])},
+                       {"full_name": "C", "country": None, "gender": None}]},
+    ]
+    first, second, third = flatten_laureate_metadata(raw)
+    assert first["country"] is second["country"]
+    assert first["gender"] is second["gender"]
+    assert first["category"] is second["category"]
+    assert third["country"] is None and third["gender"] is None
+
+
+# --- Memoized loading and column view ---
+def test_load_laureate_metadata_memoized_until_file_changes(tmp_path):
+    import json
+    import os
+    path = tmp_path / "nobel_literature.json"
+    path.write_text(json.dumps([{"year_awarded": 1993, "category": "Literature", "laureates": [{"full_name": "Toni Morrison"}]}]))
+
+    first = load_laureate_metadata(str(path))
+    assert load_laureate_metadata(str(path)) is first
+
+    path.write_text(json.dumps([{"year_awarded": 2017, "category": "Literature", "laureates": [{"full_name": "Kazuo Ishiguro"}]}]))
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    reloaded = load_laureate_metadata(str(path))
+    assert reloaded is not first
+    assert reloaded[0]["full_name"] == "Kazuo Ishiguro"
+
+def test_laureate_columns_match_rows_and_are_reused():
+    columns = laureate_columns(EXAMPLE_METADATA)
+    assert columns.names.tolist() == ["toni morrison", "kazuo ishiguro", "selma lagerlöf"]
+    assert columns.years.tolist() == [1993, 2017, 1909]
+    assert columns.genders.tolist() == ["female", "male", "female"]
+    assert columns.countries.tolist() == ["united states", "united kingdom", "sweden"]
+    assert laureate_columns(EXAMPLE_METADATA) is columns
+    # A different list with equal contents gets its own columns
+    assert laureate_columns(list(EXAMPLE_METADATA)) is not columns
+
+def test_identity_lru_cache_keys_on_identity_and_evicts_oldest():
+    cache = IdentityLRUCache(maxsize=2)
+    first, second, third = [1], [1], [2]
+    builds = []
+    build = lambda obj: builds.append(obj) or len(builds)
+
+    assert cache.get_or_build(first, build) == 1
+    assert cache.get_or_build(first, build) == 1
+    assert cache.get_or_build(second, build) == 2  # equal but distinct list
+    cache.get_or_build(first, build)  # first is now most recently used
+    cache.get_or_build(third, build)  # evicts second
+    assert cache.get_or_build(first, build) == 1
+    assert cache.get_or_build(second, build) == 4
+    assert len(builds) == 4
+
+def test_years_with_no_award_lists_every_gap():
+    metadata = [{"full_name": f"L{y}", "year_awarded": y} for y in (1901, 1902, 1905, 1905, 1910)]
+    result = handle_metadata_query("Which years was the Nobel Prize in Literature not awarded?", metadata)
+    assert result["years"] == [1903, 1904, 1906, 1907, 1908, 1909]
+
+def test_first_last_and_most_awarded_handle_missing_fields_and_ties():
+    metadata = [
+        {"full_name": "A", "year_awarded": 1901, "gender": None, "country": None},
+        {"full_name": "B", "year_awarded": 1902, "gender": "female", "country": "Chile"},
+        {"full_name": "C", "year_awarded": 1902, "gender": "female", "country": "France"},
+        {"full_name": "D", "year_awarded": 1903, "gender": "male", "country": "France"},
+        {"full_name": "E", "year_awarded": 1904, "gender": "male", "country": "Chile"},
+    ]
+    # Ties keep list order: first row of the earliest year, last row of the latest year
+    assert handle_metadata_query("Who was the first female laureate?", metadata)["laureate"] == "B"
+    assert handle_metadata_query("Who was the last female laureate?", metadata)["laureate"] == "C"
+    assert handle_metadata_query("Who was the last chile laureate?", metadata)["laureate"] == "E"
+    # Chile and France tie on count; the country seen first wins
+    result = handle_metadata_query("Which country has won the most prizes?", metadata)
+    assert (result["country"], result["count"]) == ("Chile", 2)
+
+
+def test_handle_metadata_batch_matches_single_queries():
+    queries = ["What year did Toni Morrison win?", "What are common themes?", "How many laureates are from Sweden?"]
+    assert handle_metadata_batch(queries, EXAMPLE_METADATA) == [handle_metadata_query(q, EXAMPLE_METADATA) for q in queries]
@@ -84,8 +84,9 @@ class TestPromptBuilderIntegration:
         
         # Should contain generative template elements
         assert "You are a Nobel laureate" in prompt
-        assert "email" in prompt.lower() or "accept" in query.lower()
-        assert "humility" in prompt.lower() or "gratitude" in prompt.lower()
+        prompt_lower = prompt.lower()
+        assert "email" in prompt_lower or "accept" in query.lower()
+        assert "humility" in prompt_lower or "gratitude" in prompt_lower
     
     def test_build_intent_aware_prompt_thematic(self):
         """Test building thematic prompts."""
@@ -98,8 +99,9 @@ class TestPromptBuilderIntegration:
         )
         
         # Should contain thematic template elements
-        assert "theme" in prompt.lower() or "perspectives" in prompt.lower()
-        assert "comprehensive analysis" in prompt.lower() or "diverse viewpoints" in prompt.lower()
+        prompt_lower = prompt.lower()
+        assert "theme" in prompt_lower or "perspectives" in prompt_lower
+        assert "comprehensive analysis" in prompt_lower or "diverse viewpoints" in prompt_lower
     
     def test_build_intent_aware_prompt_scoped(self):
         """Test building scoped prompts."""
@@ -118,7 +120,8 @@ class TestPromptBuilderIntegration:
         
         # Should contain scoped template elements
         assert "Toni Morrison" in prompt
-        assert "specifically" in prompt.lower() or "focus" in prompt.lower()
+        prompt_lower = prompt.lower()
+        assert "specifically" in prompt_lower or "focus" in prompt_lower
     
     def test_build_intent_aware_prompt_fallback(self):
         """Test that fallback works when PromptBuilder fails."""
@@ -1,33 +1,41 @@
 import pytest
 from rag.query_router import PromptTemplateSelector, QueryIntent
 
+# Substrings every template must carry, and wording that belongs to no current template
+PLACEHOLDERS = ("{query}", "{context}")
+FORBIDDEN = ("literary analyst", "creative, original response")
+
+def assert_template_text(template, required, forbidden=()):
+    """Check all substrings in one scan each, reporting every missing or unexpected one."""
+    missing = [s for s in required if s not in template]
+    unexpected = [s for s in forbidden if s in template]
+    assert not missing, f"missing from template: {missing}"
+    assert not unexpected, f"unexpected in template: {unexpected}"
+
 def test_get_factual_prompt_template():
     template = PromptTemplateSelector.get_template(QueryIntent.FACTUAL)
-    assert "Answer the following factual question about Nobel Literature laureates" in template
-    assert "{query}" in template
-    assert "{context}" in template
-    assert "literary analyst" not in template
-    assert "creative, original response" not in template
+    assert_template_text(
+        template,
+        ("Answer the following factual question about Nobel Literature laureates", *PLACEHOLDERS),
+        FORBIDDEN
+    )
 
 def test_get_thematic_prompt_template():
     template = PromptTemplateSelector.get_template(QueryIntent.THEMATIC)
-    assert "Analyze the following thematic question about Nobel Literature laureates" in template
-    assert "{query}" in template
-    assert "{context}" in template
-    assert "literary analyst" not in template
-    assert "creative, original response" not in template
+    assert_template_text(
+        template,
+        ("Analyze the following thematic question about Nobel Literature laureates", *PLACEHOLDERS),
+        FORBIDDEN
+    )
 
 def test_get_generative_prompt_template():
     template = PromptTemplateSelector.get_template(QueryIntent.GENERATIVE)
-    assert "Generate a creative response to" in template
-    assert "{query}" in template
-    assert "{context}" in template
-    assert "literary analyst" not in template
-    assert "creative, original response" not in template
+    assert_template_text(template, ("Generate a creative response to", *PLACEHOLDERS), FORBIDDEN)
 
 def test_prompt_template_selector_fallback():
     # Test that unknown intent falls back to factual template
     template = PromptTemplateSelector.get_template("unknown_intent")
-    assert "Answer the following factual question about Nobel Literature laureates" in template
-    assert "{query}" in template
-    assert "{context}" in template 
\ No newline at end of file
+    assert_template_text(
+        template,
+        ("Answer the following factual question about Nobel Literature laureates", *PLACEHOLDERS)
+    )
@@ -12,12 +12,16 @@ EXAMPLE_METADATA = {
     ]
 }
 
+@pytest.fixture(scope="module")
+def router():
+    """One QueryRouter shared by tests that only call route_query."""
+    return QueryRouter(metadata=EXAMPLE_METADATA)
+
 # -----------------------------------------------------------------------------------
 # Test basic routing behavior
 # -----------------------------------------------------------------------------------
 
-def test_router_factual_query():
-    router = QueryRouter(metadata=EXAMPLE_METADATA)
+def test_router_factual_query(router):
     result = router.route_query("What year did Toni Morrison win the Nobel Prize?")
     
     # The query should be classified as factual, but the intent classifier might classify it as thematic
@@ -25,21 +29,16 @@ def test_router_factual_query():
     assert result.intent in [QueryIntent.FACTUAL, QueryIntent.THEMATIC]
     assert result.answer_type in ["rag", "metadata"]
 
-def test_router_thematic_query():
-    router = QueryRouter(metadata=EXAMPLE_METADATA)
-    result = router.route_query("What are common themes in Nobel lectures?")
+@pytest.mark.parametrize("query,expected_intent,expected_top_k", [
+    ("What are common themes in Nobel lectures?", QueryIntent.THEMATIC, 15),
+    ("Write a speech in the style of Toni Morrison.", QueryIntent.GENERATIVE, 10),
+], ids=["thematic", "generative"])
+def test_router_rag_query(router, query, expected_intent, expected_top_k):
+    result = router.route_query(query)
     
-    assert result.intent == QueryIntent.THEMATIC
+    assert result.intent == expected_intent
     assert result.answer_type == "rag"
-    assert result.retrieval_config.top_k == 15
-
-def test_router_generative_query():
-    router = QueryRouter(metadata=EXAMPLE_METADATA)
-    result = router.route_query("Write a speech in the style of Toni Morrison.")
-    
-    assert result.intent == QueryIntent.GENERATIVE
-    assert result.answer_type == "rag"
-    assert result.retrieval_config.top_k == 10
+    assert result.retrieval_config.top_k == expected_top_k
 
 # -----------------------------------------------------------------------------------
 # Test fallback / invalid intent handling
@@ -47,6 +46,7 @@ def test_router_generative_query():
 
 def test_router_invalid_intent_fallback(monkeypatch, caplog):
     """Test that the router handles invalid intents gracefully by logging and falling back to factual."""
+    # Own router: the classifier is patched below and must not leak into the shared one
     router = QueryRouter(metadata=EXAMPLE_METADATA)
 
     # Force intent classifier to return invalid intent
@@ -63,11 +63,13 @@ def test_router_invalid_intent_fallback(monkeypatch, caplog):
     monkeypatch.setattr(router.intent_classifier, "classify", mock_classify)
 
     # Run the query and capture logs
-    with caplog.at_level(logging.ERROR):
+    with caplog.at_level(logging.ERROR, logger="rag.query_router"):
         result = router.route_query("This is a test query with invalid intent.")
 
-        # Verify error was logged
-        assert any("Invalid intent from classifier" in record.message for record in caplog.records)
+        # Verify error was logged, naming the rejected intent
+        messages = "\n".join(caplog.messages)
+        assert "Invalid intent from classifier" in messages
+        assert "nonsense_intent" in messages
         
         # Verify fallback to factual
         assert result.intent == QueryIntent.FACTUAL
@@ -77,8 +79,7 @@ def test_router_invalid_intent_fallback(monkeypatch, caplog):
 # Test logging for thematic query
 # -----------------------------------------------------------------------------------
 
-def test_router_thematic_logging():
-    router = QueryRouter(metadata=EXAMPLE_METADATA)
+def test_router_thematic_logging(router):
     result = router.route_query("What themes are present in Nobel lectures?")
     
     assert result.intent == QueryIntent.THEMATIC
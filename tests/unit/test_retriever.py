@@ -0,0 +1,77 @@
+"""
+Unit tests for rag.retriever retriever construction and metadata filtering.
+
+Patches the model loader and faiss.read_index, so no model or index files are needed.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import faiss
+import numpy as np
+import pytest
+
+from rag.model_config import get_model_config
+from rag.retriever import SubprocessRetriever, filter_metadata_indices, query_index, query_index_batch
+
+METADATA = [
+    {"chunk_id": "c0", "gender": "male", "source_type": "nobel_lecture", "year_awarded": 1993},
+    {"chunk_id": "c1", "gender": "female", "source_type": "nobel_lecture", "year_awarded": 1993},
+    {"chunk_id": "c2", "gender": "female", "source_type": "acceptance_speech"},
+    {"chunk_id": "c3", "gender": "female", "source_type": "nobel_lecture", "tags": ["a"]},
+]
+
+
+@pytest.fixture
+def index_reads(monkeypatch):
+    """Spy on faiss.read_index with an empty index cache; yields the spy."""
+    monkeypatch.setenv("NOBELLM_USE_FAISS_SUBPROCESS", "0")
+    model = MagicMock()
+    model.get_sentence_embedding_dimension.return_value = 2
+    with patch("rag.retriever.get_model", return_value=model), \
+         patch.dict("rag.faiss_index._INDEX_CACHE", clear=True), \
+         patch("rag.faiss_index.faiss.read_index", return_value=faiss.IndexFlatIP(2)) as read_index:
+        yield read_index
+
+
+def test_retrievers_share_cached_index_for_their_model(index_reads):
+    SubprocessRetriever(model_id="miniLM")
+    SubprocessRetriever(model_id="miniLM")
+
+    index_reads.assert_called_once_with(get_model_config("miniLM")["index_path"])
+
+
+@pytest.mark.parametrize("filters", [
+    {"gender": "female"},
+    {"gender": "female", "source_type": "nobel_lecture"},
+    {"year_awarded": 1993},
+    {"year_awarded": None},
+    {"gender": "other"},
+    {"tags": ["a"]},
+], ids=["one_field", "two_fields", "int_field", "missing_field", "no_match", "unhashable"])
+def test_filter_metadata_indices_matches_row_scan(filters):
+    expected = [i for i, m in enumerate(METADATA) if all(m.get(k) == v for k, v in filters.items())]
+
+    indices = filter_metadata_indices(METADATA, filters)
+
+    assert indices.dtype == np.int64
+    assert indices.tolist() == expected
+
+
+def test_query_index_filtered_and_batch_share_search():
+    vectors = np.array([[1.0, 0.0], [0.0, 1.0], [0.6, 0.8], [0.8, 0.6]], dtype=np.float32)
+    index = faiss.IndexFlatIP(2)
+    index.add(vectors)
+    query = np.array([[3.0, 0.5]], dtype=np.float32)
+    params = {"top_k": 2, "model_id": "bge-large", "score_threshold": 0.0, "min_return": 1}
+
+    with patch("rag.retriever.get_model_config", return_value={"embedding_dim": 2}), \
+         patch("rag.retriever.get_faiss_index_and_metadata", return_value=(index, METADATA)):
+        filtered = query_index(query, filters={"gender": "female"}, **params)
+        single = query_index(query, **params)
+        batch = query_index_batch(np.vstack([query, query]), **params)
+
+    # c0 is the best match overall but is filtered out by gender
+    assert [c["chunk_id"] for c in filtered] == ["c3", "c2"]
+    assert [c["rank"] for c in filtered] == [0, 1]
+    assert batch == [single, single]
+    assert [c["chunk_id"] for c in single] == ["c0", "c3"]
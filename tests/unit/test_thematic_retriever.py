@@ -10,6 +10,7 @@ This test suite covers the new weighted retrieval functionality including:
 """
 import pytest
 import math
+import numpy as np
 from unittest.mock import Mock, patch, MagicMock
 from typing import List, Dict, Any, Tuple
 import logging
@@ -340,4 +341,25 @@ class TestThematicRetrieverPhase3:
         # Justice chunk should have higher weight
         assert chunk_1["term_weight"] == 0.95
         assert chunk_2["term_weight"] == 0.5
-        assert chunk_1["boost_factor"] > chunk_2["boost_factor"] 
\ No newline at end of file
+        assert chunk_1["boost_factor"] > chunk_2["boost_factor"]
+
+    def test_weighted_retrieval_batched_search(self, thematic_retriever, mock_base_retriever):
+        """Test all expanded terms are searched in one batched request when supported."""
+        ranked_terms = [("justice", 0.95), ("fairness", 0.5)]
+        thematic_retriever.reformulator.expand_query_terms_ranked.return_value = ranked_terms
+        embeddings = [np.array([1.0, 0.0]), np.array([0.0, 1.0])]
+        mock_base_retriever.retrieve_batch_with_embeddings.return_value = [
+            [{"chunk_id": "1", "score": 0.8, "content": "justice content"}],
+            [{"chunk_id": "2", "score": 0.6, "content": "fairness content"}],
+        ]
+        
+        with patch('rag.modal_embedding_service.get_embedding_service') as mock_get_service:
+            mock_get_service.return_value.embed_batch.return_value = embeddings
+            result = thematic_retriever.retrieve("test query", use_weighted_retrieval=True)
+        
+        mock_base_retriever.retrieve_batch_with_embeddings.assert_called_once()
+        assert mock_base_retriever.retrieve_batch_with_embeddings.call_args.kwargs["embeddings"] is embeddings
+        mock_base_retriever.retrieve_with_embedding.assert_not_called()
+        mock_base_retriever.retrieve.assert_not_called()
+        weights = {chunk["chunk_id"]: chunk["term_weight"] for chunk in result}
+        assert weights == {"1": 0.95, "2": 0.5}
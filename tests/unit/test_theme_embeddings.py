@@ -0,0 +1,140 @@
+"""
+Unit tests for config.theme_embeddings: the shared per-model factory and
+validation of the embeddings file against themes.json.
+"""
+
+import numpy as np
+import pytest
+
+import config.theme_embeddings as theme_embeddings_module
+from config.theme_embeddings import ThemeEmbeddings, get_theme_embeddings
+
+
+@pytest.fixture
+def fresh_factory():
+    get_theme_embeddings.cache_clear()
+    yield get_theme_embeddings
+    get_theme_embeddings.cache_clear()
+
+
+def test_get_theme_embeddings_builds_once_per_model(monkeypatch, fresh_factory):
+    created = []
+
+    class FakeThemeEmbeddings:
+        def __init__(self, model_id):
+            created.append(model_id)
+
+    monkeypatch.setattr(theme_embeddings_module, "ThemeEmbeddings", FakeThemeEmbeddings)
+
+    first = fresh_factory("bge-large")
+    assert fresh_factory("bge-large") is first
+    assert fresh_factory("miniLM") is not first
+    assert created == ["bge-large", "miniLM"]
+
+
+def test_embeddings_file_with_stale_keywords_is_not_loaded(tmp_path, monkeypatch):
+    embeddings_file = tmp_path / "theme_embeddings_bge-large.npz"
+    np.savez_compressed(
+        embeddings_file,
+        keywords=np.array(["justice", "removed"]),
+        embeddings=np.ones((2, 1024), dtype=np.float32)
+    )
+    theme_embeddings = ThemeEmbeddings.__new__(ThemeEmbeddings)
+    theme_embeddings.embedding_dim = 1024
+    theme_embeddings._embeddings_cache = {}
+    monkeypatch.setattr(theme_embeddings, "_get_embeddings_file_path", lambda: embeddings_file)
+
+    theme_embeddings.themes = {"justice": ["justice", "fairness"]}
+    assert theme_embeddings._load_embeddings_from_disk() is False
+
+    theme_embeddings.themes = {"justice": ["justice"], "other": ["removed"]}
+    assert theme_embeddings._load_embeddings_from_disk() is True
+    assert set(theme_embeddings._embeddings_cache) == {"justice", "removed"}
+    # Per-keyword embeddings are views into the single theme matrix
+    keywords, matrix = theme_embeddings._theme_matrix
+    assert keywords == ["justice", "removed"]
+    assert np.shares_memory(theme_embeddings._embeddings_cache["removed"], matrix)
+
+
+def test_compute_embeddings_batches_sorted_keywords(monkeypatch):
+    calls = []
+
+    class FakeEmbeddingService:
+        def embed_batch(self, texts, model_id):
+            calls.append(list(texts))
+            return [np.full(4, len(text), dtype=np.float32) / (2 * len(text)) for text in texts]
+
+    monkeypatch.setattr(theme_embeddings_module, "get_embedding_service", FakeEmbeddingService)
+    monkeypatch.setattr(theme_embeddings_module, "THEME_EMBED_BATCH_SIZE", 2)
+    theme_embeddings = ThemeEmbeddings.__new__(ThemeEmbeddings)
+    theme_embeddings.model_id = "bge-large"
+    theme_embeddings.embedding_dim = 4
+    theme_embeddings.themes = {"a": ["truth", "art"], "b": ["war", "justice", "art"]}
+    theme_embeddings._embeddings_cache = {}
+    theme_embeddings._theme_matrix = None
+    monkeypatch.setattr(theme_embeddings, "_save_embeddings_to_disk", lambda keywords, embeddings: None)
+
+    theme_embeddings._compute_and_save_embeddings()
+
+    assert calls == [["art", "war"], ["truth", "justice"]]
+    assert set(theme_embeddings._embeddings_cache) == {"art", "war", "truth", "justice"}
+    assert theme_embeddings._is_initialized
+
+
+def test_embedding_stats_from_theme_matrix():
+    theme_embeddings = ThemeEmbeddings.__new__(ThemeEmbeddings)
+    theme_embeddings.model_id = "bge-large"
+    theme_embeddings.embedding_dim = 2
+    theme_embeddings.themes = {"t": ["a", "b", "c"]}
+    theme_embeddings._embeddings_cache = {
+        "a": np.array([3.0, 4.0], dtype=np.float32),
+        "b": np.array([1.0, 0.0], dtype=np.float32),
+        "c": np.array([0.0, 0.0], dtype=np.float32),
+    }
+    theme_embeddings._theme_matrix = None
+    theme_embeddings._is_initialized = True
+
+    stats = theme_embeddings.get_embedding_stats()
+
+    norms = [np.linalg.norm(v) for v in theme_embeddings._embeddings_cache.values()]
+    assert stats["mean_norm"] == pytest.approx(np.mean(norms))
+    assert stats["std_norm"] == pytest.approx(np.std(norms))
+    assert (stats["min_norm"], stats["max_norm"]) == (0.0, 5.0)
+    assert stats["zero_embeddings"] == 1
+
+
+def test_theme_matrix_cache_is_memory_mapped(tmp_path, monkeypatch):
+    monkeypatch.setattr(theme_embeddings_module, "THEME_MATRIX_CACHE_DIR", tmp_path / "cache")
+    embeddings_file = tmp_path / "theme_embeddings_bge-large.npz"
+    embeddings_file.write_bytes(b"v1")
+    vectors = {
+        "truth": np.array([0.0, 1.0], dtype=np.float32),
+        "art": np.array([1.0, 0.0], dtype=np.float32),
+    }
+
+    def make(themes, cache):
+        theme_embeddings = ThemeEmbeddings.__new__(ThemeEmbeddings)
+        theme_embeddings.model_id = "bge-large"
+        theme_embeddings.embedding_dim = 2
+        theme_embeddings.themes = themes
+        theme_embeddings._embeddings_cache = cache
+        theme_embeddings._theme_matrix = None
+        theme_embeddings._get_embeddings_file_path = lambda: embeddings_file
+        return theme_embeddings
+
+    make({"t": ["truth", "art"]}, dict(vectors))._save_theme_matrix_cache()
+    assert [p.suffix for p in (tmp_path / "cache").iterdir()] == [".npy"]
+
+    reader = make({"t": ["truth", "art"]}, {})
+    assert reader._load_theme_matrix_cache() is True
+    keywords, matrix = reader._theme_matrix
+    assert keywords == ["art", "truth"]
+    assert isinstance(matrix, np.memmap) and not matrix.flags.writeable
+    np.testing.assert_array_equal(reader._embeddings_cache["truth"], vectors["truth"])
+
+    # A different keyword set maps to a different file
+    assert make({"t": ["truth"]}, {})._load_theme_matrix_cache() is False
+
+    # Regenerating the source embeddings file invalidates the cached matrix
+    embeddings_file.write_bytes(b"v2-regenerated")
+    assert make({"t": ["truth", "art"]}, {})._load_theme_matrix_cache() is False
@@ -1,5 +1,7 @@
 import pytest
-from config.theme_reformulator import ThemeReformulator
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from config.theme_reformulator import ThemeReformulator, load_spacy_pipeline
 
 # Use the correct path to themes.json
 THEME_PATH = "config/themes.json"
@@ -53,4 +55,59 @@ def test_case_insensitivity(query):
     # Should always include all justice theme keywords
     justice_keywords = {"justice", "fairness", "law", "morality", "rights", "equality", "injustice"}
     for kw in justice_keywords:
-        assert kw in result, f"Expected '{kw}' in expansion for query: {query}" 
\ No newline at end of file
+        assert kw in result, f"Expected '{kw}' in expansion for query: {query}"
+
+
+def test_spacy_pipeline_loaded_once_without_parser_or_ner(monkeypatch):
+    """Test that the lemmatization pipeline is loaded once, excluding unused components."""
+    mock_load = MagicMock()
+    monkeypatch.setattr("spacy.load", mock_load)
+    load_spacy_pipeline.cache_clear()
+    try:
+        first = load_spacy_pipeline()
+        second = load_spacy_pipeline()
+    finally:
+        load_spacy_pipeline.cache_clear()
+
+    assert first is second
+    mock_load.assert_called_once_with("en_core_web_sm", exclude=["parser", "ner"])
+
+
+def test_lemmatize_queries_pipes_uncached_queries_once():
+    """Test that batch lemmatization runs one nlp.pipe pass and later lookups hit the cache."""
+    def fake_doc(text):
+        return [SimpleNamespace(lemma_=word.rstrip("s")) for word in text.split()]
+
+    nlp = MagicMock(side_effect=fake_doc)
+    nlp.pipe.side_effect = lambda texts, batch_size: [fake_doc(t) for t in texts]
+    reformulator = ThemeReformulator.__new__(ThemeReformulator)
+    reformulator.nlp = nlp
+    reformulator._lemma_cache = {}
+
+    result = reformulator.lemmatize_queries(["Laureates write", "laureates WRITE", "themes"])
+
+    assert result == [{"laureate", "write"}, {"laureate", "write"}, {"theme"}]
+    nlp.pipe.assert_called_once()
+    assert list(nlp.pipe.call_args[0][0]) == ["laureates write", "themes"]
+    assert reformulator.lemmatize_query("THEMES") == {"theme"}
+    nlp.assert_not_called()
+
+
+def test_theme_keywords_lemmatized_in_one_pipe_pass(monkeypatch):
+    """Test that building the theme map lemmatizes the keyword vocabulary with one nlp.pipe call."""
+    def fake_doc(text):
+        return [SimpleNamespace(lemma_=text.rstrip("s"))]
+
+    nlp = MagicMock(side_effect=fake_doc)
+    nlp.pipe.side_effect = lambda texts, batch_size: [fake_doc(t) for t in texts]
+    monkeypatch.setattr("config.theme_reformulator.load_spacy_pipeline", lambda: nlp)
+
+    reformulator = ThemeReformulator(THEME_PATH)
+
+    nlp.pipe.assert_called_once()
+    nlp.assert_not_called()
+    with open(THEME_PATH, encoding="utf-8") as f:
+        theme_map_raw = json.load(f)
+    for theme, keywords in theme_map_raw.items():
+        for kw in keywords:
+            assert theme in reformulator.keyword_to_themes[kw.lower().rstrip("s")]
@@ -131,12 +131,13 @@ class TestEnhancedThemeReformulator:
         """Test that similarity scores are properly logged."""
         query = "justice and equality"
         
-        with caplog.at_level(logging.INFO):
+        with caplog.at_level(logging.INFO, logger="config.theme_reformulator"):
             reformulator.expand_query_terms_ranked(query, similarity_threshold=0.3)
         
         # Check that logging occurred
-        assert any("Starting ranked expansion" in record.message for record in caplog.records)
-        assert any("Ranked expansion completed" in record.message for record in caplog.records)
+        messages = "\n".join(caplog.messages)
+        assert "Starting ranked expansion" in messages
+        assert "Ranked expansion completed" in messages
     
     def test_hybrid_keyword_extraction(self, reformulator):
         """Test hybrid keyword extraction logic."""
@@ -154,18 +155,18 @@ class TestEnhancedThemeReformulator:
         """Test stopword removal in preprocessing."""
         query = "What do the laureates say about justice and fairness?"
         
-        preprocessed = reformulator._preprocess_query_for_themes(query)
+        preprocessed = reformulator._preprocess_query_for_themes(query).lower()
         
         # Should remove stopwords like "what", "do", "the", "and"
-        assert "what" not in preprocessed.lower()
-        assert "do" not in preprocessed.lower()
-        assert "the" not in preprocessed.lower()
-        assert "and" not in preprocessed.lower()
+        assert "what" not in preprocessed
+        assert "do" not in preprocessed
+        assert "the" not in preprocessed
+        assert "and" not in preprocessed
         
         # Should keep meaningful words
-        assert "laureates" in preprocessed.lower()
-        assert "justice" in preprocessed.lower()
-        assert "fairness" in preprocessed.lower()
+        assert "laureates" in preprocessed
+        assert "justice" in preprocessed
+        assert "fairness" in preprocessed
     
     def test_max_results_limiting(self, reformulator):
         """Test that max_results parameter works correctly."""
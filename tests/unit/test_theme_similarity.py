@@ -0,0 +1,102 @@
+"""
+Unit tests for config.theme_similarity.compute_theme_similarities.
+
+Uses a ThemeEmbeddings filled with random vectors instead of loading or
+computing real embeddings, so no embedding files or service are needed.
+"""
+
+import numpy as np
+import pytest
+
+from config.theme_embeddings import ThemeEmbeddings
+from config.theme_similarity import compute_theme_similarities, get_similarity_stats
+
+DIM = 1024  # bge-large
+
+
+def make_theme_embeddings(vectors):
+    """Build an initialized ThemeEmbeddings around the given keyword -> vector map."""
+    theme_embeddings = ThemeEmbeddings.__new__(ThemeEmbeddings)
+    theme_embeddings.model_id = "bge-large"
+    theme_embeddings.embedding_dim = DIM
+    theme_embeddings._embeddings_cache = dict(vectors)
+    theme_embeddings._theme_matrix = None
+    theme_embeddings._is_initialized = True
+    return theme_embeddings
+
+
+@pytest.fixture
+def theme_embeddings():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(40, DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return make_theme_embeddings({f"kw{i}": v for i, v in enumerate(vectors)})
+
+
+def test_similarities_match_per_keyword_dot_products(theme_embeddings):
+    query = np.mean(list(theme_embeddings._embeddings_cache.values())[:5], axis=0)
+    query /= np.linalg.norm(query)
+
+    result = compute_theme_similarities(query, similarity_threshold=0.0, theme_embeddings=theme_embeddings)
+
+    expected = sorted(
+        ((kw, float(np.dot(emb, query))) for kw, emb in theme_embeddings._embeddings_cache.items()),
+        key=lambda item: item[1],
+        reverse=True
+    )
+    expected = [(kw, score) for kw, score in expected if score >= 0.0]
+    assert list(result) == [kw for kw, _ in expected]
+    assert list(result.values()) == pytest.approx([score for _, score in expected], abs=1e-6)
+    assert all(type(score) is float for score in result.values())
+
+    top = compute_theme_similarities(query, similarity_threshold=0.0, max_results=3, theme_embeddings=theme_embeddings)
+    assert list(top.items()) == list(result.items())[:3]
+
+
+def test_equal_scores_keep_keyword_order():
+    vector = np.zeros(DIM, dtype=np.float32)
+    vector[0] = 1.0
+    theme_embeddings = make_theme_embeddings({"beta": vector, "alpha": vector, "gamma": -vector})
+
+    result = compute_theme_similarities(vector, similarity_threshold=0.5, theme_embeddings=theme_embeddings)
+
+    assert result == {"beta": 1.0, "alpha": 1.0}
+    assert list(result) == ["beta", "alpha"]
+
+
+def test_max_results_keeps_first_keywords_among_tied_scores():
+    vector = np.zeros(DIM, dtype=np.float32)
+    vector[0] = 1.0
+    half = vector * 0.5
+    theme_embeddings = make_theme_embeddings(
+        {"low": half * 0.5, "tie1": half, "top": vector, "tie2": half, "tie3": half}
+    )
+
+    result = compute_theme_similarities(vector, similarity_threshold=0.1, max_results=3, theme_embeddings=theme_embeddings)
+
+    assert list(result) == ["top", "tie1", "tie2"]
+
+
+def test_theme_matrix_built_once(theme_embeddings):
+    keywords, matrix = theme_embeddings.get_theme_matrix()
+
+    assert matrix.shape == (len(keywords), DIM)
+    assert matrix.dtype == np.float32 and matrix.flags["C_CONTIGUOUS"]
+    assert theme_embeddings.get_theme_matrix()[1] is matrix
+
+
+def test_similarity_stats_match_numpy_on_scores():
+    scores = {"justice": 0.8, "fairness": 0.7, "equality": 0.6, "truth": 0.65}
+
+    stats = get_similarity_stats(scores)
+
+    values = list(scores.values())
+    assert stats == {
+        "count": 4,
+        "mean": float(np.mean(values)),
+        "std": float(np.std(values)),
+        "min": 0.6,
+        "max": 0.8,
+        "median": float(np.median(values))
+    }
+    assert get_similarity_stats({})["count"] == 0
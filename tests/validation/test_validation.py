@@ -13,7 +13,8 @@ from rag.validation import (
     validate_filters,
     validate_retrieval_parameters,
     validate_model_id,
-    safe_faiss_scoring
+    safe_faiss_scoring,
+    is_invalid_vector
 )
 
 
@@ -164,6 +165,16 @@ class TestValidateEmbeddingVector:
         with pytest.raises(ValueError, match="is a zero vector"):
             validate_embedding_vector(zero_vec, context="test")
     
+    @pytest.mark.validation
+    def test_int8_vector_with_min_value_is_not_zero(self):
+        """Test that int8 -128, whose np.abs overflows to -128, is not treated as zero."""
+        vec = np.zeros(384, dtype=np.int8)
+        vec[0] = -128
+        
+        validate_embedding_vector(vec, context="test")
+        assert not is_invalid_vector(vec)
+        assert is_invalid_vector(np.zeros(384, dtype=np.int8))
+    
     @pytest.mark.validation
     def test_scalar_vector(self):
         """Test that scalar vectors are rejected."""
@@ -202,6 +213,30 @@ class TestValidateEmbeddingVector:
             assert "dtype is float64, converting to float32" in warning_call
 
 
+@pytest.mark.validation
+class TestIsInvalidVector:
+    """Test the NaN/inf/zero vector check used on the query path."""
+    
+    @pytest.mark.validation
+    def test_valid_vector(self):
+        """Test that a normal vector is not flagged."""
+        assert not is_invalid_vector(np.array([0.1, -0.2, 0.3], dtype=np.float32))
+    
+    @pytest.mark.validation
+    def test_invalid_vectors(self):
+        """Test that NaN, infinite, zero and empty vectors are flagged."""
+        invalid_vectors = [
+            np.array([1.0, np.nan], dtype=np.float32),
+            np.array([1.0, np.inf], dtype=np.float32),
+            np.zeros(384, dtype=np.float32),
+            np.full(384, 1e-9, dtype=np.float32),
+            np.array([], dtype=np.float32)
+        ]
+        
+        for vec in invalid_vectors:
+            assert is_invalid_vector(vec)
+
+
 @pytest.mark.validation
 class TestValidateFilters:
     """Test filter validation."""